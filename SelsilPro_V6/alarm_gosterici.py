@@ -0,0 +1,164 @@
+"""
+alarm_gosterici.py
+Selsil Pro V6 - Uyarı / hata / reject alarmının ekranda gösterimi
+
+- Tablonun üstünde ince bir bant (place ile üst üste; tablo stili değişmez) ve tablo
+  çerçevesinin kenarlık rengi yanıp söner. Treeview yeniden stillenmediği için
+  tablo kaç satır olursa olsun maliyet aynıdır.
+- Tek bir ortak zamanlayıcı: alarm sürerken yeni alarm gelirse yeni animasyon
+  başlamaz; seviye yükseltilir (hata > uyarı), metin güncellenir, süre uzatılır.
+- Mesaj paneli (msg_frame / lbl_message) ve manuel giriş kutusu da aynı fazda boyanır;
+  alarm bitince seviyenin sakin rengine döner.
+"""
+from __future__ import annotations
+
+import tkinter as tk
+from typing import Callable, Dict, Optional
+
+TICK_MS = 250
+
+# seviye: (yanıp sönme arka plan, yazı, sakin arka plan, sakin yazı, adım sayısı, öncelik)
+SEVIYELER: Dict[str, tuple] = {
+    "warning": ("#ffc107", "#212529", "#fff3cd", "#664d03", 6, 1),
+    "error": ("#ff0000", "white", "#f8d7da", "#842029", 6, 2),
+}
+
+
+class AlarmGosterici:
+    """
+    host: bandın üstüne yerleşeceği çerçeve (tablo çerçevesi)
+    widgets_fn() -> {"panel": frame|None, "label": label|None, "entry": entry|None}
+    (widget'lar her adımda okunur; tasarım değişince yeniden kurulanlar da boyanır)
+    """
+
+    def __init__(self, root: tk.Misc, host: tk.Widget, widgets_fn: Optional[Callable[[], dict]] = None) -> None:
+        self.root = root
+        self.host = host
+        self._widgets_fn = widgets_fn or (lambda: {})
+        self._banner: Optional[tk.Label] = None
+        self._after_id = None
+        self._level: Optional[str] = None
+        self._text = ""
+        self._step = 0
+        self._steps = 0
+        self.frames = 0
+        # kenarlık kalınlığı sabit tutulur (sadece rengi değişir): tablo yeniden yerleşmez
+        try:
+            self._host_bg = host.cget("bg")
+            host.configure(highlightthickness=4, highlightbackground=self._host_bg, highlightcolor=self._host_bg)
+        except Exception:
+            self._host_bg = None
+
+    # -------------------------------
+    # Dışarıdan
+    # -------------------------------
+    def show(self, level: str = "error", text: Optional[str] = None) -> None:
+        """Alarmı başlatır; sürmekte olan alarm varsa onunla birleştirir."""
+        if level not in SEVIYELER:
+            level = "error"
+        if self._level is None or SEVIYELER[level][5] >= SEVIYELER[self._level][5]:
+            self._level = level
+        if text:
+            self._text = text
+        if self._after_id is None:
+            self._step = 0
+            self._steps = SEVIYELER[self._level][4]
+            self._tick()
+            return
+        # sürmekte olan alarm: süre uzar (kalan adım en az seviyenin adım sayısı kadar)
+        self._steps = self._step + SEVIYELER[self._level][4]
+        if self._banner is not None and text:
+            try:
+                self._banner.configure(text=self._text)
+            except Exception:
+                pass
+
+    def active(self) -> bool:
+        return self._after_id is not None
+
+    def cancel(self) -> None:
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self._end()
+
+    # -------------------------------
+    # Animasyon
+    # -------------------------------
+    def _tick(self) -> None:
+        self._after_id = None
+        if self._step >= self._steps:
+            self._end()
+            return
+        on_bg, on_fg, rest_bg, rest_fg, _n, _p = SEVIYELER[self._level]
+        on = (self._step % 2 == 0)
+        self._paint(on_bg if on else rest_bg, on_fg if on else rest_fg, on)
+        self._step += 1
+        self.frames += 1
+        self._after_id = self.root.after(TICK_MS, self._tick)
+
+    def _paint(self, bg: str, fg: str, on: bool) -> None:
+        banner = self._ensure_banner()
+        if banner is not None:
+            try:
+                banner.configure(text=self._text, bg=bg, fg=fg)
+                banner.place(in_=self.host, relx=0, rely=0, relwidth=1, height=34)
+                banner.lift()
+            except Exception:
+                pass
+        if self._host_bg is not None:
+            try:
+                self.host.configure(highlightbackground=bg, highlightcolor=bg)
+            except Exception:
+                pass
+        self._paint_widgets(bg, fg, entry_on=on)
+
+    def _paint_widgets(self, bg: str, fg: str, entry_on: bool) -> None:
+        try:
+            w = self._widgets_fn() or {}
+        except Exception:
+            w = {}
+        panel, label, entry = w.get("panel"), w.get("label"), w.get("entry")
+        for wd, kw in ((panel, {"bg": bg}), (label, {"bg": bg, "fg": fg})):
+            if wd is not None:
+                try:
+                    wd.configure(**kw)
+                except Exception:
+                    pass
+        if entry is not None:
+            try:
+                if entry_on:
+                    entry.configure(bg=bg, fg=fg)
+                else:
+                    entry.configure(bg="white", fg="black")
+            except Exception:
+                pass
+
+    def _end(self) -> None:
+        level = self._level
+        self._level = None
+        self._step = self._steps = 0
+        if self._banner is not None:
+            try:
+                self._banner.place_forget()
+            except Exception:
+                pass
+        if self._host_bg is not None:
+            try:
+                self.host.configure(highlightbackground=self._host_bg, highlightcolor=self._host_bg)
+            except Exception:
+                pass
+        if level is not None:
+            _b, _f, rest_bg, rest_fg, _n, _p = SEVIYELER[level]
+            self._paint_widgets(rest_bg, rest_fg, entry_on=False)
+
+    def _ensure_banner(self) -> Optional[tk.Label]:
+        if self._banner is None:
+            try:
+                self._banner = tk.Label(self.host, text="", font=("Segoe UI", 12, "bold"), anchor="center")
+            except Exception:
+                self._banner = None
+        return self._banner
@@ -1,53 +1,107 @@
 '''
 Selsil Pro V6 - Ana Ekran (UI)
 Bu dosya operatör ekranını içerir ve diğer modülleri orkestre eder.
+
+Açılış kademeli: pencere önce çizilir; iş veritabanı (JobYonetimi + eski kayıt
+aktarımı), reject portu, scanner / yazıcı servisleri ve son iş ilk kareden sonra
+yüklenir. Arama / kolon pencereleri, yazıcı izleyicisi (asyncio) ve opsiyonel
+kütüphaneler (reportlab, segno, treepoem) ilk kullanıldıklarında import edilir.
+
+Açılış profili: SELSIL_PROFILE=1 (veya --profile) -> import ve açılış aşamalarının
+süreleri konsola ve logs/acilis_profili.txt dosyasına yazılır.
 '''
 from __future__ import annotations
+import time
+_T_START = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk, messagebox
 import tkinter.font as tkfont
 from datetime import datetime
 from collections import deque
-import time
 import unicodedata
 import os
 import sys
-import subprocess
-import socket
 import threading
 import json
 import code_parser
-import arama_penceresi
 from veri_yonetimi import VeriYonetimi
-from kolonlar_penceresi import KolonlarPenceresi
 from donanim_servisleri import DonanimServisleri
+from arama_indeksi import AramaIndeksi
+from tarama_gunlugu import TaramaGunlugu, ts_text
+from alarm_gosterici import AlarmGosterici
+from ses_motoru import SesMotoru, arka_sec
+from donma_bekcisi import DonmaBekcisi
+from profil_araci import ProfilOturumu
+from hiz_olcer import HizOlcer
+import gunluk
 from yetkili_paneli import YetkiliPaneli
+_T_IMPORTS = time.perf_counter()
+_log_ui = gunluk.al("ui")
+_log_db = gunluk.al("db")
+
+PROFILE_BOOT = os.environ.get("SELSIL_PROFILE", "") not in ("", "0") or "--profile" in sys.argv
+
+
+def _safe_cell(v) -> str:
+    """Tablo hücresi metni: Tcl/Tk NUL ve kontrol karakterleri sorun çıkarabiliyor
+    (GS1 ayırıcı 29 hariç temizlenir)."""
+    try:
+        s = "" if v is None else str(v)
+        out = []
+        for ch in s:
+            o = ord(ch)
+            if o == 29:  # GS1 ayırıcı kalsın
+                out.append(ch); continue
+            # C0 control range (NUL dahil)
+            if o < 32:
+                continue
+            out.append(ch)
+        return "".join(out)
+    except Exception:
+        return "" if v is None else str(v)
+
+
 class AnaEkran:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, resume_last_job: bool = True, live_devices: bool = True):
         self.root = root
+        # False: açılışta "son işe devam" sorulmaz (soak testi gibi gözetimsiz çalıştırmalar)
+        self._resume_last_job = resume_last_job
+        # False: reject portu açılmaz, canlı scanner dinlenmez (kayıt tekrarı)
+        self._live_devices = live_devices
         self.root.title("Selsil Pro V6 - Endüstriyel Modüler Yapı")
         self.root.geometry("1200x900")
         self.root.configure(bg="#f0f0f0")
         self._kaydet_win = None
+        # Açılış profili (aşama adı, perf_counter)
+        self._boot_marks: list[tuple[str, float]] = [("import", _T_IMPORTS)]
         # Veri
         self.work_list: list[dict] = []
         self.box_label_list: list[str] = []
         self.verified_count = 0
-        self._scan_times = deque(maxlen=600)
+        # okuma hızı: saniye kovaları + 10 sn / 1 dk / 15 dk EWMA (sabit bellek)
+        self.hiz = HizOlcer()
+        self._speed_text = "HIZ"
+        self._speed_tick_id = None
+        # okuma gecikmesi (ms): soketten alınma -> işleme bitişi (son 2000 okuma)
+        self.scan_latency = deque(maxlen=2000)
         self._last_eta_update = 0.0
         # Gauge animasyon değerleri
         self._g_fill_val = 0.0
         self._g_fill_target = 0.0
         self._g_speed_val = 0.0
         self._g_speed_target = 0.0
+        self._gauge_anim_id = None
+        # Birleştirilmiş UI yenileme (kirli bölgeler + tek kare)
+        self._ui_dirty = set()
+        self._ui_frame_id = None
+        self._ui_last_frame = 0.0
+        self._ui_applied = {}
+        self._ui_box = {}
         self.items_per_box = 0
         self.current_file = "YeniIs"
-        # Job sistemi (kaldığın yerden devam)
+        # Job sistemi (kaldığın yerden devam) - ilk kareden sonra arka planda kurulur
         self.current_job_id = None
-        try:
-            self.job_manager = JobYonetimi()
-        except Exception:
-            self.job_manager = None
+        self.job_manager = None
         self.next_print_info = {"box_num": 1, "label": "-"}
         self.var_short_code = tk.IntVar(value=0)
         # Yazdırma aktif/pasif
@@ -62,12 +116,26 @@ class AnaEkran:
         self.last_scan_text = ""
         # Scanner raporu (tekrar / listede yok / okunamadı)
         # Her kayıt: dict(ts, type, barcode, row_id, box, message)
-        self.scan_report: list[dict] = []
+        # Scanner olay günlüğü: bellekte halka + iş başına disk dosyası
+        self.scan_log = TaramaGunlugu()
+        # Sesli geri bildirim: ayrı çalma thread'i (arka uç ayarlar yüklenince seçilir)
+        self.sound = SesMotoru(lambda: arka_sec(self.veri.settings.get("sound_backend", "auto"), self.root))
+        # Ana döngü donma bekçisi (ilk kareden sonra başlar; logs/donmalar.log)
+        self.stall_watch = None
+        # İsteğe bağlı profil (Yönetici Paneli > Profil); kapalıyken hiçbir şey açık değil
+        self.profiler = ProfilOturumu(self.root)
 
         # Yazıcı bağlantı kontrol cache (UI rozetleri için)
         # None: bilinmiyor, True: bağlı, False: bağlı değil
         self._printer_state = {"box": None, "prod": None, "prod2": None}
-        self._printer_check_inflight = False
+        # Arama indeksi: arama penceresi ilk açıldığında kurulur, okumalarla güncellenir
+        self.search_index = AramaIndeksi()
+        # ID -> work_list satırı / tablo iid haritaları (refresh_table ile güncel)
+        self._row_by_id = {}
+        self._row_map_src = None
+        self._row_map_len = -1
+        self._iid_by_id = {}
+        self._row_by_iid = {}
         # Servisler
         self.veri = VeriYonetimi(app=self)
         self.donanim = DonanimServisleri(app=self)
@@ -84,6 +152,7 @@ class AnaEkran:
         # DB + ayar yükle
         self.veri.init_db()
         self.veri.load_settings()
+        gunluk.kur(self.veri.settings)
         self.var_short_code.set(self.veri.settings.get("short_code", 0))
         self.var_date_required.set(int(self.veri.settings.get("date_required", 0)))
         self.var_prod_date.set(self.veri.settings.get("production_date", ""))
@@ -95,19 +164,120 @@ class AnaEkran:
             self.apply_design_from_settings()
         except Exception:
             pass
-        # Reject + son iş
-        self.donanim.init_rejector()
+        self._boot_mark("ui")
         try:
             self.update_ui()
         except Exception:
             pass
-        self.veri.load_last_job()
-        # Scanner thread
-        self.donanim.start_scanner_listener()
+        # Pencere önce çizilsin; servisler ve veritabanı ilk kareden sonra
+        self.root.after(0, lambda: self.root.after_idle(self._boot_stage2))
 
-        # Yazıcı rozetleri: gerçek bağlantı kontrolünü periyodik yap
+    # ---------------- Kademeli açılış ----------------
+    def _boot_mark(self, name: str):
+        self._boot_marks.append((name, time.perf_counter()))
+
+    def _boot_stage2(self):
+        """İlk kare çizildikten sonra: servisler + reject portu + iş veritabanı."""
+        self._boot_mark("first_frame")
+        # Reject: port worker thread'de açılır, sonuç gelince rozet + uyarı
+        try:
+            if self._live_devices:
+                self.donanim.init_rejector(on_ready=self._on_reject_ready)
+            else:
+                self.donanim.reject_user_enabled = False
+        except Exception:
+            pass
+        # Yazıcı rozetleri: izleyici (~HS) durum değişince olay gönderir
         # (IP yazılmış olsa bile kablo yoksa kırmızı gösterir.)
-        self._start_device_badge_loop()
+        # Her servis ayrı korunur: biri (ör. kilitli DB) açılmazsa iş veritabanı ve scanner yine açılsın
+        try:
+            self.donanim.start_printer_monitor()
+        except Exception:
+            _log_ui.exception("Yazıcı izleyici başlatılamadı")
+        try:
+            self.donanim.start_print_spooler()
+        except Exception:
+            _log_ui.exception("Yazdırma kuyruğu başlatılamadı")
+        try:
+            self._start_device_badge_loop()
+        except Exception:
+            _log_ui.exception("Cihaz rozet döngüsü başlatılamadı")
+        # ses: çalma thread'i + ton tamponları (ilk okumada sentez beklenmesin)
+        try:
+            self.sound.warm()
+        except Exception:
+            _log_ui.exception("Ses motoru hazırlanamadı")
+        try:
+            self.stall_watch = DonmaBekcisi(self.root, float(self.veri.settings.get("stall_ms", 250) or 250)).start()
+        except Exception:
+            self.stall_watch = None
+        self._boot_mark("services")
+
+        # JobYonetimi (tablolar / arama indeksi / eski kayıt aktarımı) arka planda
+        def _open_jobs():
+            jm = None
+            try:
+                from job_yonetimi import JobYonetimi
+                jm = JobYonetimi()
+            except Exception:
+                jm = None
+            try:
+                self.root.after(0, lambda: self._boot_stage3(jm))
+            except Exception:
+                pass
+
+        threading.Thread(target=_open_jobs, name="JobYonetimiAcilis", daemon=True).start()
+
+    def _boot_stage3(self, jm):
+        """İş veritabanı hazır: son işi sor / yükle, sonra scanner'ı dinle."""
+        self._boot_mark("job_db")
+        if self.job_manager is None:
+            self.job_manager = jm
+        try:
+            if self._resume_last_job:
+                self.veri.load_last_job()
+        except Exception:
+            pass
+        self._boot_mark("last_job")
+        # Scanner thread (iş listesi yüklendikten sonra; okumalar boş listeye düşmesin)
+        if self._live_devices:
+            self.donanim.start_scanner_listener()
+        self._start_legacy_migration()
+        if PROFILE_BOOT:
+            self._write_boot_profile()
+
+    def _start_legacy_migration(self):
+        """Eski kayıtların Job V2'ye aktarımı (bir kez, arka planda; yarıda kalırsa devam eder)."""
+        from job_yonetimi import start_legacy_migration
+
+        last = [0.0]
+
+        def _progress(done, total):
+            now = time.monotonic()
+            if done < total and now - last[0] < 0.5:
+                return
+            last[0] = now
+            msg = f"Eski kayıtlar aktarılıyor... {done}/{total}"
+            self.root.after(0, lambda: self.lbl_message.configure(text=msg))
+
+        def _done(ok):
+            if ok:
+                self.root.after(0, lambda: self.lbl_message.configure(text="Eski kayıt aktarımı tamamlandı."))
+
+        try:
+            self._legacy_migration = start_legacy_migration(on_progress=_progress, on_done=_done)
+        except Exception:
+            self._legacy_migration = None
+
+    def _on_reject_ready(self):
+        self._boot_mark("reject")
+        try:
+            self.update_ui()
+        except Exception:
+            pass
+        self._warn_reject_if_inactive()
+
+    def _warn_reject_if_inactive(self):
         # Reject uyarısı (sadece kullanıcı REJECT'i açık bıraktıysa ve gerçekten aktif değilse)
         try:
             enabled = bool(self.var_reject_enabled.get())
@@ -117,8 +287,8 @@ class AnaEkran:
                 reason = getattr(rejector, "last_error", None) if rejector else None
                 ports = []
                 try:
-                    if rejector and hasattr(rejector, "available_ports"):
-                        ports = rejector.available_ports()
+                    if rejector:
+                        ports = list(getattr(rejector, "known_ports", []) or [])
                 except Exception:
                     ports = []
                 if reason == "PYSerialMissing":
@@ -130,6 +300,24 @@ class AnaEkran:
                 self.root.after(1000, lambda m=msg: messagebox.showwarning("Sistem", m))
         except Exception:
             pass
+
+    def _write_boot_profile(self):
+        """Açılış aşama süreleri (ms): ui günlüğü + logs/acilis_profili.txt"""
+        lines = [f"Selsil Pro açılış profili - {datetime.now():%Y-%m-%d %H:%M:%S}"]
+        prev = _T_START
+        for name, ts in self._boot_marks:
+            lines.append(f"  {name:<12} +{(ts - prev) * 1000.0:8.1f} ms   (toplam {(ts - _T_START) * 1000.0:8.1f} ms)")
+            prev = ts
+        lines.append("  (modül bazında import süreleri: python -X importtime ana_ekran.py)")
+        text = "\n".join(lines)
+        _log_ui.info(text)
+        try:
+            os.makedirs(gunluk.LOG_DIR, exist_ok=True)
+            with open(os.path.join(gunluk.LOG_DIR, "acilis_profili.txt"), "a", encoding="utf-8") as f:
+                f.write(text + "\n\n")
+        except Exception:
+            pass
+
     # ---------------- UI ----------------
     def _setup_ui(self):
         # Root layout
@@ -499,6 +687,9 @@ class AnaEkran:
         self.tree.grid(row=0, column=0, sticky="nsew")
         vsb.grid(row=0, column=1, sticky="ns")
         hsb.grid(row=1, column=0, sticky="ew")
+        # Alarm: tablonun üstünde bant + kenarlık (tablo stili değiştirilmez)
+        self.table_holder = table_holder
+        self.alarm_view = AlarmGosterici(self.root, table_holder, self._alarm_widgets)
 
         # Sağ tık menüsü (gelişmiş)
         self.context_menu = tk.Menu(self.root, tearoff=0)
@@ -562,6 +753,50 @@ class AnaEkran:
             pass
 
 
+        # ---------------- ID -> satır / tablo haritası ----------------
+    @staticmethod
+    def _id_key(v) -> str:
+        s = "" if v is None else str(v).strip()
+        try:
+            return str(int(s))
+        except Exception:
+            return s
+
+    def get_item_by_id(self, item_id):
+        """ID'si verilen work_list satırı (O(1)). Liste değiştiyse harita yeniden kurulur."""
+        wl = self.work_list
+        if self._row_map_src is not wl or self._row_map_len != len(wl):
+            m = {}
+            for it in wl:
+                if isinstance(it, dict):
+                    m.setdefault(self._id_key(it.get('id')), it)
+            self._row_by_id, self._row_map_src, self._row_map_len = m, wl, len(wl)
+        return self._row_by_id.get(self._id_key(item_id))
+
+    def get_tree_iid(self, item_id):
+        """ID'si verilen satırın ana tablodaki iid'si (tabloda yoksa None)."""
+        iid = self._iid_by_id.get(self._id_key(item_id))
+        if iid is not None and self.tree.exists(iid):
+            return iid
+        return None
+
+    def goto_row_id(self, item_id) -> bool:
+        """Ana tabloda ID'si verilen satırı seçip görünür yapar."""
+        iid = self.get_tree_iid(item_id)
+        if iid is None:
+            return False
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        self.tree.see(iid)
+        return True
+
+    def _selected_item(self):
+        """Tabloda seçili satırın work_list kaydı (yoksa None)."""
+        sel = self.tree.selection()
+        if not sel:
+            return None
+        return self._row_by_iid.get(sel[0])
+
         # ---------------- Print selected (Context Menu) ----------------
     def _get_selected_barcode(self):
         """Seçili satırdan Barkod kolonunu döndürür (yoksa None)."""
@@ -569,6 +804,10 @@ class AnaEkran:
             sel = self.tree.selection()
             if not sel:
                 return None
+            it = self._row_by_iid.get(sel[0])
+            if it is not None:
+                code = _safe_cell(it.get('raw_disp', it.get('raw'))).strip()
+                return code if code and code != '-' else None
             iid = sel[0]
             vals = self.tree.item(iid, 'values') or []
             cols = list(self.tree['columns'])
@@ -584,12 +823,29 @@ class AnaEkran:
         except Exception:
             return None
 
+    def _selected_sticky_key(self):
+        """Seçili satırın yazıcı grubu sıra anahtarı: "<iş>|<koli>" (koli yoksa None)."""
+        try:
+            sel = self.tree.selection()
+            it = self._row_by_iid.get(sel[0]) if sel else None
+            box = str((it or {}).get('box', '') or '').strip()
+            job = self.current_job_id or self.current_file
+            if not box or box == '-' or not job:
+                return None
+            return f"{job}|{box}"
+        except Exception:
+            return None
+
     def _get_selected_box_label(self):
         """Seçili satırdan 'Koli Etiketi' kolonunu döndürür (yoksa None)."""
         try:
             sel = self.tree.selection()
             if not sel:
                 return None
+            it = self._row_by_iid.get(sel[0])
+            if it is not None:
+                code = _safe_cell(it.get('label')).strip()
+                return code if code and code != '-' else None
             iid = sel[0]
             vals = self.tree.item(iid, 'values') or []
             cols = list(self.tree['columns'])
@@ -630,6 +886,8 @@ class AnaEkran:
                 self._menu_print_prod.add_command(label="Zebra ZT411-2 (Yedek)", command=lambda: self._print_selected("prod2"))
             else:
                 self._menu_print_prod.add_command(label="Zebra ZT411-2 (Yedek)  (IP yok)", state="disabled")
+            if prod_ip and prod2_ip:
+                self._menu_print_prod.add_command(label="Ürün Yazıcı Grubu (otomatik)", command=lambda: self._print_selected("prod_group"))
 
             # Box etiketi yazdır
             box_ip = str(s.get("box_ip", "") or "").strip()
@@ -1025,7 +1283,11 @@ class AnaEkran:
         try:
             # Donanım servisleri üzerinden yazdır
             if hasattr(self, 'donanim') and hasattr(self.donanim, 'print_label'):
-                self.donanim.print_label(code, 'box' if target=='box' else 'prod', target_printer=target)
+                # yazıcı grubunda aynı kolinin ürün etiketleri aynı yazıcıya (sıra korunur)
+                sticky = None
+                if target == 'prod_group':
+                    sticky = self._selected_sticky_key()
+                self.donanim.print_label(code, 'box' if target=='box' else 'prod', target_printer=target, sticky_key=sticky)
                 return
         except Exception as ex:
             try:
@@ -1107,6 +1369,7 @@ class AnaEkran:
     # ---------------- Search Window ----------------
     def open_search_window(self):
         try:
+            import arama_penceresi
             arama_penceresi.open_arama_penceresi(self)
         except Exception as ex:
             from tkinter import messagebox
@@ -1123,10 +1386,8 @@ class AnaEkran:
             if hasattr(self, "yetkili") and hasattr(self.yetkili, "open_settings_window"):
                 self.yetkili.open_settings_window()
                 return
-        except Exception as e:
-            import traceback
-            print("[HATA] open_settings:", e)
-            traceback.print_exc()
+        except Exception:
+            _log_ui.exception("Ayarlar penceresi açılamadı")
         try:
             from tkinter import messagebox
             messagebox.showerror("Hata", "Ayarlar penceresi açılamadı.")
@@ -1139,10 +1400,8 @@ class AnaEkran:
             if hasattr(self, "yetkili") and hasattr(self.yetkili, "open_yonetici_paneli"):
                 self.yetkili.open_yonetici_paneli()
                 return
-        except Exception as e:
-            import traceback
-            print("[HATA] open_admin_panel:", e)
-            traceback.print_exc()
+        except Exception:
+            _log_ui.exception("Yönetici paneli açılamadı")
         try:
             from tkinter import messagebox
             messagebox.showerror("Hata", "Yönetici paneli açılamadı.")
@@ -1159,10 +1418,8 @@ class AnaEkran:
             top.grab_set()
             ZebraApp(top)
             return
-        except Exception as e:
-            import traceback
-            print("[HATA] open_on_hazirlik:", e)
-            traceback.print_exc()
+        except Exception:
+            _log_ui.exception("Ön Hazırlık penceresi açılamadı")
         try:
             from tkinter import messagebox
             messagebox.showerror("Hata", "Ön Hazırlık penceresi açılamadı.")
@@ -1176,6 +1433,40 @@ class AnaEkran:
                 self.veri.save_settings()
         except Exception:
             pass
+        try:
+            self.veri.cancel_export()
+        except Exception:
+            pass
+        try:
+            self.donanim.shutdown()
+        except Exception:
+            pass
+        try:
+            # aktarım yarıda kalırsa bir sonraki açılışta kaldığı yerden devam eder
+            mig = getattr(self, "_legacy_migration", None)
+            if mig:
+                mig[1].set()
+        except Exception:
+            pass
+        try:
+            self.scan_log.close()
+        except Exception:
+            pass
+        try:
+            self.sound.stop()
+        except Exception:
+            pass
+        try:
+            if self.stall_watch is not None:
+                self.stall_watch.stop()
+        except Exception:
+            pass
+        try:
+            # yarıda kalan profil de yazılsın
+            self.profiler.stop()
+        except Exception:
+            pass
+        gunluk.kapat()
         try:
             self.root.quit()
         except Exception:
@@ -1268,9 +1559,9 @@ class AnaEkran:
                     except Exception:
                         pass
                 elif name in ('box', 'prod', 'prod2'):
-                    # yazıcı socket ping
+                    # yazıcı izleyicisine hemen yoklat
                     try:
-                        self._kick_printer_checks()
+                        self.donanim.poke_printer(name)
                     except Exception:
                         pass
                 else:
@@ -1410,6 +1701,8 @@ class AnaEkran:
             self._apply_dashboard_colors(is_dark)
         except Exception:
             pass
+        # tema widget renklerini değiştirdi: sayaç / koli panelini baştan uygula
+        self.invalidate_ui()
 
     def _set_bg_recursive(self, widget, bg: str):
         try:
@@ -1481,6 +1774,10 @@ class AnaEkran:
                         v["lbl_count"].configure(bg=bg, fg=kalan_fg)
                     except Exception:
                         pass
+                    try:
+                        v["lbl_parts"].configure(bg=bg, fg=txt_secondary)
+                    except Exception:
+                        pass
                     try:
                         v["canvas_fill"].configure(bg=bg)
                         v["canvas_speed"].configure(bg=bg)
@@ -1595,7 +1892,9 @@ class AnaEkran:
             lbl_eta = tk.Label(frame, text="TAHMİNİ BİTİŞ: --:--", bg="#0b0f14", fg="#60a5fa", font=fnt_eta)
             lbl_eta.pack(anchor="center", pady=(0, 2))
             lbl_count = tk.Label(frame, text="KALAN: --:--:--", bg="#0b0f14", fg="#f59e0b", font=fnt_kalan)
-            lbl_count.pack(anchor="center", pady=(0, 8))
+            lbl_count.pack(anchor="center", pady=(0, 2))
+            lbl_parts = tk.Label(frame, text="", bg="#0b0f14", fg="#9ca3af", font=fnt_kalan)
+            lbl_parts.pack(anchor="center", pady=(0, 8))
 
             # Alt: gauge'lar
             g_row = tk.Frame(frame, bg="#0b0f14")
@@ -1619,6 +1918,7 @@ class AnaEkran:
                 "lbl_status": lbl_status,
                 "lbl_eta": lbl_eta,
                 "lbl_count": lbl_count,
+                "lbl_parts": lbl_parts,
                 "canvas_fill": c1,
                 "canvas_speed": c2,
             }
@@ -1644,16 +1944,13 @@ class AnaEkran:
             self.lbl_dash_status = self._dash_variants[mode]["lbl_status"]
             self.lbl_eta = self._dash_variants[mode]["lbl_eta"]
             self.lbl_countdown = self._dash_variants[mode]["lbl_count"]
+            self.lbl_eta_parts = self._dash_variants[mode]["lbl_parts"]
             self.canvas_fill = self._dash_variants[mode]["canvas_fill"]
             self.canvas_speed = self._dash_variants[mode]["canvas_speed"]
 
-            # gauge loop başlat
-            if not getattr(self, "_gauges_started", False):
-                self._gauges_started = True
-                try:
-                    self._draw_gauges()
-                except Exception:
-                    pass
+            # yeni canvas'lar: bir kez çiz (animasyon sadece değer değişirken döner)
+            self._kick_gauges(force=True)
+            self.invalidate_ui()
 
             if persist:
                 try:
@@ -1701,37 +1998,76 @@ class AnaEkran:
         except Exception:
             pass
 
+    GAUGE_EPS = 0.002
+
+    def _kick_gauges(self, force: bool = False):
+        """Hedef değiştiyse gauge animasyonunu başlatır (boşta canvas çizilmez)."""
+        if self._gauge_anim_id is not None:
+            return
+        if not force and (abs(self._g_fill_target - self._g_fill_val) < self.GAUGE_EPS
+                          and abs(self._g_speed_target - self._g_speed_val) < self.GAUGE_EPS):
+            return
+        try:
+            self._gauge_anim_id = self.root.after(0, self._draw_gauges)
+        except Exception:
+            self._gauge_anim_id = None
+
     def _draw_gauges(self):
-        """Gauge animasyonu: hedefe doğru yumuşak geçiş."""
+        """Gauge animasyonu: hedefe doğru yumuşak geçiş; hedefe varınca durur."""
+        self._gauge_anim_id = None
+        done = False
         try:
             # easing
             self._g_fill_val += (self._g_fill_target - self._g_fill_val) * 0.22
             self._g_speed_val += (self._g_speed_target - self._g_speed_val) * 0.22
+            if (abs(self._g_fill_target - self._g_fill_val) < self.GAUGE_EPS
+                    and abs(self._g_speed_target - self._g_speed_val) < self.GAUGE_EPS):
+                self._g_fill_val = self._g_fill_target
+                self._g_speed_val = self._g_speed_target
+                done = True
 
             self._draw_ring(self.canvas_fill, self._g_fill_val, 'KOLI')
-            self._draw_ring(self.canvas_speed, self._g_speed_val, 'HIZ')
+            self._draw_ring(self.canvas_speed, self._g_speed_val, self._speed_text)
         except Exception:
-            pass
-        try:
-            self.root.after(50, self._draw_gauges)
-        except Exception:
-            pass
+            done = True
+        if not done:
+            try:
+                self._gauge_anim_id = self.root.after(50, self._draw_gauges)
+            except Exception:
+                pass
 
     def _update_speed_gauge(self):
-        """Son 60 sn içindeki okutma sayısına göre dakika hızı."""
+        """Son 10 sn EWMA'ya göre dakika hızı; tam ölçek ayarlar.json "speed_gauge_max" (okuma/dk)."""
         try:
-            now = time.time()
-            # eski kayıtları temizle
-            while self._scan_times and (now - self._scan_times[0]) > 60:
-                self._scan_times.popleft()
-            spm = len(self._scan_times)  # son 60 sn = /dk
-            # 0..60+ -> 0..1 normalize (60/dk üstü 1'e sabitle)
-            self._g_speed_target = max(0.0, min(1.0, spm / 60.0))
+            try:
+                scale = float(self.veri.settings.get("speed_gauge_max", 600) or 600)
+            except Exception:
+                scale = 600.0
+            spm = self.hiz.per_min(10)
+            self._g_speed_target = max(0.0, min(1.0, spm / max(1.0, scale)))
+            text = f"{int(round(spm))}/dk"
+            if text != self._speed_text:
+                self._speed_text = text
+                self._kick_gauges(force=True)
+            # hat durunca da gösterge / ETA sönümlensin: hız varken saniyede bir yenile
+            if self._speed_tick_id is None and self.hiz.per_min(60) >= 0.5:
+                self._speed_tick_id = self.root.after(1000, self._speed_tick)
         except Exception:
             pass
 
+    def _speed_tick(self):
+        self._speed_tick_id = None
+        self.mark_ui_dirty("speed")
+
+    @staticmethod
+    def _fmt_sec(sec) -> str:
+        if sec is None:
+            return "--:--:--"
+        sec = int(sec)
+        return f"{sec // 3600:02d}:{(sec % 3600) // 60:02d}:{sec % 60:02d}"
+
     def _update_eta(self):
-        """Basit ETA: (kalan / hız)"""
+        """ETA: iş (15 dk hız), koli ve palet (1 dk hız); hat durduysa (1 dk hız ~0) boş."""
         try:
             now = time.time()
             if (now - float(getattr(self, '_last_eta_update', 0.0))) < 1.0:
@@ -1742,24 +2078,33 @@ class AnaEkran:
             done = int(getattr(self, 'verified_count', 0) or 0)
             remaining = max(0, total - done)
 
-            # hız (son 60 sn)
-            if self._scan_times:
-                rate_per_min = len(self._scan_times)
-            else:
-                rate_per_min = 0
-            if rate_per_min <= 0:
+            if self.hiz.per_min(60) < 0.5:
                 self.lbl_eta.config(text='TAHMİNİ BİTİŞ: --:--')
                 self.lbl_countdown.config(text='KALAN: --:--:--')
+                if hasattr(self, 'lbl_eta_parts'):
+                    self.lbl_eta_parts.config(text='')
                 return
 
-            minutes_left = remaining / max(1, rate_per_min)
-            sec_left = int(round(minutes_left * 60))
-            eta_dt = datetime.fromtimestamp(now + sec_left)
-            self.lbl_eta.config(text=f'TAHMİNİ BİTİŞ: {eta_dt.strftime("%H:%M")}')
-            hh = sec_left // 3600
-            mm = (sec_left % 3600) // 60
-            ss = sec_left % 60
-            self.lbl_countdown.config(text=f'KALAN: {hh:02d}:{mm:02d}:{ss:02d}')
+            sec_left = self.hiz.eta(remaining, 900)
+            if sec_left is None:
+                self.lbl_eta.config(text='TAHMİNİ BİTİŞ: --:--')
+            else:
+                eta_dt = datetime.fromtimestamp(now + sec_left)
+                self.lbl_eta.config(text=f'TAHMİNİ BİTİŞ: {eta_dt.strftime("%H:%M")}')
+            self.lbl_countdown.config(text=f'KALAN: {self._fmt_sec(sec_left)}')
+
+            # koli / palet: o anki kolinin (paletin) dolmasına kalan adet
+            parts = []
+            items_per_box = int(self.items_per_box or 0)
+            if items_per_box > 0 and remaining > 0:
+                left = min(remaining, items_per_box - done % items_per_box)
+                parts.append(f'KOLİ: {self._fmt_sec(self.hiz.eta(left, 60))}')
+            palet_icerik = int(getattr(self, 'palet_icerik', 0) or 0)  # palet başına ürün adedi
+            if palet_icerik > 0 and remaining > 0:
+                left = min(remaining, palet_icerik - done % palet_icerik)
+                parts.append(f'PALET: {self._fmt_sec(self.hiz.eta(left, 60))}')
+            if hasattr(self, 'lbl_eta_parts'):
+                self.lbl_eta_parts.config(text='   '.join(parts))
         except Exception:
             pass
     def _sync_date_ui(self):
@@ -1829,39 +2174,12 @@ class AnaEkran:
         except Exception:
             return False
     
-    def _flash_message(self, target_bg: str, target_fg: str, flashes: int = 3, interval_ms: int = 250):
-        """Flash the message panel between its current colors and a target color.
-        Ends by restoring the original colors."""
-        # Cancel any previous flashes
-        try:
-            for job_id in getattr(self, "_flash_job_ids", []):
-                try:
-                    self.root.after_cancel(job_id)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        self._flash_job_ids = []
-        orig_bg = self.msg_frame.cget("bg")
-        orig_fg = self.lbl_message.cget("fg")
-        orig_lbl_bg = self.lbl_message.cget("bg")
-        steps = flashes * 2  # on/off pairs
-        def apply(bg, fg):
-            self.msg_frame.configure(bg=bg)
-            self.lbl_message.configure(bg=bg, fg=fg)
-        def tick(i: int):
-            if i >= steps:
-                # restore
-                self.msg_frame.configure(bg=orig_bg)
-                self.lbl_message.configure(bg=orig_lbl_bg, fg=orig_fg)
-                return
-            if i % 2 == 0:
-                apply(target_bg, target_fg)
-            else:
-                apply(orig_bg, orig_fg)
-            job = self.root.after(interval_ms, lambda: tick(i + 1))
-            self._flash_job_ids.append(job)
-        tick(0)
+    def _alarm_widgets(self):
+        return {
+            "panel": getattr(self, "msg_frame", None),
+            "label": getattr(self, "lbl_message", None),
+            "entry": getattr(self, "manual_entry", None),
+        }
     def show_alert(self, message: str, status: str):
         # Keep the text visible; for warning/error we "flash" the panel 3 times and then restore.
         if status == 'success':
@@ -1880,10 +2198,11 @@ class AnaEkran:
             self._set_light("red")
             self._play_tone("err")
             # Alarm only on error (red)
-            self.donanim.trigger_full_alarm()
-        # Set text first, then flash the panel (3 times)
+            # Reject anı, scan'in socket'ten alındığı andan hesaplanır
+            self.donanim.trigger_full_alarm(scan_ts=getattr(self, "_scan_recv_ts", None))
+        # Set text first, then flash (banner + border + panel; overlapping alarms share one timer)
         self.lbl_message.configure(text=message)
-        self._flash_message(bg_color, fg_color, flashes=3, interval_ms=250)
+        self.alarm_view.show("warning" if status == 'warning' else "error", message)
     # ---------------- Core barcode flow ----------------
     def _require_date_if_needed(self) -> bool:
         if not self.var_date_required.get():
@@ -1905,42 +2224,16 @@ class AnaEkran:
         }
         self.lbl_light.config(fg=colors.get(color, "#adb5bd"))
     def _play_tone(self, kind: str):
-            """Duruma göre güçlü bip sesi üretir.
-            ok   : Yeşil / başarılı okuma
-            dup  : Sarı  / tekrarlı okuma
-            err  : Kırmızı / listede yok veya hata
-            """
-            try:
-                import winsound
-            except Exception:
-                winsound = None
-    
-            def _bell():
-                try:
-                    self.root.bell()
-                except Exception:
-                    pass
-    
-            if not winsound:
-                return _bell()
-    
-            # Güçlü ve ayırt edilebilir tonlar
-            if kind == "ok":
-                # BİP BİP (güçlü)
-                winsound.Beep(2000, 130)
-                winsound.Beep(2000, 130)
-            elif kind == "dup":
-                # farklı güçlü desen (3 kısa)
-                winsound.Beep(1400, 90)
-                winsound.Beep(1400, 90)
-                winsound.Beep(900, 120)
-            elif kind == "err":
-                # düşük + uzun uyarı
-                winsound.Beep(500, 220)
-                winsound.Beep(350, 260)
-            else:
-                winsound.Beep(1200, 120)
-    
+        """Duruma göre bip sesi (ses_motoru kuyruğuna ekler, beklemez).
+        ok   : Yeşil / başarılı okuma
+        dup  : Sarı  / tekrarlı okuma
+        err  : Kırmızı / listede yok veya hata
+        """
+        try:
+            self.sound.play(kind)
+        except Exception:
+            pass
+
     def _update_code_status(self, info, result_tag: str | None = None):
         """Üst barda kod türü ve meta bilgiyi gösterir.
         result_tag: success|warning|error (opsiyonel)
@@ -2002,30 +2295,46 @@ class AnaEkran:
                 continue
             out.append(ch)
         return "".join(out).strip()
-    def _log_scan(self, typ: str, barcode: str, row_id=None, box=None, message: str = ""):
-        self.scan_report.append({
-            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "type": typ,
-            "barcode": barcode,
-            "row_id": row_id,
-            "box": box,
-            "message": message,
-        })
-        # Çok büyümesin
-        if len(self.scan_report) > 3000:
-            self.scan_report = self.scan_report[-2000:]
-
-        # mini rapor tablosunu güncelle (varsa)
-        if hasattr(self, "scan_tree") and self.scan_tree.winfo_exists():
-            try:
-                for iid in self.scan_tree.get_children():
-                    self.scan_tree.delete(iid)
-                last = self.scan_report[-7:]
-                for i, it in enumerate(last, start=max(1, len(self.scan_report) - len(last) + 1)):
-                    msg = f"{it.get('type','')} | {it.get('barcode','')} {it.get('message','')}".strip()
-                    self.scan_tree.insert("", "end", values=(i, msg))
-            except Exception:
-                pass
+    SCAN_VIEW_ROWS = 7
+
+    def _scan_log_job(self):
+        """Olayların yazılacağı iş dosyası (job_v2 varsa job_id, yoksa dosya adı)."""
+        try:
+            self.scan_log.set_job(getattr(self, "current_job_id", None) or getattr(self, "current_file", None))
+        except Exception:
+            pass
+
+    def _log_scan(self, typ: str, barcode: str, row_id=None, box=None, message: str = "", view: bool = True):
+        self._scan_log_job()
+        rec = self.scan_log.append(typ, barcode, row_id=row_id, box=box, message=message)
+        if view:
+            self._scan_view_add(rec)
+
+    @staticmethod
+    def _scan_view_text(rec) -> str:
+        return f"{rec[2]} | {rec[3]} {rec[6]}".strip()
+
+    def _scan_view_add(self, rec):
+        """Mini rapor tablosu: yeni satırı ekle, en eskiyi at (tabloyu yeniden kurma)."""
+        if not (hasattr(self, "scan_tree") and self.scan_tree.winfo_exists()):
+            return
+        try:
+            self.scan_tree.insert("", "end", values=(rec[0], self._scan_view_text(rec)))
+            children = self.scan_tree.get_children()
+            if len(children) > self.SCAN_VIEW_ROWS:
+                self.scan_tree.delete(*children[:len(children) - self.SCAN_VIEW_ROWS])
+        except Exception:
+            pass
+
+    def _scan_view_reload(self):
+        if not (hasattr(self, "scan_tree") and self.scan_tree.winfo_exists()):
+            return
+        try:
+            self.scan_tree.delete(*self.scan_tree.get_children())
+            for rec in self.scan_log.last(self.SCAN_VIEW_ROWS):
+                self.scan_tree.insert("", "end", values=(rec[0], self._scan_view_text(rec)))
+        except Exception:
+            pass
     def open_scanner_report_window(self):
         win = tk.Toplevel(self.root)
         win.title("Scanner Raporu (Tekrar / Listede Yok / Hata)")
@@ -2033,10 +2342,22 @@ class AnaEkran:
         top = tk.Frame(win)
         top.pack(fill="x", padx=10, pady=8)
         tk.Label(top, text="Kayıtlar:", font=("Segoe UI", 10, "bold")).pack(side="left")
+        page_size = 500
+        state = {"page": 0}
         def clear():
-            self.scan_report.clear()
-            refresh()
+            if not messagebox.askyesno("Onay", "Rapor temizlensin mi? (Mevcut kayıt dosyası arşivlenir)", parent=win):
+                return
+            self.scan_log.clear()
+            self._scan_view_reload()
+            show_page(0)
         tk.Button(top, text="Temizle", command=clear).pack(side="right")
+        tk.Button(top, text="Yenile", command=lambda: show_page(state["page"])).pack(side="right", padx=6)
+        btn_next = tk.Button(top, text="Daha Eski ▶", command=lambda: show_page(state["page"] + 1))
+        btn_next.pack(side="right", padx=6)
+        lbl_page = tk.Label(top, text="", font=("Segoe UI", 9))
+        lbl_page.pack(side="right", padx=6)
+        btn_prev = tk.Button(top, text="◀ Daha Yeni", command=lambda: show_page(state["page"] - 1))
+        btn_prev.pack(side="right", padx=6)
         cols = ("ts", "type", "row_id", "box", "barcode", "message")
         tree = ttk.Treeview(win, columns=cols, show="headings", height=22)
         tree.heading("ts", text="Tarih/Saat"); tree.column("ts", width=150, anchor="w")
@@ -2110,12 +2431,35 @@ class AnaEkran:
                 tree.selection_set(iid)
                 log_menu.post(ev.x_root, ev.y_root)
         tree.bind("<Button-3>", _popup)
-        def refresh():
+        def show_page(page: int):
+            # kayıtlar diskteki iş dosyasından sayfa sayfa okunur (en yeni önce)
+            self._scan_log_job()
+            total = self.scan_log.count()
+            pages = max(1, (total + page_size - 1) // page_size)
+            page = max(0, min(page, pages - 1))
+            state["page"] = page
             tree.delete(*tree.get_children())
-            for r in reversed(self.scan_report[-2000:]):
-                tree.insert("", "end", values=(r["ts"], r["type"], r["row_id"] or "", r["box"] or "", r["barcode"], r["message"]))
-        refresh()
-    def process_barcode(self, barcode: str):
+            for r in self.scan_log.read_page(page, page_size):
+                tree.insert("", "end", values=(ts_text(r[1]), r[2], r[4] or "", r[5] or "", r[3], r[6]))
+            if total:
+                lbl_page.config(text=f"{page * page_size + 1}-{min(total, (page + 1) * page_size)} / {total}")
+            else:
+                lbl_page.config(text="Kayıt yok")
+            btn_prev.config(state=("normal" if page > 0 else "disabled"))
+            btn_next.config(state=("normal" if page < pages - 1 else "disabled"))
+        show_page(0)
+    def process_barcode(self, barcode: str, recv_ts: float | None = None):
+        """recv_ts: scanner verisinin socket'ten alındığı an (time.monotonic).
+        Manuel girişte None gelir; o zaman şimdiki an kullanılır."""
+        self._scan_recv_ts = recv_ts if recv_ts is not None else time.monotonic()
+        try:
+            self._process_barcode(barcode)
+        finally:
+            if recv_ts is not None:
+                self.scan_latency.append((time.monotonic() - recv_ts) * 1000.0)
+            self._scan_recv_ts = None
+
+    def _process_barcode(self, barcode: str):
         if not barcode:
             return
         info = code_parser.analyze(barcode)
@@ -2158,8 +2502,8 @@ class AnaEkran:
             if item.get('status') == 'PENDING' and (item.get('search') == match_val_primary or item.get('search_nogs') == match_val_primary or item.get('search') == match_val_alt or item.get('search_nogs') == match_val_alt):
                 self.verified_count += 1
                 try:
-                    self._scan_times.append(time.time())
-                    self._update_speed_gauge()
+                    # hız göstergesi bir sonraki UI karesinde (update_ui -> "speed")
+                    self.hiz.kaydet()
                 except Exception:
                     pass
                 box_info = self.next_print_info
@@ -2168,11 +2512,23 @@ class AnaEkran:
                 item['label'] = box_info['label']
                 item['in_box'] = ((self.verified_count - 1) % self.items_per_box) + 1 if self.items_per_box > 0 else ""
                 item['production_date'] = (self.var_prod_date.get() or "").strip()
+                try:
+                    item['read_at'] = datetime.now().isoformat(timespec='milliseconds')
+                except Exception:
+                    pass
+                self.search_index.touch(item)
+                # job_v2 write-through (tüm işlerde arama indeksi tetikleyiciyle güncellenir)
+                try:
+                    jm = getattr(self, 'job_manager', None)
+                    if jm is not None and getattr(self, 'current_job_id', None):
+                        jm.update_item_status(self.current_job_id, int(item.get('id', 0) or 0), status='VERIFIED', box_no=str(item.get('box', '-')), label=str(item.get('label', '-')), in_box=item.get('in_box', ''), read_at=item.get('read_at'))
+                except Exception:
+                    _log_db.exception("Okuma iş veritabanına yazılamadı", extra={"ctx": {"job": self.current_job_id, "id": item.get('id')}})
                 self.work_list.pop(i)
                 self.work_list.insert(0, item)
                 self.veri.save_job_db()
                 self.refresh_table()
-                self.update_ui()
+                self.update_ui(full=False)
                 self.show_alert(f"✅ OKUNDU: {match_val_primary[:30]}...", "success")
                 self._update_code_status(info, result_tag="success")
                 # Koli sınırına geldiyse koli etiketini bas
@@ -2281,33 +2637,17 @@ class AnaEkran:
                     return d
                 return {}
 
-            for iid in self.tree.get_children():
-                self.tree.delete(iid)
-
-            def _safe_str(v):
-                # Tcl/Tk NUL (\x00) ve kontrol karakterleri sorun çıkarabiliyor.
-                try:
-                    s = "" if v is None else str(v)
-                    s = s.replace("\x00", "")
-                    # diğer kontrol karakterlerini de temizle (GS1 ayırıcı 29 hariç)
-                    out = []
-                    for ch in s:
-                        o = ord(ch)
-                        if o == 29:  # GS1 ayırıcı kalsın
-                            out.append(ch); continue
-                        # C0 control range
-                        if o < 32:
-                            continue
-                        out.append(ch)
-                    return "".join(out)
-                except Exception:
-                    return "" if v is None else str(v)
+            self.tree.delete(*self.tree.get_children())
+            _safe_str = _safe_cell
+            iid_by_id, row_by_iid, row_by_id = {}, {}, {}
 
-            for item in self.work_list:
-                item = _as_dict(item)
+            for src in self.work_list:
+                item = _as_dict(src)
                 tag = 'verified' if item.get('status') == 'VERIFIED' else 'pending'
+                # iid = ID (tekrarlanan ID'de Tk kendi iid'sini verir)
+                key = self._id_key(item.get('id'))
                 try:
-                    self.tree.insert("", "end",
+                    iid = self.tree.insert("", "end", iid=(key if key and key not in iid_by_id else None),
                                      values=(
                                          _safe_str(item.get('id')),
                                          _safe_str(item.get('box')),
@@ -2321,6 +2661,13 @@ class AnaEkran:
                 except Exception:
                     # Tek satır bozuksa tüm tabloyu boş bırakma
                     continue
+                row_by_iid[iid] = item
+                if key not in iid_by_id:
+                    iid_by_id[key] = iid
+                    if isinstance(src, dict):
+                        row_by_id[key] = src
+            self._iid_by_id, self._row_by_iid = iid_by_id, row_by_iid
+            self._row_by_id, self._row_map_src, self._row_map_len = row_by_id, self.work_list, len(self.work_list)
 # ilk satıra kaydır
             children = self.tree.get_children()
             if children:
@@ -2346,13 +2693,54 @@ class AnaEkran:
                 pass
         except Exception:
             pass
-    def update_ui(self):
-        """Sayaçlar + koli bilgisi + reject durumu."""
+    # ---------------- Birleştirilmiş UI yenileme ----------------
+    # Durum değişiklikleri bölgeleri "kirli" işaretler; tek bir kare çağrısı (en fazla
+    # UI_FRAME_MS'de bir) sadece kirli bölgeleri ve değeri gerçekten değişen widget'ları günceller.
+    UI_FRAME_MS = 50
+    UI_REGIONS = ("counters", "box", "speed", "reject", "printers")
+
+    def update_ui(self, full: bool = True):
+        """Sayaçlar + koli bilgisi + reject durumu.
+        Koli hesabı (next_print_info) hemen yapılır; ekran bir sonraki karede güncellenir.
+        full=False: okuma yolu - reject / yazıcı rozetleri kendi olaylarıyla güncellenir.
+        """
+        try:
+            self._compute_box_state()
+        except Exception:
+            pass
+        if full:
+            self.mark_ui_dirty(*self.UI_REGIONS)
+        else:
+            self.mark_ui_dirty("counters", "box", "speed")
+
+    def mark_ui_dirty(self, *regions):
+        self._ui_dirty.update(regions)
+        if self._ui_frame_id is not None:
+            return
+        wait = self.UI_FRAME_MS - (time.monotonic() - self._ui_last_frame) * 1000.0
         try:
-            self.lbl_total.config(text=str(len(self.work_list)))
-            self.lbl_ok.config(text=str(self.verified_count))
+            self._ui_frame_id = self.root.after(max(0, int(wait)), self._render_ui_frame)
+        except Exception:
+            self._ui_frame_id = None
+
+    def invalidate_ui(self):
+        """Widget'lar dışarıdan değiştiyse (tema / yerleşim) bir sonraki karede hepsini uygula."""
+        self._ui_applied.clear()
+        self.mark_ui_dirty(*self.UI_REGIONS)
+
+    def _ui_set(self, widget, **kw):
+        """Widget'ı sadece değer değiştiyse yeniden yapılandırır."""
+        try:
+            key = str(widget)
+            if self._ui_applied.get(key) == kw:
+                return
+            widget.configure(**kw)
+            self._ui_applied[key] = kw
         except Exception:
             pass
+
+    def _compute_box_state(self):
+        """Koli hesabı; next_print_info her okumadan önce güncel olmalı."""
         # --- Üst sayaçlar: Toplam / Tamamlanan / Kalan / Koli(Şu an) / Koli(Sıradaki)
         total = len(self.work_list)
         ok = self.verified_count
@@ -2397,6 +2785,19 @@ class AnaEkran:
             inbox_disp = 0
             status_txt = 'HAZIR'
 
+        # Panel satırı (Koli içi / durum / %): koli kapanınca yeni koliye geçilmiş sayılır
+        # (0/x, HAZIR, 0%); TAMAMLANDI / 100% sadece iş bitince
+        if items_per_box > 0:
+            panel_inbox = 0 if (ok > 0 and ok % items_per_box == 0 and ok < total) else ok % items_per_box
+        else:
+            panel_inbox = 0
+        if total > 0 and ok >= total:
+            panel_status, panel_pct = 'TAMAMLANDI', 100
+        elif total <= 0 or items_per_box <= 0 or panel_inbox <= 0:
+            panel_status, panel_pct = 'HAZIR', 0
+        else:
+            panel_status, panel_pct = 'DOLUYOR', int(round((panel_inbox / items_per_box) * 100))
+
         # Kalan koli (hedef biliniyorsa)
         box_left = 0
         if box_goal > 0:
@@ -2413,60 +2814,96 @@ class AnaEkran:
             else:
                 current_label = 'LİSTE BİTTİ'
 
-        # Üst kartlar
+        self._ui_box = {
+            'total': total, 'ok': ok, 'remaining': remaining, 'items_per_box': items_per_box,
+            'box_goal': box_goal, 'box_left': box_left, 'current_box_num': current_box_num,
+            'next_box_num': next_box_num, 'inbox_disp': inbox_disp, 'status_txt': status_txt,
+            'panel_inbox': panel_inbox, 'panel_status': panel_status, 'panel_pct': panel_pct,
+        }
+        self.next_print_info = {'box_num': print_box_num, 'label': current_label}
+        # Sıradaki K koli etiketini önceden hazırla (ZPL + açık yazıcı bağlantısı).
+        # next_print_info'dan türetildiği için yeniden basım / atlama sonrası pencere kendiliğinden kayar.
         try:
-            self.lbl_total.configure(text=str(total))
-            self.lbl_ok.configure(text=str(ok))
-            self.lbl_remaining.configure(text=str(remaining))
-            # Sonraki (ürün): yapılan + 1 (bitti ise '-')
-            nxt = "-" if total > 0 and ok >= total else str(ok + 1)
-            self.lbl_next.configure(text=nxt)
+            if self.box_label_list and int(self.var_printer_enabled.get() or 0) == 1:
+                k = max(1, int(self.veri.settings.get('box_lookahead', 3) or 3))
+                self.donanim.prepare_box_labels(self.box_label_list[print_box_num - 1:print_box_num - 1 + k])
         except Exception:
             pass
 
+    def _render_ui_frame(self):
+        self._ui_frame_id = None
+        self._ui_last_frame = time.monotonic()
+        dirty, self._ui_dirty = self._ui_dirty, set()
+        st = self._ui_box or {}
+        total = st.get('total', 0)
+        ok = st.get('ok', 0)
+        items_per_box = st.get('items_per_box', 0)
+
+        # Üst kartlar
+        if "counters" in dirty:
+            try:
+                self._ui_set(self.lbl_total, text=str(total))
+                self._ui_set(self.lbl_ok, text=str(ok))
+                self._ui_set(self.lbl_remaining, text=str(st.get('remaining', 0)))
+                # Sonraki (ürün): yapılan + 1 (bitti ise '-')
+                nxt = "-" if total > 0 and ok >= total else str(ok + 1)
+                self._ui_set(self.lbl_next, text=nxt)
+            except Exception:
+                pass
+
         # KOLİ DURUMU paneli
-        try:
-            if hasattr(self, 'lbl_box_now'):
-                self.lbl_box_now.configure(text=str(current_box_num))
-                self.lbl_box_next.configure(text=str(next_box_num))
-                self.lbl_box_done.configure(text=str(ok // items_per_box) if items_per_box > 0 else '0')
-                self.lbl_box_left.configure(text=str(box_left) if box_goal > 0 else '-')
-                self.lbl_box_goal.configure(text=str(box_goal) if box_goal > 0 else '-')
-
-                # koli içi x/y ve progress
-                if items_per_box > 0:
-                    self.lbl_box_inbox.configure(text=f'KOLİ İÇİ: {inbox_disp}/{items_per_box}')
-                    pct = int(round((inbox_disp / items_per_box) * 100)) if items_per_box else 0
-                    try:
+        if "box" in dirty:
+            try:
+                if hasattr(self, 'lbl_box_now'):
+                    box_goal = st.get('box_goal', 0)
+                    inbox_disp = st.get('inbox_disp', 0)
+                    self._ui_set(self.lbl_box_now, text=str(st.get('current_box_num', 0)))
+                    self._ui_set(self.lbl_box_next, text=str(st.get('next_box_num', 1)))
+                    self._ui_set(self.lbl_box_done, text=str(ok // items_per_box) if items_per_box > 0 else '0')
+                    self._ui_set(self.lbl_box_left, text=str(st.get('box_left', 0)) if box_goal > 0 else '-')
+                    self._ui_set(self.lbl_box_goal, text=str(box_goal) if box_goal > 0 else '-')
+
+                    # progress çubuğu / gösterge: şu anki koli (kapanan koli dolu görünür)
+                    if items_per_box > 0:
+                        pct = int(round((inbox_disp / items_per_box) * 100)) if items_per_box else 0
                         self._g_fill_target = max(0.0, min(1.0, pct / 100.0))
-                    except Exception:
-                        pass
-                    try:
-                        self.pb_box.configure(maximum=100)
-                        self.pb_box['value'] = pct
-                    except Exception:
-                        pass
-                    self.lbl_box_percent.configure(text=f'{pct}%')
-                else:
-                    self.lbl_box_inbox.configure(text='KOLİ İÇİ: -')
-                    try:
-                        self.pb_box['value'] = 0
-                    except Exception:
-                        pass
-                    self.lbl_box_percent.configure(text='-')
+                        self._ui_set(self.pb_box, maximum=100, value=pct)
+                    else:
+                        self._ui_set(self.pb_box, value=0)
+
+                    # koli içi x/y, durum, %: panel satırı kuralları
+                    self._ui_set(self.lbl_box_inbox, text=f"Koli içi: {st.get('panel_inbox', 0)}/{items_per_box}")
+                    self._ui_set(self.lbl_box_percent, text=f"{st.get('panel_pct', 0)}%")
+
+                    # durum rengi (şu anki kolinin durumuna göre)
+                    status_txt = st.get('status_txt', 'HAZIR')
+                    panel_status = st.get('panel_status', 'HAZIR')
+                    if status_txt == 'TAMAMLANDI':
+                        self._ui_set(self.lbl_box_status, text=panel_status, fg='#198754')
+                    elif status_txt == 'DOLUYOR':
+                        self._ui_set(self.lbl_box_status, text=panel_status, fg='#fd7e14')
+                    else:
+                        self._ui_set(self.lbl_box_status, text=panel_status, fg='#0d6efd')
+            except Exception:
+                pass
 
-                # durum rengi
-                if status_txt == 'TAMAMLANDI':
-                    self.lbl_box_status.configure(text=status_txt, fg='#198754')
-                elif status_txt == 'DOLUYOR':
-                    self.lbl_box_status.configure(text=status_txt, fg='#fd7e14')
-                else:
-                    self.lbl_box_status.configure(text=status_txt, fg='#0d6efd')
-        except Exception:
-            pass
+        if "reject" in dirty:
+            self._render_reject_state()
+        if "printers" in dirty:
+            try:
+                self._update_printer_device_badges()
+            except Exception:
+                pass
+        if "speed" in dirty:
+            try:
+                self._update_speed_gauge()
+                self._update_eta()
+            except Exception:
+                pass
+        self._kick_gauges()
 
-        self.next_print_info = {'box_num': print_box_num, 'label': current_label}
-    # Reject durum etiketi + kullanıcı toggle
+    def _render_reject_state(self):
+        # Reject durum etiketi + kullanıcı toggle
         try:
             active = bool(getattr(self.donanim, 'reject_is_active', False))
             enabled = bool(getattr(self.donanim, 'reject_user_enabled', True))
@@ -2486,7 +2923,7 @@ class AnaEkran:
                     elif err == "PORT_NOT_FOUND":
                         ports = []
                         try:
-                            ports = rej.available_ports()
+                            ports = list(getattr(rej, 'known_ports', []) or [])
                         except Exception:
                             ports = []
                         if ports:
@@ -2505,21 +2942,12 @@ class AnaEkran:
                     self.set_device_state('reject','connected' if active else 'disconnected')
             except Exception:
                 pass
-            # Yazıcı rozeti
-            self._update_printer_device_badges()
-            # Excel progress satırı (Koli içi / %)
-            self._update_box_panel_excel(total=len(self.work_list), done=self.verified_count)
-            try:
-                self._update_speed_gauge()
-                self._update_eta()
-            except Exception:
-                pass
         except Exception:
             pass
 
     def _start_device_badge_loop(self):
-        """Yazıcı cihaz rozetlerini gerçek socket bağlantısına göre periyodik günceller.
-        UI'yi bloklamamak için kontrol ayrı thread'de yapılır.
+        """Reject portu için periyodik sağlık kontrolü.
+        Yazıcı rozetleri izleyiciden gelen olaylarla güncellenir (_on_printer_state).
         """
         try:
             self._device_badge_loop()
@@ -2529,8 +2957,8 @@ class AnaEkran:
 
     def _device_badge_loop(self):
         try:
-            self._kick_printer_checks()
-            self._update_printer_device_badges()
+            # Reject portu: açık handle üzerinden bloklamayan sağlık kontrolü
+            self.donanim.reject_health_check()
         finally:
             try:
                 self.root.after(5000, self._device_badge_loop)
@@ -2538,155 +2966,72 @@ class AnaEkran:
                 pass
 
     def _kick_printer_checks(self):
-        """3 yazıcı için kısa timeout'lu socket ping çalıştırır."""
+        """Tüm yazıcıları hemen yoklat (izleyici üzerinden, bağlantı çakışması olmadan)."""
         try:
-            if getattr(self, '_printer_check_inflight', False):
-                return
-            self._printer_check_inflight = True
-
-            s = getattr(self, 'veri', None).settings if getattr(self, 'veri', None) else {}
-            enabled = bool(getattr(self, 'printer_enabled', True))
-
-            devices = [
-                ("box", (s.get('box_ip') or '').strip(), int(s.get('box_port', 9100) or 9100)),
-                ("prod", (s.get('prod_ip') or '').strip(), int(s.get('prod_port', 9100) or 9100)),
-                ("prod2", (s.get('prod2_ip') or '').strip(), int(s.get('prod2_port', 9100) or 9100)),
-            ]
-
-            def _worker():
-                try:
-                    if not enabled:
-                        self._printer_state = {k: None for (k, _, _) in devices}
-                        return
-                    out = {}
-                    for key, ip, port in devices:
-                        if not ip:
-                            out[key] = None
-                            continue
-                        ok = False
-                        try:
-                            with socket.create_connection((ip, port), timeout=0.6):
-                                ok = True
-                        except Exception:
-                            ok = False
-                        out[key] = ok
-                    self._printer_state = out
-                finally:
-                    self._printer_check_inflight = False
-                    try:
-                        self.root.after(0, self._update_printer_device_badges)
-                    except Exception:
-                        pass
+            self.donanim.poke_printer()
+        except Exception:
+            pass
 
-            threading.Thread(target=_worker, daemon=True).start()
+    def _on_printer_state(self, device: str, state):
+        """Yazıcı izleyicisinden gelen durum değişikliği (UI thread)."""
+        try:
+            self._printer_state[device] = state
+            self._update_printer_device_badges()
         except Exception:
-            self._printer_check_inflight = False
+            pass
 
+    def _on_print_job_dead(self, job: dict):
+        """Yazdırma kuyruğunda düşen iş (UI thread). Alarm/reject tetiklemeden uyarır."""
+        try:
+            dev = {'box': "Koli", 'prod': "Ürün", 'prod2': "Ürün-2"}.get(job.get('device'), job.get('device'))
+            text = (f"⚠ {dev} etiketi basılamadı: {job.get('label', '')} ({job.get('last_error', '')}) "
+                    f"- Yönetici Paneli > Yazdırma Kuyruğu")
+            self.lbl_message.configure(text=text)
+            self.alarm_view.show("warning", text)
+        except Exception:
+            pass
 
     def _update_printer_device_badges(self):
         """Üst şeritteki yazıcı cihaz rozetlerini günceller.
-        - IP yok -> KIRMIZI: IP YOK
-        - IP var ama socket bağlanmıyor -> KIRMIZI: BAĞLI DEĞİL
-        - Socket bağlanıyor -> YEŞİL: HAZIR
-        - Kontrol bekleniyor -> TURUNCU: KONTROL
-        - Yazıcı kapalı -> GRİ: PASİF
+        - IP yok -> KIRMIZI
+        - IP var ama bağlanmıyor -> KIRMIZI
+        - Bağlı + HAZIR -> YEŞİL
+        - Bağlı ama kağıt yok / kafa açık / duraklatıldı -> SARI (+ kısa yazı)
+        - Kontrol bekleniyor -> SARI
+        - Yazıcı kapalı -> KIRMIZI
         """
         try:
             enabled = bool(getattr(self, 'printer_enabled', True))
             s = getattr(self, 'veri', None).settings if getattr(self, 'veri', None) else {}
-
-            box_ip = (s.get('box_ip') or '').strip()
-            prod_ip = (s.get('prod_ip') or '').strip()
-            prod2_ip = (s.get('prod2_ip') or '').strip()
-
             state = getattr(self, '_printer_state', {}) or {}
+            base_text = {'box': "Z-ZD230", 'prod': "Z-1-ZT411", 'prod2': "Z-2-ZT411"}
 
-            def _set(badge, ip: str, st: bool | None):
+            def _set(badge, dev: str, ip: str):
                 if not badge:
                     return
-                if not enabled:
-                    badge.config(bg=self._hw_colors.get('disconnected','#dc3545'))
-                    return
-                if not ip:
-                    badge.config(bg=self._hw_colors.get('disconnected','#dc3545'))
-                    return
-                if st is True:
-                    badge.config(bg=self._hw_colors.get('connected','#198754'))
-                    return
-                if st is False:
-                    badge.config(bg=self._hw_colors.get('disconnected','#dc3545'))
-                    return
-                badge.config(bg=self._hw_colors.get('searching','#f1c40f'))
+                st = state.get(dev)
+                text = base_text[dev]
+                if not enabled or not ip:
+                    color = 'disconnected'
+                elif st is None:
+                    color = 'searching'
+                elif st.ok:
+                    color = 'connected'
+                elif st.online:
+                    color = 'searching'
+                    from yazici_izleme import DURUM_YAZI
+                    text = f"{text} {DURUM_YAZI.get(st.status, st.status)}"
+                else:
+                    color = 'disconnected'
+                badge.config(bg=self._hw_colors.get(color, '#dc3545'), text=text)
 
-            _set(getattr(self, 'badge_zd230', None), box_ip, state.get('box'))
-            _set(getattr(self, 'badge_zt411_01', None), prod_ip, state.get('prod'))
-            _set(getattr(self, 'badge_zt411_02', None), prod2_ip, state.get('prod2'))
+            _set(getattr(self, 'badge_zd230', None), 'box', (s.get('box_ip') or '').strip())
+            _set(getattr(self, 'badge_zt411_01', None), 'prod', (s.get('prod_ip') or '').strip())
+            _set(getattr(self, 'badge_zt411_02', None), 'prod2', (s.get('prod2_ip') or '').strip())
 
         except Exception:
             pass
 
-    def _update_box_panel_excel(self, total: int | None = None, done: int | None = None):
-        """Excel düzenindeki 'Koli içi / HAZIR / progress' satırını günceller.
-
-        total: işteki toplam satır sayısı
-        done : doğrulanan/toplamlanan satır sayısı
-        """
-        try:
-            if total is None:
-                total = int(getattr(self, 'total_count', 0) or 0)
-            if done is None:
-                done = int(getattr(self, 'verified_count', 0) or 0)
-
-            items_per_box = int(getattr(self, 'items_per_box', 0) or 0)
-
-            # Koli içi x/y
-            if items_per_box > 0:
-                inbox = done % items_per_box
-                if done > 0 and inbox == 0 and done < total:
-                    # Tam bir koli bitti; yeni koliye geçildi (görüntüde 0/x olsun)
-                    inbox_disp = 0
-                else:
-                    inbox_disp = inbox
-                denom = items_per_box
-            else:
-                inbox_disp = 0
-                denom = 0
-
-            # Durum + yüzde
-            if total <= 0:
-                status_txt = "HAZIR"
-                pct = 0
-            elif done >= total:
-                status_txt = "TAMAMLANDI"
-                pct = 100
-            elif denom <= 0:
-                status_txt = "HAZIR"
-                pct = 0
-            elif inbox_disp <= 0:
-                status_txt = "HAZIR"
-                pct = 0
-            else:
-                status_txt = "DOLUYOR"
-                pct = int(round((inbox_disp / denom) * 100))
-
-            # UI elemanları (excel layout)
-            if hasattr(self, 'lbl_box_inbox') and self.lbl_box_inbox:
-                self.lbl_box_inbox.config(text=f"Koli içi: {inbox_disp}/{denom}")
-            if hasattr(self, 'lbl_box_status') and self.lbl_box_status:
-                self.lbl_box_status.config(text=status_txt)
-            if hasattr(self, 'box_progress') and self.box_progress:
-                try:
-                    self.box_progress.configure(maximum=max(1, denom))
-                    self.box_progress['value'] = inbox_disp if denom > 0 else 0
-                except Exception:
-                    pass
-            if hasattr(self, 'lbl_box_percent') and self.lbl_box_percent:
-                self.lbl_box_percent.config(text=f"{pct}%")
-        except Exception:
-            # UI asla çökmesin
-            pass
-
-
     def refresh_all(self):
         """Tablo + kolon genişliği + üst sayaçları birlikte yeniler."""
         self.refresh_table()
@@ -2760,10 +3105,6 @@ class AnaEkran:
                 self.update_ui()
             except Exception:
                 pass
-            try:
-                self._update_box_panel_excel()
-            except Exception:
-                pass
         except Exception:
             pass
 
@@ -2791,6 +3132,11 @@ class AnaEkran:
                 return False
 
             # Aktif job
+            if self.current_job_id and self.current_job_id != header.job_id:
+                try:
+                    self.donanim.end_print_job(self.current_job_id)
+                except Exception:
+                    pass
             self.current_job_id = header.job_id
 
             # Ayarlar/iş durumu
@@ -2959,7 +3305,8 @@ class AnaEkran:
                   font=("Segoe UI", 10, "bold"), height=2).pack(fill="x", padx=18)
         bar = tk.Frame(win)
         bar.pack(fill="x", padx=18, pady=12)
-        tk.Button(bar, text="İptal", width=12, command=_on_close).pack(side="left")
+        # İptal: yazılmakta olan rapor varsa durdurur
+        tk.Button(bar, text="İptal", width=12, command=lambda: (self.veri.cancel_export(), _on_close())).pack(side="left")
         tk.Button(bar, text="Uygula", width=12, bg="#198754", fg="white",
                   command=lambda: (self.export_all_three(), win.after(80, lambda: (win.lift(), win.focus_force(), win.attributes("-topmost", True))))).pack(side="left", padx=10)
         tk.Button(bar, text="Kaydet", width=12, bg="#0d6efd", fg="white", command=lambda: (self.export_all_three(), _on_close())).pack(side="right")
@@ -3020,68 +3367,189 @@ class AnaEkran:
 
     def manual_verify_item_by_id(self, item_id: int):
         """Seçili ID'yi sanki scanner okumuş gibi VERIFIED yapar (manuel)."""
+        return self.manual_verify_items_by_ids([item_id]) > 0
+
+    def manual_verify_items_by_ids(self, ids) -> int:
+        """ID listesini toplu manuel doğrular. Doğrulanan satır sayısını döndürür."""
+        return self.apply_rows_batch(verify_ids=ids).get("verified", 0)
+
+    def reset_read_by_ids(self, ids) -> int:
+        """Okunanı sil (seçili): satırlar kalır, durum PENDING olur."""
+        return self.apply_rows_batch(reset_ids=ids).get("reset", 0)
+
+    def reset_read_all(self) -> int:
+        """Okunanı sil (hepsi)."""
+        ids = [it.get('id') for it in self.work_list if isinstance(it, dict) and it.get('status') == 'VERIFIED']
+        return self.apply_rows_batch(reset_ids=ids).get("reset", 0)
+
+    def delete_rows_by_ids(self, ids) -> int:
+        """Satırları işten tamamen siler."""
+        return self.apply_rows_batch(delete_ids=ids).get("deleted", 0)
+
+    def get_selected_display_ids(self) -> list:
+        """Ana tabloda seçili satırların ID'leri (seçim sırasıyla)."""
+        out = []
         try:
-            it = None
-            for x in self.work_list:
+            for iid in self.tree.selection():
+                it = self._row_by_iid.get(iid)
+                if it is None:
+                    vals = self.tree.item(iid, 'values') or []
+                    key = vals[0] if vals else None
+                else:
+                    key = it.get('id')
                 try:
-                    if int(x.get('id', -1)) == int(item_id):
-                        it = x
-                        break
+                    out.append(int(key))
                 except Exception:
                     continue
-            if not it:
-                return False
-            if str(it.get('status')) == 'VERIFIED':
-                return False
+        except Exception:
+            pass
+        return out
 
+    def apply_rows_batch(self, verify_ids=(), reset_ids=(), delete_ids=()) -> dict:
+        """Toplu doğrula / sıfırla / sil.
+        - work_list ve arama indeksi tek geçişte güncellenir
+        - job_v2'ye tek transaction ile yazılır, legacy kayıt bir kez kaydedilir
+        - tablo ve sayaçlar bir kez yenilenir
+        - doğrulanan satırlar okuma yolundaki gibi koli / etiket / koli içi sıra alır;
+          batch'in kapattığı her koli için koli etiketi basılır
+        - job_v2 yazımı başarısız olursa bellekteki değişiklik geri alınır (etiket basılmaz)
+        """
+        res = {"verified": 0, "reset": 0, "deleted": 0}
+        verify_keys = {self._id_key(x) for x in (verify_ids or ())}
+        reset_keys = {self._id_key(x) for x in (reset_ids or ())}
+        delete_keys = {self._id_key(x) for x in (delete_ids or ())}
+        if not (verify_keys or reset_keys or delete_keys):
+            return res
+
+        now = datetime.now().isoformat(timespec='milliseconds')
+        verified_rows, reset_rows, deleted_rows = [], [], []
+        # geri alma için: liste, sayaç ve değişen satırların önceki hali
+        undo_list, undo_count, undo_rows = list(self.work_list), self.verified_count, []
+        for key in reset_keys - delete_keys - verify_keys:
+            it = self.get_item_by_id(key)
+            if not it or str(it.get('status')) != 'VERIFIED':
+                continue
+            undo_rows.append((it, dict(it)))
+            it['status'] = 'PENDING'
+            it['box'] = '-'
+            it['label'] = '-'
+            it['in_box'] = ''
+            it['read_at'] = ''
+            reset_rows.append(it)
+        if delete_keys:
+            keep = []
+            for it in self.work_list:
+                if isinstance(it, dict) and self._id_key(it.get('id')) in delete_keys:
+                    deleted_rows.append(it)
+                else:
+                    keep.append(it)
+            if deleted_rows:
+                # yerinde değiştir (work_list'e tutulan referanslar geçerli kalsın)
+                self.work_list[:] = keep
+        self.verified_count = sum(1 for it in self.work_list if isinstance(it, dict) and it.get('status') == 'VERIFIED')
+
+        # doğrulamalar okuma yolundaki gibi tek tek: koli / etiket / koli içi sıra sayaçtan,
+        # batch'in kapattığı her koli için koli etiketi kuyruğa
+        box_prints = []
+        try:
+            self._compute_box_state()
+        except Exception:
+            pass
+        prod_date = (self.var_prod_date.get() or "").strip()
+        seen = set()
+        for x in (verify_ids or ()):
+            key = self._id_key(x)
+            if key in seen or key in delete_keys:
+                continue
+            seen.add(key)
+            it = self.get_item_by_id(key)
+            if not it or str(it.get('status')) == 'VERIFIED':
+                continue
+            box_info = self.next_print_info
+            undo_rows.append((it, dict(it)))
+            self.verified_count += 1
             it['status'] = 'VERIFIED'
+            it['read_at'] = now
+            it['box'] = box_info.get('box_num', '-')
+            it['label'] = box_info.get('label', '-')
+            it['in_box'] = ((self.verified_count - 1) % self.items_per_box) + 1 if self.items_per_box > 0 else ""
+            it['production_date'] = prod_date
+            verified_rows.append(it)
             try:
-                it['read_at'] = datetime.now().isoformat(timespec='seconds')
+                self._compute_box_state()
             except Exception:
                 pass
-            # box no (koli)
-            try:
-                it['box'] = str(self.next_print_info.get('box_num', 1) or 1)
-            except Exception:
-                it['box'] = it.get('box', '-')
-
-            # job_v2 write-through
+            if self.items_per_box > 0 and self.verified_count % self.items_per_box == 0:
+                if self.box_label_list and box_info.get('label') not in (None, '', '-'):
+                    box_prints.append(box_info['label'])
+        res["verified"], res["reset"], res["deleted"] = len(verified_rows), len(reset_rows), len(deleted_rows)
+        if not (verified_rows or reset_rows or deleted_rows):
+            return res
+
+        # job_v2 write-through (tek transaction); yazılamazsa bellek de eski haline döner,
+        # yoksa sonraki load_job_v2 operatörün düzeltmesini sessizce geri alırdı
+        try:
+            jm = getattr(self, 'job_manager', None)
+            if jm is not None and getattr(self, 'current_job_id', None):
+                jm.apply_item_batch(
+                    self.current_job_id,
+                    verified=verified_rows,
+                    reset_ids=[it.get('id') for it in reset_rows],
+                    delete_ids=[it.get('id') for it in deleted_rows],
+                )
+        except Exception:
+            _log_db.exception("Toplu işlem iş veritabanına yazılamadı", extra={"ctx": {
+                "job": self.current_job_id, "verified": len(verified_rows),
+                "reset": len(reset_rows), "deleted": len(deleted_rows)}})
+            for it, old in undo_rows:
+                it.clear()
+                it.update(old)
+            self.work_list[:] = undo_list
+            self.verified_count = undo_count
             try:
-                jm = getattr(self, 'job_manager', None)
-                if jm is not None and getattr(self, 'current_job_id', None):
-                    jm.update_item_status(self.current_job_id, int(item_id), status='VERIFIED', box_no=str(it.get('box','-')), label=str(it.get('label','-')), manual=1)
+                self._compute_box_state()
             except Exception:
                 pass
-
-            # rapor / log
             try:
-                self.scan_report.append({
-                    'ts': time.time(),
-                    'type': 'MANUAL',
-                    'barcode': str(it.get('raw','')),
-                    'row_id': int(item_id),
-                    'box': str(it.get('box','-')),
-                    'message': 'Manuel doğrulama'
-                })
+                messagebox.showerror("Hata", "Toplu işlem veritabanına yazılamadı; değişiklik uygulanmadı.")
             except Exception:
                 pass
+            return {"verified": 0, "reset": 0, "deleted": 0}
 
-            # persist
-            try:
-                self.veri.save_job_db()
-            except Exception:
-                pass
-            try:
-                self.update_ui()
-            except Exception:
-                pass
-            try:
-                self.refresh_table()
-            except Exception:
-                pass
-            return True
+        for it in verified_rows + reset_rows:
+            self.search_index.touch(it)
+
+        # rapor / log (mini tablo bir kez yenilenir)
+        try:
+            for it in verified_rows:
+                self._log_scan('MANUAL', str(it.get('raw','')), row_id=it.get('id'), box=str(it.get('box','-')),
+                               message='Manuel doğrulama', view=False)
+            if verified_rows:
+                self._scan_view_reload()
         except Exception:
-            return False
+            pass
+
+        # persist
+        try:
+            self.veri.save_job_db()
+        except Exception:
+            pass
+        if box_prints and int(self.var_printer_enabled.get() or 0) == 1:
+            for label in box_prints:
+                try:
+                    self.donanim.print_label(label, "box")
+                except Exception:
+                    pass
+        try:
+            self.update_ui()
+        except Exception:
+            pass
+        try:
+            self.refresh_table()
+        except Exception:
+            pass
+        return res
+
     def open_columns_window(self):
             # tek pencere olsun
             try:
@@ -3157,6 +3625,7 @@ class AnaEkran:
                 },
             ]
     
+            from kolonlar_penceresi import KolonlarPenceresi
             self._columns_win = KolonlarPenceresi(self.root, sections=sections, title="Kolonlar")
     
 def _write_fatal_log(exc: BaseException) -> str:
@@ -3185,6 +3654,8 @@ def main():
         root.mainloop()
     except Exception as e:
         # Hata mesajı + log dosyası
+        _log_ui.critical("Program beklenmedik şekilde kapandı", exc_info=True)
+        gunluk.kapat()
         log_path = _write_fatal_log(e)
         try:
             messagebox.showerror(
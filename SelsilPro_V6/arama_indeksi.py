@@ -0,0 +1,218 @@
+"""
+arama_indeksi.py
+Selsil Pro V6 - Arama indeksi (work_list)
+
+- Her sütun için tam eşleşme indeksi: {küçük harf değer: slot | {slot, ...}}
+  (tekil değerde set yerine int tutulur; ID / Barkod gibi sütunlarda bellek az)
+- Barkod / Koli Etiketi için 3-gram indeksi: parçalı (içeren) aramada sadece
+  aday satırlar kontrol edilir (200k satırda tam tarama yerine birkaç bin aday)
+- Diğer sütunlarda parçalı arama, farklı değerler (indeks anahtarları) üzerinde yapılır
+- İndeks arka planda kurulur; hazır değilken arama eski yöntemle (tarama) yapılır
+- Okuma / manuel doğrulama / sıfırlama sonrası touch(item) ile güncel tutulur;
+  work_list yeniden yüklenirse (liste veya uzunluk değişirse) indeks yeniden kurulur
+
+Slot: satırın indeks içindeki sabit numarası (work_list sırası değişse de aynı kalır).
+3-gram listeleri sadece eklenir; eski değerden kalan aday, son kontrolde elenir.
+"""
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Set
+
+COL_KEYS = ("id", "box", "status", "read_at", "raw_disp", "label", "in_box")
+NGRAM_COLS = ("raw_disp", "label")
+NGRAM = 3
+
+
+def col_value(item: Dict[str, Any], col: str) -> str:
+    """Tabloda görünen değer (küçük harf, boşluksuz kenar)."""
+    if col == "raw_disp":
+        v = item.get("raw_disp", item.get("raw", ""))
+    else:
+        v = item.get(col, "")
+    return ("" if v is None else str(v)).strip().lower()
+
+
+def _grams(v: str) -> Set[str]:
+    return {v[i:i + NGRAM] for i in range(len(v) - NGRAM + 1)}
+
+
+def _post_add(d: Dict[str, Any], key: str, slot: int) -> None:
+    cur = d.get(key)
+    if cur is None:
+        d[key] = slot
+    elif isinstance(cur, set):
+        cur.add(slot)
+    elif cur != slot:
+        d[key] = {cur, slot}
+
+
+def _post_remove(d: Dict[str, Any], key: str, slot: int) -> None:
+    cur = d.get(key)
+    if cur is None:
+        return
+    if isinstance(cur, set):
+        cur.discard(slot)
+        if len(cur) == 1:
+            d[key] = next(iter(cur))
+        elif not cur:
+            del d[key]
+    elif cur == slot:
+        del d[key]
+
+
+def _post_slots(p: Any) -> Set[int]:
+    if p is None:
+        return set()
+    return set(p) if isinstance(p, set) else {p}
+
+
+class AramaIndeksi:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._src: Optional[list] = None
+        self._src_len = -1
+        self._building = False
+        self._pending: List[Dict[str, Any]] = []
+        self.ready = False
+        self._items: List[Dict[str, Any]] = []
+        self._slot_of: Dict[int, int] = {}
+        self._vals: Dict[str, List[str]] = {}
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._grams: Dict[str, Dict[str, array]] = {}
+
+    # -------------------------------
+    # Kurulum / senkron
+    # -------------------------------
+    def sync(self, work_list: list, on_ready=None) -> bool:
+        """Liste değiştiyse arka planda yeniden kurar. Hazırsa True döner."""
+        with self._lock:
+            same = work_list is self._src and len(work_list) == self._src_len
+            if same and self.ready:
+                return True
+            if self._building:
+                return False
+            self._building = True
+            self.ready = False
+            self._pending = []
+        snapshot = list(work_list)
+        t = threading.Thread(target=self._build, args=(work_list, snapshot, on_ready), daemon=True)
+        t.start()
+        return False
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._src = None
+            self.ready = False
+
+    def _build(self, src: list, items: list, on_ready) -> None:
+        vals: Dict[str, List[str]] = {c: [] for c in COL_KEYS}
+        exact: Dict[str, Dict[str, Any]] = {c: {} for c in COL_KEYS}
+        grams: Dict[str, Dict[str, array]] = {c: {} for c in NGRAM_COLS}
+        slot_of: Dict[int, int] = {}
+        try:
+            for slot, it in enumerate(items):
+                slot_of[id(it)] = slot
+                for c in COL_KEYS:
+                    v = col_value(it, c)
+                    vals[c].append(v)
+                    _post_add(exact[c], v, slot)
+                for c in NGRAM_COLS:
+                    g = grams[c]
+                    for gr in _grams(vals[c][slot]):
+                        a = g.get(gr)
+                        if a is None:
+                            a = g[gr] = array("i")
+                        a.append(slot)
+        except Exception:
+            with self._lock:
+                self._building = False
+            return
+        with self._lock:
+            self._items, self._slot_of = items, slot_of
+            self._vals, self._exact, self._grams = vals, exact, grams
+            self._src, self._src_len = src, len(items)
+            self._building = False
+            self.ready = True
+            pending, self._pending = self._pending, []
+        for it in pending:
+            self.touch(it)
+        if on_ready is not None:
+            try:
+                on_ready()
+            except Exception:
+                pass
+
+    def touch(self, item: Dict[str, Any]) -> None:
+        """Satırın durum / koli / etiket değişikliğini indekse yansıtır."""
+        with self._lock:
+            if self._building:
+                self._pending.append(item)
+                return
+            if not self.ready:
+                return
+            slot = self._slot_of.get(id(item))
+            if slot is None:
+                # indekste olmayan satır: bir sonraki aramada yeniden kurulsun
+                self._src = None
+                self.ready = False
+                return
+            for c in COL_KEYS:
+                new = col_value(item, c)
+                old = self._vals[c][slot]
+                if new == old:
+                    continue
+                self._vals[c][slot] = new
+                _post_remove(self._exact[c], old, slot)
+                _post_add(self._exact[c], new, slot)
+                if c in self._grams:
+                    g = self._grams[c]
+                    for gr in _grams(new):
+                        a = g.get(gr)
+                        if a is None:
+                            a = g[gr] = array("i")
+                        a.append(slot)
+
+    # -------------------------------
+    # Arama
+    # -------------------------------
+    def search(self, col: str, q: str, exact: bool) -> Optional[List[Dict[str, Any]]]:
+        """Eşleşen satırlar (yükleme sırasına göre). İndeks hazır değilse None."""
+        q = (q or "").strip().lower()
+        with self._lock:
+            if not self.ready or col not in self._exact:
+                return None
+            vals = self._vals[col]
+            if exact:
+                slots = _post_slots(self._exact[col].get(q))
+            elif col in self._grams and len(q) >= NGRAM:
+                g = self._grams[col]
+                lists = []
+                for gr in _grams(q):
+                    a = g.get(gr)
+                    if a is None:
+                        return []
+                    lists.append(a)
+                lists.sort(key=len)
+                cand = set(lists[0])
+                for a in lists[1:]:
+                    if len(cand) < 64:
+                        break
+                    cand.intersection_update(a)
+                slots = {s for s in cand if q in vals[s]}
+            else:
+                slots = set()
+                for v, p in self._exact[col].items():
+                    if q in v:
+                        slots |= _post_slots(p)
+            items = self._items
+            return [items[s] for s in sorted(slots)]
+
+    @staticmethod
+    def filter(items: List[Dict[str, Any]], col: str, q: str, exact: bool) -> List[Dict[str, Any]]:
+        """İndekssiz arama (indeks hazırlanırken / önceki sonuçları daraltırken)."""
+        q = (q or "").strip().lower()
+        if exact:
+            return [it for it in items if col_value(it, col) == q]
+        return [it for it in items if q in col_value(it, col)]
@@ -3,14 +3,25 @@ arama_penceresi.py
 Tablodaki kayıtlarda (work_list) seçilen sütunda arama yapma.
 
 - Kullanıcı bir sütun seçer (ID, Koli, Durum, Tarih, Barkod, Koli Etiketi, Koli İçerik No)
-- Arama metni girer
-- Sonuçlar listelenir; çift tıklayınca ana tabloda ilgili satıra gider.
+- Arama metni girer (yazdıkça aranır; Enter / Ara ile hemen)
+- Sonuçlar sayfa sayfa listelenir; çift tıklayınca ana tabloda ilgili satıra gider.
+- Arama, arama_indeksi.AramaIndeksi üzerinden yapılır (app.search_index)
+- "Tüm İşlerde": kayıtlı tüm işlerde (job_items_v2 FTS indeksi) barkod / GTIN / seri /
+  koli etiketi araması; arka planda yapılır, süre (ms) durum satırında gösterilir
 """
 from __future__ import annotations
 
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
 
+from arama_indeksi import AramaIndeksi
+
+PAGE_SIZE = 500
+TYPE_DELAY_MS = 200
+ALL_JOBS_LIMIT = 500
+
 
 COLS = [
     ("id", "ID"),
@@ -62,10 +73,15 @@ def open_arama_penceresi(app, mode: str = "goto", status_filter: str | None = No
 
     chk = tk.Checkbutton(top, text="Tam Eşleşme", variable=exact_var, bg="#f7f7f7", font=("Segoe UI", 9, "bold"))
     chk.pack(side="left", padx=(6, 0))
+    all_var = tk.IntVar(value=0)
+    chk_all = tk.Checkbutton(top, text="Tüm İşlerde", variable=all_var, bg="#f7f7f7", font=("Segoe UI", 9, "bold"))
+    if mode != "manual_verify":
+        chk_all.pack(side="left", padx=(6, 0))
     ent.focus_set()
 
     # results
-    cols = ("ID", "Koli", "Durum", "Tarih", "Barkod", "Koli Etiketi", "Koli İçerik No")
+    cols = ("ID", "Koli", "Durum", "Tarih", "Barkod", "Koli Etiketi", "Koli İçerik No", "İş")
+    base_cols = cols[:-1]
     tree = ttk.Treeview(win, columns=cols, show="headings", height=13)
     for c in cols:
         tree.heading(c, text=c)
@@ -76,6 +92,8 @@ def open_arama_penceresi(app, mode: str = "goto", status_filter: str | None = No
     tree.column("Barkod", width=360, anchor="w")
     tree.column("Koli Etiketi", width=160, anchor="w")
     tree.column("Koli İçerik No", width=110, anchor="center")
+    tree.column("İş", width=160, anchor="w")
+    tree.configure(displaycolumns=base_cols)
     tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
     sb = ttk.Scrollbar(win, orient="vertical", command=tree.yview)
@@ -83,55 +101,209 @@ def open_arama_penceresi(app, mode: str = "goto", status_filter: str | None = No
     sb.place(relx=0.985, rely=0.16, relheight=0.74)
 
     status = tk.Label(win, text="Hazır", bg="#f7f7f7", fg="#198754", font=("Segoe UI", 9, "bold"))
-    status.pack(anchor="w", padx=12, pady=(0, 6))
-
-    def do_search():
-        # clear
-        for iid in tree.get_children():
-            tree.delete(iid)
-
-        key = col_map.get(col_var.get(), "raw_disp")
-        q = _norm(q_var.get())
-        if not q:
-            status.config(text="Arama metni boş.", fg="#dc3545")
+    status.pack(side="left", anchor="w", padx=12, pady=(0, 6))
+
+    pager = tk.Frame(win, bg="#f7f7f7")
+    pager.pack(side="right", padx=12, pady=(0, 6))
+    btn_prev = tk.Button(pager, text="◀ Önceki", width=10, command=lambda: show_page(state["page"] - 1))
+    btn_prev.pack(side="left", padx=4)
+    lbl_page = tk.Label(pager, text="", bg="#f7f7f7", font=("Segoe UI", 9))
+    lbl_page.pack(side="left", padx=6)
+    btn_next = tk.Button(pager, text="Sonraki ▶", width=10, command=lambda: show_page(state["page"] + 1))
+    btn_next.pack(side="left", padx=4)
+
+    idx = getattr(app, "search_index", None)
+    if idx is None:
+        idx = app.search_index = AramaIndeksi()
+
+    # son arama: (sütun, metin, tam eşleşme) + sonuçlar + sayfa
+    state = {"key": None, "results": [], "page": 0, "after": None, "all": False, "seq": 0}
+    # tüm işler aramasında satır -> job_id
+    row_job: dict = {}
+
+    def _index_ready_ui():
+        if not win.winfo_exists():
             return
+        if state["key"]:
+            do_search()
+        else:
+            status.config(text="İndeks hazır.", fg="#198754")
 
-        q_low = q.lower()
-        results = []
-        for item in getattr(app, "work_list", []) or []:
-            # Manuel doğrulama modunda sadece PENDING göster
-            if mode == "manual_verify" and str(item.get("status", "")).upper() != "PENDING":
-                continue
-            val = _norm(item.get(key, ""))
-            v_low = val.lower()
-            if exact_var.get() == 1:
-                if q_low == v_low:
-                    results.append(item)
-            else:
-                if q_low in v_low:
-                    results.append(item)
+    def _on_index_ready():
+        # indeks thread'inden çağrılır
+        try:
+            app.root.after(0, _index_ready_ui)
+        except Exception:
+            pass
 
-        for it in results[:5000]:
-            tree.insert(
+    idx.sync(getattr(app, "work_list", []) or [], on_ready=_on_index_ready)
+
+    def show_page(page: int):
+        results = state["results"]
+        pages = max(1, (len(results) + PAGE_SIZE - 1) // PAGE_SIZE)
+        page = max(0, min(page, pages - 1))
+        state["page"] = page
+        tree.delete(*tree.get_children())
+        row_job.clear()
+        for it in results[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]:
+            iid = tree.insert(
                 "",
                 "end",
                 values=(
                     it.get("id", ""),
                     it.get("box", ""),
                     it.get("status", ""),
-                    it.get("read_at", ""),
+                    it.get("read_at") or "",
                     it.get("raw_disp", it.get("raw", "")),
                     it.get("label", ""),
                     it.get("in_box", ""),
+                    it.get("job_name", ""),
                 ),
             )
+            if "job_id" in it:
+                row_job[iid] = it["job_id"]
+        if results:
+            lo = page * PAGE_SIZE + 1
+            hi = min(len(results), (page + 1) * PAGE_SIZE)
+            lbl_page.config(text=f"{lo}-{hi} / {len(results)}")
+        else:
+            lbl_page.config(text="")
+        btn_prev.config(state=("normal" if page > 0 else "disabled"))
+        btn_next.config(state=("normal" if page < pages - 1 else "disabled"))
+
+    def _all_jobs_done(seq: int, q: str, exact: bool, results: list, ms: float, err: str):
+        if not win.winfo_exists() or seq != state["seq"]:
+            return  # pencere kapandı / daha yeni bir arama başladı
+        if err:
+            status.config(text=f"Arama hatası: {err}", fg="#dc3545")
+            return
+        if exact:
+            ql = q.lower()
+            results = [
+                r for r in results
+                if ql in (str(r.get("raw_disp", "")).lower(), str(r.get("label", "")).lower(),
+                          str(r.get("gtin", "")).lower(), str(r.get("serial", "")).lower())
+            ]
+        state["key"] = ("*", q, exact)
+        state["results"] = results
+        show_page(0)
+        more = "+" if len(results) >= ALL_JOBS_LIMIT else ""
+        status.config(text=f"{len(results)}{more} sonuç bulundu (tüm işler, {ms:.1f} ms).", fg="#0b2e4a")
+
+    # tüm işler araması: pencere başına tek worker + tek DB bağlantısı (ilk aramada açılır,
+    # pencere kapanınca kapanır); biriken isteklerden sadece en yenisi çalışır
+    search_q: queue.Queue = queue.Queue()
+
+    def _search_worker():
+        jm = None
+        try:
+            while True:
+                req = search_q.get()
+                while req is not None:
+                    try:
+                        req = search_q.get_nowait()
+                    except queue.Empty:
+                        break
+                if req is None:
+                    break
+                seq, q, exact = req
+                results, ms, err = [], 0.0, ""
+                try:
+                    if jm is None:
+                        from job_yonetimi import JobYonetimi
+                        jm = JobYonetimi()
+                    results, ms = jm.search_items(q, limit=ALL_JOBS_LIMIT)
+                except Exception as e:
+                    err = str(e)
+                try:
+                    app.root.after(0, lambda s=seq, q=q, x=exact, r=results, m=ms, e=err: _all_jobs_done(s, q, x, r, m, e))
+                except Exception:
+                    pass
+        finally:
+            if jm is not None:
+                try:
+                    jm.close()
+                except Exception:
+                    pass
 
-        status.config(text=f"{len(results)} sonuç bulundu.", fg="#0b2e4a")
+    def _search_all_jobs(q: str, exact: bool):
+        state["seq"] += 1
+        seq = state["seq"]
+        status.config(text="Tüm işlerde aranıyor...", fg="#0b2e4a")
+        if state.get("worker") is None:
+            state["worker"] = threading.Thread(target=_search_worker, name="TumIslerArama", daemon=True)
+            state["worker"].start()
+        search_q.put((seq, q, exact))
+
+    def _stop_worker(evt=None):
+        if evt is not None and evt.widget is not win:
+            return
+        if state.get("worker") is not None:
+            search_q.put(None)
+            state["worker"] = None
+
+    def _set_all_mode():
+        on = all_var.get() == 1
+        state["all"] = on
+        state["key"] = None
+        tree.configure(displaycolumns=(cols if on else base_cols))
+        cmb.config(state=("disabled" if on else "readonly"))
+        on_type()
+
+    def do_search():
+        state["after"] = None
+        key = col_map.get(col_var.get(), "raw_disp")
+        q = _norm(q_var.get())
+        exact = exact_var.get() == 1
+        if not q:
+            state["seq"] += 1
+            state["key"] = None
+            state["results"] = []
+            show_page(0)
+            status.config(text="Arama metni boş.", fg="#dc3545")
+            return
+        if state["all"]:
+            _search_all_jobs(q, exact)
+            return
+
+        work_list = getattr(app, "work_list", []) or []
+        ready = idx.sync(work_list, on_ready=_on_index_ready)
+        prev = state["key"]
+        results = None
+        # yazdıkça daraltma: önceki parçalı aramanın devamıysa önceki sonuçlar içinde ara
+        if (prev and not exact and not prev[2] and prev[0] == key
+                and q.lower().startswith(prev[1].lower())):
+            results = AramaIndeksi.filter(state["results"], key, q, exact=False)
+        if results is None and ready:
+            results = idx.search(key, q, exact)
+        indexed = results is not None
+        if results is None:
+            # indeks hazırlanıyor: eski yöntem (tarama)
+            results = AramaIndeksi.filter(work_list, key, q, exact)
+        # Manuel doğrulama modunda sadece PENDING göster
+        if mode == "manual_verify":
+            results = [it for it in results if str(it.get("status", "")).upper() == "PENDING"]
+
+        state["key"] = (key, q, exact)
+        state["results"] = results
+        show_page(0)
+        note = "" if indexed else " (indeks hazırlanıyor)"
+        status.config(text=f"{len(results)} sonuç bulundu.{note}", fg="#0b2e4a")
+
+    def on_type(_evt=None):
+        # yazdıkça ara (kısa gecikmeyle, her tuşta değil)
+        if state["after"] is not None:
+            try:
+                win.after_cancel(state["after"])
+            except Exception:
+                pass
+        state["after"] = win.after(TYPE_DELAY_MS, do_search)
 
     def clear_search():
         q_var.set("")
-        for iid in tree.get_children():
-            tree.delete(iid)
+        state["key"] = None
+        state["results"] = []
+        show_page(0)
         status.config(text="Hazır", fg="#198754")
         ent.focus_set()
 
@@ -144,15 +316,41 @@ def open_arama_penceresi(app, mode: str = "goto", status_filter: str | None = No
             return
         target_id = str(vals[0])
 
+        job_id = row_job.get(sel[0])
+        if job_id is not None and job_id != getattr(app, "current_job_id", None):
+            # başka bir işteki kayıt: önce o işi yükle
+            try:
+                from tkinter import messagebox
+                ok = messagebox.askyesno("İş Yükle", f"Kayıt '{vals[7]}' işinde. Bu iş yüklensin mi?", parent=win)
+            except Exception:
+                ok = False
+            if not ok:
+                return
+            try:
+                if not app.load_job_v2(job_id):
+                    return
+            except Exception:
+                return
+
         if mode == "manual_verify":
+            # çoklu seçim: hepsi tek seferde doğrulanır
+            ids = []
+            for iid in sel:
+                v = tree.item(iid, "values")
+                if v:
+                    ids.append(str(v[0]))
+            if len(ids) > 1:
+                msg = f"Seçili {len(ids)} barkodu manuel olarak doğrulamak istiyor musunuz?"
+            else:
+                msg = f"ID {target_id} barkodunu manuel olarak doğrulamak istiyor musunuz?"
             try:
                 from tkinter import messagebox
-                ok = messagebox.askyesno("Manuel Doğrula", f"ID {target_id} barkodunu manuel olarak doğrulamak istiyor musunuz?")
+                ok = messagebox.askyesno("Manuel Doğrula", msg)
             except Exception:
                 ok = True
             if ok:
                 try:
-                    app.manual_verify_item_by_id(int(target_id))
+                    app.manual_verify_items_by_ids(ids)
                 except Exception:
                     pass
             try:
@@ -161,15 +359,9 @@ def open_arama_penceresi(app, mode: str = "goto", status_filter: str | None = No
                 pass
             return
 
-        # ana tabloda ID eşleşen ilk satıra git
+        # ana tabloda ID eşleşen satıra git (ID -> iid haritası)
         try:
-            for iid in app.tree.get_children():
-                row = app.tree.item(iid, "values")
-                if row and str(row[0]) == target_id:
-                    app.tree.selection_set(iid)
-                    app.tree.focus(iid)
-                    app.tree.see(iid)
-                    break
+            app.goto_row_id(target_id)
         except Exception:
             pass
 
@@ -190,7 +382,14 @@ def open_arama_penceresi(app, mode: str = "goto", status_filter: str | None = No
               font=("Segoe UI", 9, "bold"), width=10).pack(side="left", padx=6)
 
     ent.bind("<Return>", lambda e: do_search())
+    ent.bind("<KeyRelease>", lambda e: on_type() if e.keysym != "Return" else None)
+    cmb.bind("<<ComboboxSelected>>", lambda e: on_type())
+    chk.config(command=on_type)
+    chk_all.config(command=_set_all_mode)
     tree.bind("<Double-1>", goto_selected)
+    if mode == "manual_verify":
+        tk.Button(btns, text="Seçilenleri Doğrula", command=goto_selected, bg="#198754", fg="white",
+                  font=("Segoe UI", 9, "bold"), width=16).pack(side="left", padx=6, before=btns.winfo_children()[0])
 
     def on_close():
         try:
@@ -200,3 +399,4 @@ def open_arama_penceresi(app, mode: str = "goto", status_filter: str | None = No
         win.destroy()
 
     win.protocol("WM_DELETE_WINDOW", on_close)
+    win.bind("<Destroy>", _stop_worker, add="+")
@@ -0,0 +1,379 @@
+"""
+disa_aktarim.py
+Selsil Pro V6 - Rapor dışa aktarma motoru (Bitenler Detay / Tekli / Kalanlar / PDF)
+
+- work_list tek geçişte bölünür: VERIFIED satırlar koli numarasına göre kovalara,
+  PENDING satırlar ayrı listeye (rapor başına ayrı filtre + sıralama yok).
+  Liste zaten ID sırasındaysa (normal durum) tekrar sıralanmaz.
+- Tüm çıktılar bir işçi thread'inde, rapor başına ayrı yazıcıyla aynı anda yazılır
+  (1 MB tamponlu dosya, satırlar toplu yazılır)
+- Dosya önce .tmp olarak yazılır, bitince yerine taşınır: iptal / hata yarım dosya bırakmaz
+- İlerleme on_progress(yapılan, toplam), sonuç on_done(sonuç) ile bildirilir (işçi thread'inden)
+- Çok büyük işler için work_list yerine doğrudan veritabanından (job_items_v2) akışla yazılır
+
+Rapor türleri (dosya soneki): finish, bitenlertekli, okunmayanlar, rapor_pdf
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+FINISH = "finish"
+SINGLE = "bitenlertekli"
+REMAINING = "okunmayanlar"
+PDF = "rapor_pdf"
+TUM_RAPORLAR = (FINISH, SINGLE, REMAINING, PDF)
+
+BUF_SIZE = 1 << 20
+CHUNK = 2048
+PDF_HEAD = 40
+NO_BOX = 999999
+
+
+class Iptal(Exception):
+    pass
+
+
+def box_key(box: Any) -> int:
+    """Detay raporundaki koli sırası: sayı olmayan koli en sona."""
+    s = str(box)
+    return int(s) if s.isdigit() else NO_BOX
+
+
+def _id_key(it: Dict[str, Any]) -> int:
+    try:
+        return int(it.get("id") or 0)
+    except Exception:
+        return 0
+
+
+@dataclass
+class Bolumler:
+    """Tek geçişte ayrılmış veri. Satırlar çıktı sırasındadır."""
+    total: int = 0
+    finished: List[Dict[str, Any]] = field(default_factory=list)   # koli sırası
+    single: List[Dict[str, Any]] = field(default_factory=list)     # ID sırası
+    head: List[Dict[str, Any]] = field(default_factory=list)       # PDF: ilk PDF_HEAD VERIFIED (work_list sırası)
+    remaining: List[Dict[str, Any]] = field(default_factory=list)  # ID sırası
+
+
+@dataclass
+class Sonuc:
+    paths: Dict[str, str] = field(default_factory=dict)    # yazılan raporlar
+    empty: List[str] = field(default_factory=list)         # veri olmadığı için atlananlar
+    errors: Dict[str, str] = field(default_factory=dict)
+    cancelled: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.cancelled
+
+
+def bolumle(items: List[Dict[str, Any]], stop: Optional[threading.Event] = None) -> Bolumler:
+    """
+    work_list'i tek geçişte Biten (koliye göre) / Kalan olarak ayırır.
+    Satırlar kopyalanır (dict(it)): UI thread'i work_list satırlarını değiştirmeye devam eder.
+    """
+    b = Bolumler(total=len(items))
+    buckets: Dict[int, List[Dict[str, Any]]] = {}
+    single_sorted = remaining_sorted = True
+    last_v = last_p = None
+    for n, it in enumerate(items):
+        if stop is not None and not (n & 0xFFF) and stop.is_set():
+            raise Iptal()
+        it = dict(it)
+        st = it.get("status")
+        if st == "VERIFIED":
+            k = box_key(it.get("box"))
+            lst = buckets.get(k)
+            if lst is None:
+                lst = buckets[k] = []
+            lst.append(it)
+            b.single.append(it)
+            if len(b.head) < PDF_HEAD:
+                b.head.append(it)
+            i = _id_key(it)
+            if last_v is not None and i < last_v:
+                single_sorted = False
+            last_v = i
+        elif st == "PENDING":
+            b.remaining.append(it)
+            i = _id_key(it)
+            if last_p is not None and i < last_p:
+                remaining_sorted = False
+            last_p = i
+    for k in sorted(buckets):
+        b.finished.extend(buckets[k])
+    if not single_sorted:
+        b.single.sort(key=_id_key)
+    if not remaining_sorted:
+        b.remaining.sort(key=_id_key)
+    return b
+
+
+class DisaAktarici:
+    """
+    Raporları arka planda üretir.
+
+    reports: {tür: dosya yolu} (tür: FINISH / SINGLE / REMAINING / PDF)
+    skip_empty: verisi olmayan raporlar yazılmaz, Sonuc.empty'de döner
+    """
+
+    def __init__(self, reports: Dict[str, str], on_progress: Optional[Callable[[int, int], None]] = None,
+                 on_done: Optional[Callable[[Sonuc], None]] = None, skip_empty: Iterable[str] = ()) -> None:
+        self.reports = dict(reports)
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.skip_empty = set(skip_empty)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._done = 0
+        self._total = 0
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------------
+    # Dışarıdan
+    # -------------------------------
+    def start_items(self, items: List[Dict[str, Any]]) -> "DisaAktarici":
+        """Bellekteki work_list'ten üretir (liste kopyalanır; satırlar işçide bölünürken kopyalanır)."""
+        snapshot = list(items)
+        self._thread = threading.Thread(target=self._run_items, args=(snapshot,), name="DisaAktarim", daemon=True)
+        self._thread.start()
+        return self
+
+    def start_db(self, job_id: str, db_path: Optional[str] = None) -> "DisaAktarici":
+        """Job V2 veritabanından akışla üretir (satırlar belleğe alınmaz)."""
+        self._thread = threading.Thread(target=self._run_db, args=(job_id, db_path), name="DisaAktarim", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # -------------------------------
+    # İlerleme
+    # -------------------------------
+    def _add_total(self, n: int) -> None:
+        with self._lock:
+            self._total += n
+
+    def _tick(self, n: int) -> None:
+        if self._stop.is_set():
+            raise Iptal()
+        with self._lock:
+            self._done += n
+            done, total = self._done, self._total
+        if self.on_progress is not None:
+            try:
+                self.on_progress(done, total)
+            except Exception:
+                pass
+
+    # -------------------------------
+    # Kaynak: work_list
+    # -------------------------------
+    def _run_items(self, items: List[Dict[str, Any]]) -> None:
+        res = Sonuc()
+        try:
+            self._add_total(len(items))
+            b = bolumle(items, self._stop)
+            self._tick(len(items))
+            sources = {
+                FINISH: (len(b.finished), lambda: iter(b.finished)),
+                SINGLE: (len(b.single), lambda: iter(b.single)),
+                REMAINING: (len(b.remaining), lambda: iter(b.remaining)),
+            }
+            pdf_data = (b.total, len(b.finished), len(b.remaining), b.head, b.remaining[:PDF_HEAD])
+            self._write_all(sources, pdf_data, res)
+        except Iptal:
+            res.cancelled = True
+        except Exception as e:
+            res.errors["*"] = str(e)
+        self._finish(res)
+
+    # -------------------------------
+    # Kaynak: veritabanı
+    # -------------------------------
+    def _run_db(self, job_id: str, db_path: Optional[str]) -> None:
+        from job_yonetimi import JobYonetimi
+
+        res = Sonuc()
+        try:
+            jm = JobYonetimi(db_path)
+            try:
+                counts = jm.count_items(job_id)
+                head_f = list(jm.iter_items(job_id, status="VERIFIED", limit=PDF_HEAD))
+                head_r = list(jm.iter_items(job_id, status="PENDING", limit=PDF_HEAD))
+            finally:
+                jm.close()
+            n_ver = int(counts.get("VERIFIED", 0))
+            n_pen = int(counts.get("PENDING", 0))
+
+            def _stream(status: str, order: str):
+                # her yazıcı kendi bağlantısıyla okur (thread başına ayrı connection)
+                def gen() -> Iterator[Dict[str, Any]]:
+                    j = JobYonetimi(db_path)
+                    try:
+                        yield from j.iter_items(job_id, status=status, order=order)
+                    finally:
+                        j.close()
+                return gen
+
+            sources = {
+                FINISH: (n_ver, _stream("VERIFIED", "box")),
+                SINGLE: (n_ver, _stream("VERIFIED", "id")),
+                REMAINING: (n_pen, _stream("PENDING", "id")),
+            }
+            pdf_data = (sum(counts.values()), n_ver, n_pen, head_f, head_r)
+            self._write_all(sources, pdf_data, res)
+        except Iptal:
+            res.cancelled = True
+        except Exception as e:
+            res.errors["*"] = str(e)
+        self._finish(res)
+
+    # -------------------------------
+    # Yazma
+    # -------------------------------
+    def _write_all(self, sources: Dict[str, Tuple[int, Callable[[], Iterator[Dict[str, Any]]]]],
+                   pdf_data: tuple, res: Sonuc) -> None:
+        jobs: List[Tuple[str, Callable[[], None]]] = []
+        for kind, path in self.reports.items():
+            if kind == PDF:
+                if kind in self.skip_empty and not (pdf_data[1] or pdf_data[2]):
+                    res.empty.append(kind)
+                    continue
+                jobs.append((kind, lambda p=path: self._write_pdf(p, *pdf_data)))
+                continue
+            if kind not in sources:
+                continue
+            n, rows = sources[kind]
+            if kind in self.skip_empty and n == 0:
+                res.empty.append(kind)
+                continue
+            self._add_total(n)
+            jobs.append((kind, lambda k=kind, p=path, r=rows: self._write_text(k, p, r())))
+
+        if not jobs:
+            return
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="DisaAktarim") as ex:
+            futs = {kind: ex.submit(fn) for kind, fn in jobs}
+        for kind, fut in futs.items():
+            try:
+                fut.result()
+                res.paths[kind] = self.reports[kind]
+            except Iptal:
+                res.cancelled = True
+            except Exception as e:
+                res.errors[kind] = str(e)
+
+    def _write_text(self, kind: str, path: str, rows: Iterator[Dict[str, Any]]) -> None:
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", newline="", encoding="utf-8", buffering=BUF_SIZE) as f:
+                if kind == FINISH:
+                    w = csv.writer(f, delimiter=";")
+                    buf: List[Any] = []
+                    for it in rows:
+                        buf.append((it.get("box"), it.get("label"), it.get("raw")))
+                        if len(buf) >= CHUNK:
+                            w.writerows(buf)
+                            self._tick(len(buf))
+                            buf = []
+                    if buf:
+                        w.writerows(buf)
+                        self._tick(len(buf))
+                else:
+                    lines: List[str] = []
+                    for it in rows:
+                        lines.append(f"{it.get('raw', '')}\n")
+                        if len(lines) >= CHUNK:
+                            f.writelines(lines)
+                            self._tick(len(lines))
+                            lines = []
+                    if lines:
+                        f.writelines(lines)
+                        self._tick(len(lines))
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+            raise
+
+    def _write_pdf(self, path: str, total: int, n_finished: int, n_remaining: int,
+                   head_f: List[Dict[str, Any]], head_r: List[Dict[str, Any]]) -> None:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        # (metin, adım, kalın) satırları önce hazırlanır; sayfa başına tek metin nesnesiyle çizilir
+        lines: List[Tuple[str, int, bool]] = [
+            ("SELSIL PRO - PDF RAPORU", 20, True),
+            (datetime.datetime.now().strftime("Tarih: %d.%m.%Y %H:%M"), 16, False),
+            (f"Toplam Kayıt: {total}", 16, False),
+            (f"Biten (VERIFIED): {n_finished}", 16, False),
+            (f"Kalan (PENDING): {n_remaining}", 16, False),
+            ("", 16, False),
+        ]
+        if head_f:
+            lines.append((f"BİTENLER (İlk {PDF_HEAD})", 18, True))
+            for it in head_f:
+                raw = str(it.get("raw", ""))[:120]
+                lines.append((f"- {it.get('box', '-')} | {it.get('label', '-')} | {raw}", 16, False))
+        if head_r:
+            lines.append(("", 16, False))
+            lines.append((f"KALANLAR (İlk {PDF_HEAD})", 18, True))
+            for it in head_r:
+                raw = str(it.get("raw", ""))[:120]
+                lines.append((f"- {it.get('id', '-')} | {raw}", 16, False))
+
+        if self._stop.is_set():
+            raise Iptal()
+        tmp = path + ".tmp"
+        try:
+            c = canvas.Canvas(tmp, pagesize=A4)
+            w, h = A4
+            y = h - 40
+            t = c.beginText(40, y)
+            for txt, step, bold in lines:
+                if y < 60:
+                    c.drawText(t)
+                    c.showPage()
+                    y = h - 40
+                    t = c.beginText(40, y)
+                t.setFont("Helvetica-Bold" if bold else "Helvetica", 11 if bold else 10)
+                t.setTextOrigin(40, y)
+                t.textOut(txt)
+                y -= step
+            c.drawText(t)
+            c.save()
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+            raise
+
+    def _finish(self, res: Sonuc) -> None:
+        if self._stop.is_set():
+            res.cancelled = True
+        if self.on_done is not None:
+            try:
+                self.on_done(res)
+            except Exception:
+                pass
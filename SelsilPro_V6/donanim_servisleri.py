@@ -6,18 +6,17 @@ Donanım Servisleri: Socket haberleşme + reject sistemi + ürün print (Chrome)
 '''
 from __future__ import annotations
 
+import heapq
+import itertools
 import os
+import select
 import socket
+import sys
 import threading
 import time
-import subprocess
-import shutil
-import urllib.request
-
-try:
-    import winsound
-except Exception:
-    winsound = None
+from collections import deque
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable
 
 try:
     import serial
@@ -29,6 +28,17 @@ except Exception:
     SERIAL_AVAILABLE = False
 
 from araclar import generate_gs1_datamatrix_zpl, format_to_gs1_short
+from tarama_kaydi import TaramaKaydedici
+import gunluk
+
+if TYPE_CHECKING:
+    # sadece tip ipucu için; çalışırken bu modüller ilgili start_* içinde yüklenir
+    from yazici_izleme import YaziciIzleyici
+    from yazdirma_kuyrugu import YazdirmaKuyrugu, YaziciGrubu
+
+_log_scanner = gunluk.al("scanner")
+_log_printer = gunluk.al("printer")
+_log_reject = gunluk.al("reject")
 
 CHROME_PATHS = [
     # Google Chrome
@@ -43,38 +53,50 @@ CHROME_PATHS = [
 
 
 class RejectSystem:
-    """Basit REJECT kontrolü (DTR pulse).
+    """REJECT kontrolü (DTR pulse) - port iş boyunca açık tutulur.
+    - Tüm DTR/RTS işlemleri tek bir worker thread kuyruğundan (RejectScheduler) geçer
+    - Port açma (ve port listesi) ayrı bir thread'de yapılır; açılan port worker'a devredilir,
+      yavaş / olmayan COM portu zamanı gelen darbeleri bekletmez
+    - Sağlık kontrolü port listesi okumaz; açık porta modem-hat sorgusu yapar
     - pyserial yoksa devre dışı kalır
     - Port listesinde yoksa 'PORT_NOT_FOUND'
     - Açma başarısızsa 'OPEN_FAILED'
     """
-    def __init__(self, port: str = 'COM2'):
+    OPEN_TIMEOUT_S = 2.0
+
+    def __init__(self, port: str = 'COM2', serial_factory=None, wait: bool = True, on_ready=None):
+        """wait=False: kurucu port açılmasını beklemez (UI thread'i); sonuç on_ready(ok) ile
+        worker thread'den bildirilir. wait=True sadece UI dışı betikler içindir (en çok OPEN_TIMEOUT_S)."""
         self.port_name = port
         self.ser = None
         self.is_active = False
-        self.last_error = None  # PYSerialMissing | PORT_NOT_FOUND | OPEN_FAILED
+        self.last_error = None  # PYSerialMissing | PORT_NOT_FOUND | OPEN_FAILED | RUNTIME_ERROR
         self.last_exception = None
+        # Port listesi sadece açık açma (kurulum / port değişimi) hatasında okunur ve saklanır
+        # (Windows'ta comports() yavaş); sağlık / darbe yolundaki yeniden açma okumaz
+        self.known_ports: list[str] = []
+        self.last_health_ts = 0.0
+        self.worker = None
+        self._opening = False
+        self._open_lock = threading.Lock()
+        # Test/ölçüm için: serial.Serial yerine pty vb. bir nesne üretici (bkz. reject_olcum.py)
+        self._serial_factory = serial_factory
 
-        if not SERIAL_AVAILABLE or not serial:
+        if serial_factory is None and (not SERIAL_AVAILABLE or not serial):
             self.last_error = "PYSerialMissing"
             return
 
-        # Port gerçekten var mı?
-        ports = self.available_ports()
-        if ports and (self.port_name not in ports):
-            self.last_error = "PORT_NOT_FOUND"
-            self.is_active = False
-            return
+        self.worker = RejectScheduler(self._write_dtr)
+        opened = threading.Event()
 
-        try:
-            # Test aç/kapa
-            self.ser = serial.Serial(self.port_name)
-            self.ser.close()
-            self.is_active = True
-        except Exception as ex:
-            self.last_error = "OPEN_FAILED"
-            self.last_exception = ex
-            self.is_active = False
+        def _ready(ok: bool):
+            opened.set()
+            if on_ready is not None:
+                on_ready(ok)
+
+        self._open_bg(scan_ports=True, on_done=_ready)
+        if wait:
+            opened.wait(self.OPEN_TIMEOUT_S)
 
     @staticmethod
     def available_ports() -> list[str]:
@@ -85,136 +107,804 @@ class RejectSystem:
         except Exception:
             return []
 
-    def update_port(self, new_port: str) -> bool:
-        self.port_name = (new_port or '').strip() or self.port_name
-        # Sıfırla
-        self.is_active = False
-        self.last_error = None
-        self.last_exception = None
-        if not SERIAL_AVAILABLE or not serial:
-            self.last_error = "PYSerialMissing"
+    # --- worker dışından çağrılanlar ---
+    def update_port(self, new_port: str, on_done=None) -> bool:
+        """Port değişimi: beklemez; yeni port arka planda açılır, sonuç on_done(ok) ile."""
+        new_port = (new_port or '').strip() or self.port_name
+        if self.worker is None:
+            self.port_name = new_port
             return False
+        if new_port == self.port_name and self.is_active:
+            return True
+        self.port_name = new_port
+        self.worker.submit(self._close_port)
+        self._open_bg(scan_ports=True, on_done=on_done)
+        return False
 
-        ports = self.available_ports()
-        if ports and (self.port_name not in ports):
-            self.last_error = "PORT_NOT_FOUND"
+    def health_check(self, reopen: bool = True, wait: bool = False, on_done=None):
+        """Port sağlığını kontrol eder (gerekirse arka planda yeniden açmayı başlatır).
+        on_done(ok) worker thread'den çağrılır; wait=True UI thread'inden kullanılmaz."""
+        if self.worker is None:
             return False
-
-        try:
-            if self.ser and getattr(self.ser, 'is_open', False):
+        fut = self.worker.submit(lambda: self._health(reopen))
+        if on_done is not None:
+            def _done(f):
                 try:
-                    self.ser.close()
+                    on_done(bool(f.result()))
                 except Exception:
                     pass
-            self.ser = serial.Serial(self.port_name)
-            self.ser.close()
+            fut.add_done_callback(_done)
+        if not wait:
+            return None
+        try:
+            return bool(fut.result(self.OPEN_TIMEOUT_S))
+        except Exception:
+            return False
+
+    def schedule_pulse(self, fire_at: float, duration: float, scan_ts: float | None = None) -> None:
+        if self.worker is not None:
+            self.worker.schedule_pulse(fire_at, duration, scan_ts=scan_ts)
+
+    def trigger(self, duration: float = 0.5):
+        self.schedule_pulse(time.monotonic(), duration)
+
+    def set_line(self, on: bool) -> None:
+        if self.worker is not None:
+            self.worker.submit(lambda: self._write_dtr(on))
+
+    def set_rts(self, on: bool) -> None:
+        if self.worker is not None:
+            self.worker.submit(lambda: self._write_rts(on))
+
+    def close(self, wait: bool = True) -> None:
+        """wait=False: kapatma worker kuyruğuna bırakılır (UI thread'i beklemez)."""
+        worker, self.worker = self.worker, None
+        if worker is None:
+            return
+        self.is_active = False
+        if not wait:
+            worker.submit(self._close_port)
+            worker.submit(worker.stop)
+            return
+        try:
+            worker.submit(self._close_port).result(1.0)
+        except Exception:
+            pass
+        worker.stop()
+
+    # --- port açma (ayrı thread; worker'ı bekletmez) ---
+    def _open_bg(self, scan_ports: bool = False, on_done=None) -> bool:
+        """Portu 'RejectPortAcici' thread'inde açar; sonuç worker'da _install ile işlenir.
+        scan_ports: açık açma (kurulum / port değişimi) - başarısızsa port listesi de okunur.
+        Zaten açma sürüyorsa yenisi başlatılmaz (False)."""
+        with self._open_lock:
+            if self._opening or self.worker is None:
+                return False
+            self._opening = True
+        port = self.port_name
+
+        def _run():
+            ser, err, ports = None, None, None
+            try:
+                factory = self._serial_factory or serial.Serial
+                ser = factory()
+                ser.port = port
+                # açılışta hat düşük kalsın (pyserial varsayılanı DTR'yi kaldırır)
+                ser.dtr = False
+                ser.rts = False
+                ser.open()
+            except Exception as ex:
+                ser, err = None, ex
+                if scan_ports:
+                    ports = self.available_ports()
+            worker = self.worker
+            if worker is None:
+                # bu arada kapatıldı
+                self._opening = False
+                self._discard(ser)
+                return
+            fut = worker.submit(lambda: self._install(port, ser, err, ports, scan_ports))
+            if on_done is not None:
+                def _done(f):
+                    try:
+                        on_done(bool(f.result()))
+                    except Exception:
+                        pass
+                fut.add_done_callback(_done)
+
+        threading.Thread(target=_run, name="RejectPortAcici", daemon=True).start()
+        return True
+
+    @staticmethod
+    def _discard(ser) -> None:
+        if ser is None:
+            return
+        try:
+            ser.close()
+        except Exception:
+            pass
+
+    # --- sadece worker thread'de çalışanlar ---
+    def _install(self, port: str, ser, err, ports, scan_ports: bool) -> bool:
+        """Arka planda açılan portu devralır (ya da açma hatasını kaydeder)."""
+        with self._open_lock:
+            self._opening = False
+        if port != self.port_name:
+            # açılırken port değişti: bunu bırak, yenisini aç
+            self._discard(ser)
+            self._open_bg(scan_ports=scan_ports)
+            return False
+        self._close_port()
+        if ser is not None:
+            self.ser = ser
             self.is_active = True
+            self.last_error = None
+            self.last_exception = None
+            self.last_health_ts = time.monotonic()
             return True
-        except Exception as ex:
+        self.is_active = False
+        self.last_exception = err
+        if ports is not None:
+            self.known_ports = ports
+        if self.known_ports and (self.port_name not in self.known_ports):
+            self.last_error = "PORT_NOT_FOUND"
+        else:
             self.last_error = "OPEN_FAILED"
-            self.last_exception = ex
-            self.is_active = False
-            return False
+        _log_reject.warning("Reject portu açılamadı (%s): %s", self.port_name, err,
+                            extra={"ctx": {"port": self.port_name, "error": self.last_error}})
+        return False
 
-    def trigger(self, duration: float = 0.5):
-        if not SERIAL_AVAILABLE or not serial:
+    def _close_port(self) -> bool:
+        ser, self.ser = self.ser, None
+        if ser is None:
+            return True
+        try:
+            if getattr(ser, 'is_open', False):
+                try:
+                    ser.dtr = False
+                except Exception:
+                    pass
+                ser.close()
+        except Exception:
+            pass
+        return True
+
+    def _health(self, reopen: bool) -> bool:
+        self.last_health_ts = time.monotonic()
+        if self.ser is not None and getattr(self.ser, 'is_open', False):
+            try:
+                _ = self.ser.cts  # modem-hat sorgusu: USB-seri çıkarıldıysa hata verir
+                self.is_active = True
+                return True
+            except Exception as ex:
+                self._mark_runtime_error(ex)
+        if reopen:
+            # beklemeden: port arka planda açılır, sonraki kontrol sonucu görür
+            self._open_bg()
+        return False
+
+    def _ensure_open(self) -> bool:
+        """Port kapalıysa açmayı arka planda başlatır; bu yazma atlanır (darbe thread'i beklemez)."""
+        if self.ser is not None and getattr(self.ser, 'is_open', False):
+            return True
+        self._open_bg()
+        return False
+
+    def _write_dtr(self, on: bool):
+        if not self._ensure_open():
             return
-        threading.Thread(target=self._pulse, args=(duration,), daemon=True).start()
+        try:
+            self.ser.dtr = bool(on)
+        except Exception as ex:
+            self._mark_runtime_error(ex)
 
-    def _pulse(self, duration: float):
+    def _write_rts(self, on: bool):
+        if not self._ensure_open():
+            return
         try:
-            if not self.ser:
-                self.ser = serial.Serial(self.port_name)
-            if not self.ser.is_open:
-                self.ser.open()
-            self.ser.dtr = True
-            time.sleep(max(0.05, float(duration)))
-            self.ser.dtr = False
+            self.ser.rts = bool(on)
         except Exception as ex:
-            # çalışırken hata olursa aktifliği düşür + sebebi sakla
-            self.is_active = False
-            self.last_error = "RUNTIME_ERROR"
-            self.last_exception = ex
+            self._mark_runtime_error(ex)
+
+    def _mark_runtime_error(self, ex: Exception):
+        # çalışırken hata olursa aktifliği düşür + sebebi sakla
+        _log_reject.error("Reject portu hatası (%s): %s", self.port_name, ex, extra={"ctx": {"port": self.port_name}})
+        self.is_active = False
+        self.last_error = "RUNTIME_ERROR"
+        self.last_exception = ex
+        self._close_port()
+
+
+def _raise_thread_priority() -> None:
+    """Çağıran thread'in önceliğini yükseltir + Windows timer çözünürlüğünü 1 ms yapar (best-effort)."""
+    if sys.platform != "win32":
+        return
+    try:
+        import ctypes
+        k32 = ctypes.windll.kernel32
+        k32.SetThreadPriority(k32.GetCurrentThread(), 2)  # THREAD_PRIORITY_HIGHEST
+    except Exception:
+        pass
+    try:
+        import ctypes
+        ctypes.windll.winmm.timeBeginPeriod(1)
+    except Exception:
+        pass
+
+
+class RejectScheduler:
+    """Reject darbelerini tek bir yüksek öncelikli thread üzerinden zamanlar.
+
+    - Zamanlar time.monotonic() ile tutulur; darbe anı scan'in socket'ten alındığı
+      andan hesaplanır (UI'nin olayı ne zaman işlediğinden bağımsız)
+    - Olaylar zaman sıralı kuyrukta (heap) bekler; thread en yakın olaya kadar uyur,
+      son SPIN_S saniyeyi kısa döngüyle bekleyerek uyanma gecikmesini azaltır
+    - Üst üste binen darbelerde hat, son darbenin bitişine kadar açık kalır
+    - Her olay için planlanan / gerçekleşen zaman `history` içinde tutulur
+    - submit() ile verilen komutlar (port aç/kapa, RTS, sağlık kontrolü) da aynı
+      kuyruktan geçer; seri port tek bir thread'e aittir
+    """
+
+    SPIN_S = 0.002
+
+    def __init__(self, set_line, history: int = 500):
+        self._set_line = set_line
+        self._heap: list[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._active = 0
+        self._stop = False
+        self.history: deque[dict] = deque(maxlen=history)
+        self._thread = threading.Thread(target=self._run, name="RejectScheduler", daemon=True)
+        self._thread.start()
+
+    def schedule_pulse(self, fire_at: float, duration: float, scan_ts: float | None = None) -> None:
+        """fire_at (monotonic) anında hattı `duration` saniyeliğine açar."""
+        try:
+            duration = max(0.05, float(duration))
+        except Exception:
+            duration = 0.5
+        with self._cond:
+            heapq.heappush(self._heap, (float(fire_at), next(self._seq), "on", duration, scan_ts))
+            self._cond.notify()
+
+    def submit(self, fn, at: float | None = None) -> Future:
+        """fn'i worker thread'de (at anında, yoksa hemen) çalıştırır."""
+        fut: Future = Future()
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() if at is None else float(at), next(self._seq), "call", fn, fut))
+            self._cond.notify()
+        return fut
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(1 for ev in self._heap if ev[2] == "on")
+
+    def stats(self) -> dict:
+        """Gecikme özeti (ms): planlanan ile gerçekleşen zaman farkı."""
+        lates = [h["late_ms"] for h in list(self.history) if h.get("kind") == "on"]
+        if not lates:
+            return {"count": 0, "avg_late_ms": 0.0, "max_late_ms": 0.0}
+        return {
+            "count": len(lates),
+            "avg_late_ms": round(sum(lates) / len(lates), 3),
+            "max_late_ms": round(max(lates), 3),
+        }
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            for ev in self._heap:
+                if ev[2] == "call":
+                    ev[4].cancel()
+            self._heap.clear()
+            self._cond.notify()
+
+    def _run(self):
+        _raise_thread_priority()
+        while True:
+            with self._cond:
+                while not self._stop and not self._heap:
+                    self._cond.wait()
+                if self._stop:
+                    break
+                due = self._heap[0][0]
+                wait_s = due - time.monotonic()
+                if wait_s > self.SPIN_S:
+                    self._cond.wait(wait_s - self.SPIN_S)
+                    continue
+                ev = heapq.heappop(self._heap)
+            while time.monotonic() < ev[0]:
+                time.sleep(0)
+            if ev[2] == "call":
+                self._call(ev)
+            else:
+                self._fire(ev)
+        # durdurulurken açık darbe kaldıysa hattı düşür (yine bu thread'de)
+        if self._active:
+            self._active = 0
             try:
-                if self.ser and getattr(self.ser, 'is_open', False):
-                    self.ser.close()
+                self._set_line(False)
             except Exception:
                 pass
+
+    @staticmethod
+    def _call(ev: tuple):
+        _at, _seq, _kind, fn, fut = ev
+        if not fut.set_running_or_notify_cancel():
+            return
+        try:
+            fut.set_result(fn())
+        except BaseException as ex:
+            fut.set_exception(ex)
+
+    def _fire(self, ev: tuple):
+        scheduled, _seq, kind, duration, scan_ts = ev
+        try:
+            if kind == "on":
+                self._active += 1
+                if self._active == 1:
+                    self._set_line(True)
+                # bitiş: planlanan başlangıç + süre (bant üzerindeki konuma bağlı kalır)
+                with self._cond:
+                    heapq.heappush(self._heap, (scheduled + duration, next(self._seq), "off", duration, scan_ts))
+            else:
+                self._active = max(0, self._active - 1)
+                if self._active == 0:
+                    self._set_line(False)
+        except Exception:
+            pass
+        actual = time.monotonic()
+        self.history.append({
+            "kind": kind,
+            "scan_ts": scan_ts,
+            "scheduled": scheduled,
+            "actual": actual,
+            "late_ms": (actual - scheduled) * 1000.0,
+        })
+
+
+class YaziciBaglantisi:
+    """Bir yazıcı ucunun (ip, port) bağlantısı + baskı yolu bilgisi.
+    lock: aynı uca aynı anda tek bağlantı (Zebra 9100 tek oturum kabul edebilir).
+          send/query/warm çağrılmadan önce çağıran tarafından alınmalıdır.
+    sock: açık tutulan (ısıtılmış) bağlantı; koli yazıcısı için iş boyunca açık kalır
+    last_ok / last_fail: son başarılı / başarısız gönderim (monotonic) - izleyici kullanır
+    """
+    CONNECT_TIMEOUT_S = 2.0
+
+    def __init__(self, ip: str = "", port: int = 9100):
+        self.ip = ip
+        self.port = int(port)
+        self.lock = threading.Lock()
+        self.sock: socket.socket | None = None
+        self.last_ok = 0.0
+        self.last_fail = 0.0
+
+    def _connect(self) -> socket.socket:
+        s = socket.create_connection((self.ip, self.port), timeout=self.CONNECT_TIMEOUT_S)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return s
+
+    def _alive(self) -> bool:
+        """Açık bağlantı karşı taraftan kapatılmış mı? (okunabilir + 0 bayt = kapalı)"""
+        s = self.sock
+        if s is None:
+            return False
+        try:
+            r, _, _ = select.select([s], [], [], 0)
+            if r:
+                if not s.recv(4096):
+                    return False
+            return True
+        except Exception:
+            return False
+
+    def warm(self) -> bool:
+        """Bağlantıyı önceden aç (kilit çağıranda)."""
+        if self.sock is not None and self._alive():
+            return True
+        self.close()
+        try:
+            self.sock = self._connect()
+            return True
+        except Exception:
+            self.sock = None
+            return False
+
+    def send(self, data: bytes, keep_open: bool = False) -> bool:
+        """data'yı gönderir (kilit çağıranda). Açık bağlantı koptuysa bir kez yeniden bağlanır."""
+        for attempt in (0, 1):
+            reused = self.sock is not None
+            try:
+                if reused and not self._alive():
+                    self.close()
+                    reused = False
+                s = self.sock or self._connect()
+                s.settimeout(2)
+                s.sendall(data)
+                if keep_open:
+                    self.sock = s
+                else:
+                    if s is not self.sock:
+                        s.close()
+                    else:
+                        self.close()
+                self.last_ok = time.monotonic()
+                return True
+            except Exception:
+                self.close()
+                if not reused or attempt:
+                    self.last_fail = time.monotonic()
+                    raise
+        return False
+
+    def query(self, data: bytes, etx_count: int = 3, timeout: float = 0.8,
+              until: Callable[[bytes], bool] | None = None) -> bytes:
+        """Açık bağlantı üzerinden komut gönderip cevabı okur (kilit çağıranda).
+        Cevap etx_count adet ETX ile biter; ETX'siz cevaplar (SGD getvar) için until(buf) verilir."""
+        s = self.sock
+        if s is None:
+            raise OSError("bağlantı yok")
+        # bekleyen eski veri varsa temizle
+        while True:
+            r, _, _ = select.select([s], [], [], 0)
+            if not r:
+                break
+            if not s.recv(4096):
+                self.close()
+                raise OSError("bağlantı kapandı")
+        s.sendall(data)
+        buf = b""
+        deadline = time.monotonic() + timeout
+        while not (until(buf) if until is not None else buf.count(b"\x03") >= etx_count):
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            r, _, _ = select.select([s], [], [], left)
+            if not r:
+                break
+            chunk = s.recv(4096)
+            if not chunk:
+                self.close()
+                break
+            buf += chunk
+        return buf
+
+    def close(self):
+        s, self.sock = self.sock, None
+        if s is not None:
+            try:
+                s.close()
+            except Exception:
+                pass
+
+
 class DonanimServisleri:
+    PRINTER_DEVICES = {
+        "box": ("box_ip", "box_port"),
+        "prod": ("prod_ip", "prod_port"),
+        "prod2": ("prod2_ip", "prod2_port"),
+    }
+
     def __init__(self, app):
         self.app = app
         self.stop_threads = False
         self.rejector = None
-        self.reject_is_active = False
         self.reject_user_enabled = True  # UI checkbox ile aç/kapat
         # SOCKET ONLY: Windows yazıcı listesi / varsayılan yazıcı ayarlama kullanılmaz.
         # (Müşteri sadece IP:PORT üzerinden Zebra'lara ZPL gönderir.)
         self.installed_printers = []
         # SOCKET ONLY: bwip-js indirimi kapalı
         self.scanner_thread = None
+        self._printer_links: dict[tuple[str, int], YaziciBaglantisi] = {}
+        self._printer_links_lock = threading.Lock()
+        self.printer_monitor: "YaziciIzleyici | None" = None
+        self.print_spool: "YazdirmaKuyrugu | None" = None
+        self.prod_group: "YaziciGrubu | None" = None
+        # koli etiketi ön hazırlık: {(etiket, yerleşim): zpl}
+        self._box_zpl_cache: dict[tuple, str] = {}
+        self._box_lookahead_sig = None
+        # test: yerel Zebra emülatörleri {cihaz: ZebraEmulatoru}, asıl adresler (kaydedilirken geri yazılır)
+        self.printer_emulators: dict = {}
+        self._emu_saved: dict = {}
+        # test: scanner simülatörü (TarayiciSimulatoru) ve o an açık scanner soketi
+        self.scanner_simulator = None
+        self._scanner_sock = None
+        # scanner oturum kaydı (ham baytlar, iş başına): tarama_tekrar.py ile tekrar oynatılır
+        self.recorder = TaramaKaydedici()
 
-    def init_rejector(self):
+    @property
+    def reject_is_active(self) -> bool:
+        return bool(self.rejector is not None and self.rejector.is_active)
+
+    def init_rejector(self, on_ready=None):
+        """Reject portunu hazırlar (beklemez: port arka planda açılır; on_ready() UI thread'inde).
+        Aynı port zaten açıksa yeniden açmaz ve port listesi okumaz; sadece sağlık
+        kontrolü kuyruğa atılır (rozet çift tık dahil)."""
         port = self.app.veri.settings.get("reject_port", "COM2")
-        self.rejector = RejectSystem(port)
-        self.reject_is_active = bool(self.rejector.is_active) if self.rejector else False
+        rej = self.rejector
+        if rej is not None and rej.worker is not None and rej.port_name == port:
+            self.reject_health_check()
+            return
+        if rej is not None:
+            rej.close(wait=False)
+
+        def _ready(_ok):
+            try:
+                self.app.root.after(0, on_ready or self.app.update_ui)
+            except Exception:
+                pass
+
+        self.rejector = RejectSystem(port, wait=False, on_ready=_ready)
+        if self.rejector.worker is None:
+            # pyserial yok: sonuç hemen belli
+            _ready(False)
+
+    def reject_health_check(self):
+        """Bloklamayan sağlık kontrolü; durum değişirse UI güncellenir."""
+        rej = self.rejector
+        if rej is None or rej.worker is None:
+            return
+        was_active = bool(rej.is_active)
+
+        def _done(ok: bool):
+            if ok == was_active:
+                return
+            try:
+                self.app.root.after(0, self.app.update_ui)
+            except Exception:
+                pass
+
+        rej.health_check(on_done=_done)
 
     def update_reject_port(self, new_port: str) -> bool:
+        """Beklemez; port arka planda açılır (sonuç rozette görünür)."""
+        def _ready(_ok):
+            try:
+                self.app.root.after(0, self.app.update_ui)
+            except Exception:
+                pass
+
         if not self.rejector:
-            self.rejector = RejectSystem(new_port)
-        ok = self.rejector.update_port(new_port) if self.rejector else False
-        self.reject_is_active = bool(self.rejector.is_active) if self.rejector else False
-        return ok
+            self.rejector = RejectSystem(new_port, wait=False, on_ready=_ready)
+            return self.reject_is_active
+        return self.rejector.update_port(new_port, on_done=_ready)
 
-    def reject_trigger(self, duration: float = 0.5):
+    def reject_trigger(self, duration: float = 0.5, fire_at: float | None = None, scan_ts: float | None = None):
         if not getattr(self, 'reject_user_enabled', True):
             return
-        if self.rejector:
-            self.rejector.trigger(duration)
+        if not self.rejector:
+            return
+        if fire_at is None:
+            fire_at = time.monotonic()
+        self.rejector.schedule_pulse(fire_at, duration, scan_ts=scan_ts)
+
+    # --- Yazıcı durum izleme ---
+    def printer_link(self, ip: str, port: int) -> YaziciBaglantisi:
+        key = (ip, int(port))
+        with self._printer_links_lock:
+            link = self._printer_links.get(key)
+            if link is None:
+                link = self._printer_links[key] = YaziciBaglantisi(*key)
+            return link
 
-    def trigger_full_alarm(self):
+    def _printer_targets(self) -> dict:
         s = self.app.veri.settings
-        try: duration = float(s.get("reject_duration", 0.5))
-        except Exception: duration = 0.5
-        try: delay = float(s.get("reject_delay", 0.0))
-        except Exception: delay = 0.0
+        enabled = bool(getattr(self.app, 'printer_enabled', True))
+        out = {}
+        for dev, (ip_key, port_key) in self.PRINTER_DEVICES.items():
+            try:
+                port = int(s.get(port_key, 9100) or 9100)
+            except Exception:
+                port = 9100
+            out[dev] = ((s.get(ip_key) or '').strip(), port, enabled)
+        return out
 
-        def _delayed():
-            if delay > 0:
-                time.sleep(delay)
-            self.reject_trigger(duration)
+    def start_printer_monitor(self):
+        """Yazıcı izleyicisini başlatır; durum değişince app._on_printer_state UI thread'inde çağrılır."""
+        if self.printer_monitor is not None:
+            return
 
-        threading.Thread(target=_delayed, daemon=True).start()
-        self.blink_ui(0)
+        def _changed(dev, st):
+            if self.prod_group is not None:
+                try:
+                    self.prod_group.on_health(dev, st.ok)
+                except Exception:
+                    pass
+            try:
+                self.app.root.after(0, lambda d=dev, x=st: self.app._on_printer_state(d, x))
+            except Exception:
+                pass
 
-        def _beep():
-            if not winsound:
-                return
-            for _ in range(3):
-                winsound.Beep(2000, 150)
-                winsound.Beep(1000, 150)
+        # asyncio ile birlikte ilk açılışta değil, izleyici başlarken yüklenir
+        from yazici_izleme import YaziciIzleyici
+        self.printer_monitor = YaziciIzleyici(self._printer_targets, _changed, link_fn=self.printer_link)
 
-        threading.Thread(target=_beep, daemon=True).start()
+    def _printer_address(self, device: str) -> tuple[str, int] | None:
+        ip, port, _enabled = self._printer_targets().get(device, ("", 9100, True))
+        return (ip, port) if ip else None
 
-    def blink_ui(self, count=0):
-        if count >= 6:
-            self.app.manual_entry.config(bg="white", fg="black")
-            self.app.style.configure("Treeview", fieldbackground="white", background="white", foreground="black")
-            self.app.msg_frame.configure(bg="#f8d7da")
+    def start_print_spooler(self):
+        """Kalıcı yazdırma kuyruğunu başlatır (önceki çalışmadan kalan bekleyen işler de gönderilir)."""
+        if self.print_spool is not None:
             return
 
-        if count % 2 == 0:
-            bg = "#ff0000"
-            self.app.manual_entry.config(bg=bg, fg="white")
-            self.app.style.configure("Treeview", fieldbackground=bg, background=bg, foreground="white")
-            self.app.msg_frame.configure(bg=bg)
-            self.app.lbl_message.configure(bg=bg, fg="white")
-        else:
-            self.app.manual_entry.config(bg="white", fg="black")
-            self.app.style.configure("Treeview", fieldbackground="white", background="white", foreground="black")
-            self.app.msg_frame.configure(bg="#f8d7da")
-            self.app.lbl_message.configure(bg="#f8d7da", fg="#842029")
+        def _dead(job):
+            try:
+                self.app.root.after(0, lambda j=job: self.app._on_print_job_dead(j))
+            except Exception:
+                pass
+
+        from yazdirma_kuyrugu import YazdirmaKuyrugu, YaziciGrubu
+        self.print_spool = YazdirmaKuyrugu(
+            list(self.PRINTER_DEVICES.keys()), self._printer_address, self.printer_link, on_dead=_dead
+        )
+        self.prod_group = YaziciGrubu(
+            ["prod", "prod2"], self.print_spool, self._printer_healthy,
+            mode=str(self.app.veri.settings.get("prod_dispatch", "single") or "single"),
+        )
+
+    def _printer_healthy(self, device: str) -> bool | None:
+        """İzleyiciye göre cihaz sağlıklı mı? (IP yoksa False, henüz yoklanmadıysa None)"""
+        if not self._printer_address(device):
+            return False
+        mon = self.printer_monitor
+        st = mon.states.get(device) if mon is not None else None
+        return None if st is None else bool(st.ok)
+
+    def poke_printer(self, device: str | None = None):
+        if self.printer_monitor is not None:
+            self.printer_monitor.poke(device)
+
+    # -------------------------------
+    # Test: Zebra emülatörü
+    # -------------------------------
+    def start_printer_emulator(self, speed_lps: float = 8.0, buffer_limit: int = 64) -> dict:
+        """box / prod / prod2 için yerel emülatör açar; yazıcı adresleri (kaydedilmeden) emülatöre çevrilir."""
+        if self.printer_emulators:
+            return self.printer_emulators
+        from yazici_emulatoru import ZebraEmulatoru
+
+        s = self.app.veri.settings
+        for dev, (ip_key, port_key) in self.PRINTER_DEVICES.items():
+            emu = ZebraEmulatoru(port=0, speed_lps=speed_lps, buffer_limit=buffer_limit).start()
+            self.printer_emulators[dev] = emu
+            self._emu_saved[ip_key] = s.get(ip_key, "")
+            self._emu_saved[port_key] = s.get(port_key, 9100)
+            s[ip_key] = "127.0.0.1"
+            s[port_key] = emu.port
+        self.poke_printer()
+        return self.printer_emulators
+
+    def stop_printer_emulator(self):
+        """Emülatörleri kapatır, asıl yazıcı adreslerini geri yükler."""
+        emus, self.printer_emulators = self.printer_emulators, {}
+        for ip_key, port_key in self.PRINTER_DEVICES.values():
+            for k in (ip_key, port_key):
+                if k in self._emu_saved:
+                    self.app.veri.settings[k] = self._emu_saved.pop(k)
+        for emu in emus.values():
+            try:
+                emu.stop()
+            except Exception:
+                pass
+        if emus:
+            self.poke_printer()
+
+    # -------------------------------
+    # Test: scanner simülatörü
+    # -------------------------------
+    def start_scanner_simulator(self, codes, rate: float = 5.0, jitter: float = 0.0, faults: dict | None = None,
+                                gs_mode: str = "gs", loop: bool = False):
+        """Kamera yerine yerel simülatör açar; scanner adresi (kaydedilmeden) simülatöre çevrilir."""
+        if self.scanner_simulator is not None:
+            return self.scanner_simulator
+        from tarayici_simulatoru import TarayiciSimulatoru
+
+        sim = TarayiciSimulatoru(codes, rate=rate, jitter=jitter, gs_mode=gs_mode, faults=faults, loop=loop).serve()
+        self.scanner_simulator = sim
+        s = self.app.veri.settings
+        self._emu_saved["scanner_ip"] = s.get("scanner_ip", "192.168.1.12")
+        self._emu_saved["scanner_port"] = s.get("scanner_port", 23)
+        s["scanner_ip"] = "127.0.0.1"
+        s["scanner_port"] = sim.port
+        self.reconnect_scanner()
+        return sim
 
-        self.app.root.after(250, lambda: self.blink_ui(count + 1))
+    def stop_scanner_simulator(self):
+        """Simülatörü kapatır, asıl scanner adresini geri yükler ve yeniden bağlanır."""
+        sim, self.scanner_simulator = self.scanner_simulator, None
+        for k in ("scanner_ip", "scanner_port"):
+            if k in self._emu_saved:
+                self.app.veri.settings[k] = self._emu_saved.pop(k)
+        if sim is not None:
+            sim.stop()
+            self.reconnect_scanner()
+
+    def reconnect_scanner(self):
+        """Açık scanner bağlantısını keser; listen_to_scanner güncel adrese yeniden bağlanır."""
+        s = self._scanner_sock
+        if s is None:
+            return
+        try:
+            s.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+
+    def shutdown(self):
+        """Uygulama kapanırken: scanner döngüsünü durdur, izleyiciyi ve reject portunu kapat."""
+        self.stop_threads = True
+        self.stop_printer_emulator()
+        self.stop_scanner_simulator()
+        self.recorder.close()
+        if self.printer_monitor is not None:
+            self.printer_monitor.stop()
+        if self.print_spool is not None:
+            self.print_spool.stop()
+        with self._printer_links_lock:
+            links = list(self._printer_links.values())
+        for link in links:
+            if link.lock.acquire(timeout=1):
+                try:
+                    link.close()
+                finally:
+                    link.lock.release()
+        if self.rejector is not None:
+            try:
+                self.rejector.close()
+            except Exception:
+                pass
+
+    def reject_delay_s(self) -> float:
+        """Okuma anından reject anına kadar geçecek süre.
+
+        Bant hızı + kamera-reject mesafesi tanımlıysa (reject_distance_mm / belt_speed_mm_s)
+        gecikme bunlardan hesaplanır; yoksa sabit reject_delay kullanılır.
+        """
+        s = self.app.veri.settings
+        try:
+            dist = float(s.get("reject_distance_mm", 0) or 0)
+            speed = float(s.get("belt_speed_mm_s", 0) or 0)
+            if dist > 0 and speed > 0:
+                return dist / speed
+        except Exception:
+            pass
+        try:
+            return max(0.0, float(s.get("reject_delay", 0.0)))
+        except Exception:
+            return 0.0
+
+    def test_reject_pulse(self):
+        """Yönetici Paneli > TEST: gecikmesiz tek darbe."""
+        try:
+            duration = float(self.app.veri.settings.get("reject_duration", 0.5))
+        except Exception:
+            duration = 0.5
+        if not self.rejector:
+            # port arka planda açılır; darbe açılınca verilir
+            self.init_rejector(on_ready=lambda: self.reject_trigger(duration))
+            return
+        self.reject_trigger(duration)
+
+    def trigger_full_alarm(self, scan_ts: float | None = None):
+        """scan_ts: scan'in socket'ten alındığı an (time.monotonic). Yoksa şimdi kabul edilir."""
+        s = self.app.veri.settings
+        try: duration = float(s.get("reject_duration", 0.5))
+        except Exception: duration = 0.5
+        delay = self.reject_delay_s()
+
+        base = scan_ts if scan_ts is not None else time.monotonic()
+        self.reject_trigger(duration, fire_at=base + delay, scan_ts=scan_ts)
+        # görsel alarm: tablo üstü bant + kenarlık (show_alert'in alarmıyla aynı zamanlayıcıda birleşir)
+        try:
+            self.app.alarm_view.show("error")
+        except Exception:
+            pass
+        try:
+            self.app.sound.play("alarm")
+        except Exception:
+            pass
 
     def start_scanner_listener(self):
         if self.scanner_thread and self.scanner_thread.is_alive():
@@ -236,42 +926,76 @@ class DonanimServisleri:
                 ip = self.app.veri.settings.get("scanner_ip", "192.168.1.12")
                 port = int(self.app.veri.settings.get("scanner_port", 23))
                 s.connect((ip, port))
+                self._scanner_sock = s
+                _log_scanner.info("Scanner bağlandı %s:%s", ip, port)
+                if self._record_enabled():
+                    self.recorder.connected(self._record_job(), time.monotonic())
                 self.app.root.after(0, lambda: getattr(self.app, 'set_device_state', lambda *a, **k: None)('scanner','connected'))
 
                 while True:
                     try:
                         data = s.recv(4096)
+                        # reject zamanlaması bu andan hesaplanır (UI kuyruğundan bağımsız)
+                        recv_ts = time.monotonic()
                         if not data:
                             break
-                        clean = data.replace(b'\x1d', b'')
-                        text = clean.decode('latin-1').strip()
-                        final_text = "".join([c for c in text if ord(c) >= 32])
-                        if final_text:
-                            self.app.root.after(0, self._on_scan, final_text)
+                        if self._record_enabled():
+                            self.recorder.write(self._record_job(), data, recv_ts)
+                        self.ingest_scanner_data(data, recv_ts)
                     except socket.timeout:
+                        self.recorder.flush()
                         continue
-                    except Exception:
+                    except Exception as e:
+                        _log_scanner.warning("Scanner bağlantısı koptu: %s", e)
                         break
+                self._scanner_sock = None
                 s.close()
-            except Exception:
+            except Exception as e:
+                _log_scanner.warning("Scanner'a bağlanılamadı: %s", e)
+                self._scanner_sock = None
                 self.app.root.after(0, lambda: getattr(self.app, 'set_device_state', lambda *a, **k: None)('scanner','disconnected'))
                 time.sleep(3)
 
-    def _on_scan(self, code: str):
+    def ingest_scanner_data(self, data: bytes, recv_ts: float):
+        """Scanner'dan gelen bir parça -> okuma (soket thread'i ve kayıt tekrarı aynı yolu kullanır)."""
+        clean = data.replace(b'\x1d', b'')
+        text = clean.decode('latin-1').strip()
+        final_text = "".join([c for c in text if ord(c) >= 32])
+        if final_text:
+            self.app.root.after(0, self._on_scan, final_text, recv_ts)
+
+    def _record_enabled(self) -> bool:
+        try:
+            return int(self.app.veri.settings.get("scan_record", 1) or 0) == 1
+        except Exception:
+            return False
+
+    def _record_job(self):
+        return getattr(self.app, "current_job_id", None) or getattr(self.app, "current_file", None)
+
+    def _on_scan(self, code: str, recv_ts: float | None = None):
         if int(self.app.var_short_code.get()) == 1:
             code = format_to_gs1_short(code)
-        self.app.process_barcode(code)
+        self.app.process_barcode(code, recv_ts=recv_ts)
 
-    def print_label(self, text: str, ptype: str, target_printer: str | None = None):
+    def end_print_job(self, job_key) -> None:
+        """İş değişti: eski işin ürün yazıcı grubu sticky anahtarlarını bırak."""
+        if job_key and self.prod_group is not None:
+            self.prod_group.forget(f"{job_key}|")
+
+    def print_label(self, text: str, ptype: str, target_printer: str | None = None, sticky_key: str | None = None):
         """Etiket basar (SADECE SOCKET).
         ptype: Etiket layout tipi
             - "box"  : Koli etiketi ayarları (ZD230 varsayılan)
             - "prod" : Ürün etiketi ayarları (ZT411 varsayılan)
         target_printer:
-            - None    -> ptype ile aynı cihaza gönderir
+            - None    -> box: BOX yazıcı; prod: ürün yazıcı grubu (prod/prod2, ayar: prod_dispatch)
             - "box"  -> BOX yazıcı IP/Port
             - "prod" -> ÜRÜN yazıcı IP/Port
             - "prod2"-> ÜRÜN-2 (yedek) yazıcı IP/Port
+            - "prod_group" -> ürün yazıcı grubu
+        sticky_key: sırası korunması gereken etiketler için (aynı anahtar -> aynı yazıcı),
+            "<iş>|<koli>" biçiminde (bkz. end_print_job)
         """
         if not text or text == "-" or "LİSTE" in str(text):
             return
@@ -279,6 +1003,16 @@ class DonanimServisleri:
         s = self.app.veri.settings
 
         device = (target_printer or ptype).strip().lower()
+        # Ürün etiketi hedef verilmeden (veya "prod_group") istenirse prod/prod2 grubuna dağıt
+        if ptype != "box" and self.prod_group is not None and (target_printer is None or device == "prod_group"):
+            if not any(self._printer_address(m) for m in self.prod_group.members):
+                device = "prod"  # IP uyarısı aşağıda
+            else:
+                self.prod_group.mode = str(s.get("prod_dispatch", self.prod_group.mode) or "single")
+                self.prod_group.dispatch(self.render_zpl(text, "prod"), 1, text, sticky_key=sticky_key)
+                return
+        if device == "prod_group":
+            device = "prod"
         dev_map = {
             "box": ("box_ip", "box_port", "BOX (ZD230)"),
             "prod": ("prod_ip", "prod_port", "ÜRÜN (ZT411)"),
@@ -303,18 +1037,60 @@ class DonanimServisleri:
                 pass
             return
 
-        try:
-            dpi = int(s.get("printer_dpi", 203) or 203)
-        except Exception:
-            dpi = 203
-
         if ptype == "box":
             try:
                 copies = int(s.get("box_copies", 1))
             except Exception:
                 copies = 1
+            zpl = self._box_zpl_cache.get(self._zpl_cache_key(text, "box"))
+            if zpl is None:
+                zpl = self.render_zpl(text, "box")
+            self._submit_print(device, ip, port, zpl, max(1, copies), text)
+            return
+
+        # varsayılan: prod
+        zpl = self.render_zpl(text, "prod")
+        self._submit_print(device, ip, port, zpl, 1, text)
 
-            zpl = generate_gs1_datamatrix_zpl(
+    def _submit_print(self, device: str, ip: str, port: int, zpl: str, copies: int, label: str):
+        """Kuyruk varsa kalıcı kuyruğa yazar (FIFO + onay + yeniden deneme);
+        yoksa eski yol: kopyalar tek thread'de sırayla gönderilir."""
+        if device not in self.PRINTER_DEVICES:
+            device = "prod"
+        if self.print_spool is not None:
+            self.print_spool.enqueue(device, zpl, copies=copies, label=label)
+            return
+        threading.Thread(
+            target=self._send_copies, args=(ip, port, zpl, copies, device == "box"), daemon=True
+        ).start()
+
+    # --- ZPL üretimi + koli etiketi ön hazırlık ---
+    def _layout_key(self, ptype: str) -> tuple:
+        s = self.app.veri.settings
+        p = "box" if ptype == "box" else "prod"
+        return (
+            p,
+            s.get("printer_dpi", 203),
+            s.get(f"{p}_darkness", 20),
+            s.get(f"{p}_w", 50),
+            s.get(f"{p}_h", 50 if p == "box" else 30),
+            s.get(f"{p}_x", 0),
+            s.get(f"{p}_y", 0),
+            s.get(f"{p}_module", 6),
+        )
+
+    def _zpl_cache_key(self, text: str, ptype: str) -> tuple:
+        return (text, self._layout_key(ptype))
+
+    def render_zpl(self, text: str, ptype: str) -> str:
+        """Etiket ZPL'ini ayarlardaki yerleşime göre üretir (box | prod)."""
+        s = self.app.veri.settings
+        try:
+            dpi = int(s.get("printer_dpi", 203) or 203)
+        except Exception:
+            dpi = 203
+        if ptype == "box":
+            return generate_gs1_datamatrix_zpl(
                 text,
                 darkness=s.get("box_darkness", 20),
                 width_mm=s.get("box_w", 50),
@@ -324,13 +1100,7 @@ class DonanimServisleri:
                 dpi=dpi,
                 module_size=s.get("box_module", 6),
             )
-            for _ in range(max(1, copies)):
-                threading.Thread(target=self.send_zpl_via_socket, args=(ip, port, zpl), daemon=True).start()
-                time.sleep(0.15)
-            return
-
-        # varsayılan: prod
-        zpl = generate_gs1_datamatrix_zpl(
+        return generate_gs1_datamatrix_zpl(
             text,
             darkness=s.get("prod_darkness", 20),
             width_mm=s.get("prod_w", 50),
@@ -340,16 +1110,71 @@ class DonanimServisleri:
             dpi=dpi,
             module_size=s.get("prod_module", 6),
         )
-        threading.Thread(target=self.send_zpl_via_socket, args=(ip, port, zpl), daemon=True).start()
 
-    def send_zpl_via_socket(self, ip: str, port: int, data: str):
+    def prepare_box_labels(self, labels: list[str]):
+        """Sıradaki koli etiketlerini önceden hazırlar (next_print_info'dan itibaren K adet).
+        - ZPL arka planda üretilip önbellekte tutulur (anahtar: etiket + yerleşim ayarları)
+        - Koli yazıcısı bağlantısı açık tutulur; koli dolunca etiket bekletmeden gider
+        Liste değişmediyse hiçbir şey yapmaz (update_ui sık çağırır).
+        """
+        labels = [x for x in labels if x and x != "-" and "LİSTE" not in str(x)]
+        sig = (tuple(labels), self._layout_key("box"))
+        if sig == self._box_lookahead_sig:
+            return
+        self._box_lookahead_sig = sig
+        s = self.app.veri.settings
+        ip = (s.get("box_ip") or "").strip()
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(2)
-                s.connect((ip, port))
-                s.sendall(data.encode("utf-8"))
+            port = int(s.get("box_port", 9100) or 9100)
+        except Exception:
+            port = 9100
+        printer_on = bool(int(s.get("printer_enabled", 1) or 0))
+
+        def _work():
+            cache = {}
+            for text in labels:
+                key = self._zpl_cache_key(text, "box")
+                zpl = self._box_zpl_cache.get(key)
+                if zpl is None:
+                    try:
+                        zpl = self.render_zpl(text, "box")
+                    except Exception:
+                        continue
+                cache[key] = zpl
+            # sadece pencere içindekiler kalır (eski koliler düşer)
+            self._box_zpl_cache = cache
+            if ip and printer_on and labels:
+                link = self.printer_link(ip, port)
+                if link.lock.acquire(timeout=1):
+                    try:
+                        link.warm()
+                    finally:
+                        link.lock.release()
+
+        threading.Thread(target=_work, daemon=True).start()
+
+    def _send_copies(self, ip: str, port: int, zpl: str, copies: int, keep_open: bool):
+        for _ in range(copies):
+            if not self.send_zpl_via_socket(ip, port, zpl, keep_open=keep_open):
+                break
+
+    def send_zpl_via_socket(self, ip: str, port: int, data: str, keep_open: bool = False) -> bool:
+        link = self.printer_link(ip, port)
+        # izleyici yoklaması / kuyruk gönderimi sürüyorsa bekle (en fazla 3 sn); alınamazsa
+        # kilitsiz gönderme (izleyiciyle aynı oturuma yazılır) - gönderim başarısız sayılır
+        if not link.lock.acquire(timeout=3):
+            _log_printer.warning("Zebra meşgul (%s:%s): gönderilmedi", ip, port, extra={"ctx": {"ip": ip, "port": port}})
+            return False
+        ok = False
+        try:
+            ok = link.send(data.encode("utf-8"), keep_open=keep_open)
         except Exception as e:
-            print(f"Zebra Hatası ({ip}:{port}): {e}")
+            _log_printer.warning("Zebra hatası (%s:%s): %s", ip, port, e, extra={"ctx": {"ip": ip, "port": port}})
+        finally:
+            link.lock.release()
+        if self.printer_monitor is not None:
+            self.printer_monitor.report_print(ip, port, ok)
+        return ok
 
 
 # --- Backward compat: eski kod modül fonksiyonunu çağırırsa ---
@@ -0,0 +1,194 @@
+"""
+donma_bekcisi.py
+Selsil Pro V6 - Ana döngü (Tk) donma bekçisi
+
+- Tk thread'inde kalp atışı: her HEARTBEAT_MS'de bir after çağrısı zamanı kaydeder
+- Bekçi thread'i atışın ne kadar geciktiğini ölçer; gecikme eşiği (ayarlar.json:
+  "stall_ms", varsayılan 250) aşınca ana thread'in yığını sys._current_frames() ile
+  SAMPLE_S aralıkla örneklenir, döngü geri gelince donma süresiyle birlikte yazılır
+- Modal pencere (messagebox / wait_window): iç içe döngü kalp atışını sürdürür ama okuma
+  işlenmez; atış modal içinden geliyorsa bu süre de "MODAL" olarak yazılır (pencereyi
+  açan çağrı yığında görünür)
+- Günlük: logs/donmalar.log (1 MB'ta döner, 3 eski dosya); sayaçlar Yönetici Paneli'nde
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from gunluk import LOG_DIR
+
+LOG_NAME = "donmalar.log"
+LOG_MAX_BYTES = 1_000_000
+LOG_KEEP = 3
+HEARTBEAT_MS = 100
+SAMPLE_S = 0.05
+TOP_FRAMES = 12
+_MODAL_FUNCS = ("wait_window",)
+_MODAL_FILES = ("commondialog.py", "messagebox.py", "simpledialog.py", "filedialog.py")
+
+Cerceve = Tuple[str, int, str]
+
+
+def _stack(frame, limit: int = 40) -> Tuple[Cerceve, ...]:
+    """En içteki çerçeveden dışa doğru (dosya adı, satır, fonksiyon)."""
+    out = []
+    while frame is not None and len(out) < limit:
+        co = frame.f_code
+        out.append((os.path.basename(co.co_filename), frame.f_lineno, co.co_name))
+        frame = frame.f_back
+    return tuple(out)
+
+
+def _modal_depth(frame) -> int:
+    """Yığında modal pencere döngüsü varsa onu açan çağrının derinliği, yoksa -1."""
+    depth = 0
+    while frame is not None:
+        co = frame.f_code
+        if co.co_name in _MODAL_FUNCS or os.path.basename(co.co_filename) in _MODAL_FILES:
+            return depth
+        frame = frame.f_back
+        depth += 1
+    return -1
+
+
+class DonmaBekcisi:
+    def __init__(self, root, threshold_ms: float = 250.0, log_dir: str = LOG_DIR) -> None:
+        self.root = root
+        self.threshold_s = max(0.05, float(threshold_ms) / 1000.0)
+        self._log_dir = log_dir
+        self.path = os.path.join(log_dir, LOG_NAME)
+        self._main_id = threading.main_thread().ident
+        self._beat = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._after_id = None
+        self._lock = threading.Lock()
+        self._modal_since: Optional[float] = None
+        self._modal_stack: Tuple[Cerceve, ...] = ()
+        # sayaçlar (panel)
+        self.count = 0
+        self.modal_count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last: str = ""
+        self.last_at: Optional[float] = None
+
+    # -------------------------------
+    # Başlat / durdur
+    # -------------------------------
+    def start(self) -> "DonmaBekcisi":
+        if self._thread is not None:
+            return self
+        self._beat = time.monotonic()
+        self._after_id = self.root.after(HEARTBEAT_MS, self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name="DonmaBekcisi", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count, "modal": self.modal_count, "total_ms": round(self.total_ms),
+            "max_ms": round(self.max_ms), "last": self.last, "last_at": self.last_at,
+        }
+
+    # -------------------------------
+    # Tk thread'i
+    # -------------------------------
+    def _heartbeat(self) -> None:
+        now = time.monotonic()
+        self._beat = now
+        try:
+            caller = sys._getframe(1)
+            depth = _modal_depth(caller)
+        except Exception:
+            caller, depth = None, -1
+        if depth >= 0:
+            if self._modal_since is None:
+                self._modal_since = now
+                self._modal_stack = _stack(caller, 60)[depth:depth + TOP_FRAMES]
+        elif self._modal_since is not None:
+            dur = now - self._modal_since
+            stack, self._modal_since = self._modal_stack, None
+            if dur >= self.threshold_s:
+                self._record("MODAL", dur, [stack], stack)
+        if not self._stop.is_set():
+            self._after_id = self.root.after(HEARTBEAT_MS, self._heartbeat)
+
+    # -------------------------------
+    # Bekçi thread'i
+    # -------------------------------
+    def _watch(self) -> None:
+        interval = HEARTBEAT_MS / 1000.0
+        samples: List[Tuple[Cerceve, ...]] = []
+        started: Optional[float] = None
+        stall_beat = 0.0
+        while not self._stop.wait(SAMPLE_S):
+            beat = self._beat
+            if started is None:
+                if time.monotonic() - beat - interval < self.threshold_s:
+                    continue
+                started, stall_beat, samples = beat + interval, beat, []
+            elif beat != stall_beat:
+                # döngü geri geldi: süre = beklenen atıştan gerçekleşen atışa
+                self._record("DONMA", beat - started, samples, samples[-1] if samples else ())
+                started = None
+                continue
+            frame = sys._current_frames().get(self._main_id)
+            if frame is not None:
+                samples.append(_stack(frame)[:TOP_FRAMES])
+                del frame
+
+    # -------------------------------
+    # Günlük
+    # -------------------------------
+    def _record(self, kind: str, dur_s: float, samples: List[Tuple[Cerceve, ...]], fallback) -> None:
+        ms = dur_s * 1000.0
+        top = Counter(samples).most_common(1)
+        stack, hits = (top[0][0], top[0][1]) if top else (fallback, 0)
+        with self._lock:
+            if kind == "MODAL":
+                self.modal_count += 1
+            else:
+                self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            head = f"{stack[0][2]} ({stack[0][0]}:{stack[0][1]})" if stack else "?"
+            self.last = f"{kind} {ms:.0f} ms - {head}"
+            self.last_at = time.time()
+        lines = [f"{datetime.now():%Y-%m-%d %H:%M:%S} {kind} {ms:.0f} ms  ({hits}/{len(samples)} örnek aynı yığında)"]
+        # en sık görülen yığın, içten dışa
+        for fn, line, func in stack:
+            lines.append(f"    {fn}:{line} {func}")
+        own = Counter(s[0] for s in samples if s)
+        if len(own) > 1:
+            lines.append("  en içteki çerçeveler: " + ", ".join(f"{f[2]}@{f[0]}:{f[1]} x{n}" for f, n in own.most_common(5)))
+        self._write("\n".join(lines) + "\n")
+
+    def _write(self, text: str) -> None:
+        try:
+            os.makedirs(self._log_dir, exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(text) > LOG_MAX_BYTES:
+                for i in range(LOG_KEEP - 1, 0, -1):
+                    src = f"{self.path}.{i}"
+                    if os.path.exists(src):
+                        os.replace(src, f"{self.path}.{i + 1}")
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            pass
@@ -0,0 +1,200 @@
+"""
+gunluk.py
+Selsil Pro V6 - Yapılandırılmış (JSON satırı) uygulama günlüğü
+
+- Çağıran thread sadece kaydı kuyruğa atar (QueueHandler); JSON'a çevirme ve dosyaya
+  yazma ayrı bir thread'de (QueueListener). Scanner / UI thread'i disk beklemez
+- Dosya: logs/selsil.jsonl - boyut (log_max_mb, varsayılan 5) ya da yaş (log_max_hours,
+  varsayılan 24) dolunca döner, log_keep (varsayılan 5) eski dosya tutulur
+- Alt sistemler: scanner, printer, reject, db, ui -> logger "selsil.<alt sistem>"
+  ayarlar.json: "log_levels": {"scanner": "INFO", "db": "WARNING", ...}, varsayılan "log_level"
+- Tekrarlayan hata bastırma: aynı yerden (logger + dosya + satır) gelen uyarı / hata
+  LIMIT_WINDOW_S içinde en çok LIMIT_BURST kez yazılır; sonraki pencerenin ilk kaydı
+  kaç kaydın bastırıldığını "suppressed" alanında taşır. Bastırılan kayıt biçimlenmez
+- Ek alanlar: log.warning("...", extra={"ctx": {"ip": ip}}) -> JSON'da "ctx"
+- kur() çağrılmadan önce de kullanılabilir (Python'un varsayılanı: uyarılar konsola)
+"""
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+LOG_NAME = "selsil.jsonl"
+ROOT = "selsil"
+SUBSYSTEMS = ("scanner", "printer", "reject", "db", "ui")
+LIMIT_WINDOW_S = 60.0
+LIMIT_BURST = 5
+LIMIT_KEYS = 1000
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_lock = threading.Lock()
+
+
+def al(sub: str) -> logging.Logger:
+    """Alt sistem logger'ı (ör. al("printer"))."""
+    return logging.getLogger(f"{ROOT}.{sub}")
+
+
+class _TekrarSuzgeci(logging.Filter):
+    """Aynı yerden tekrarlayan uyarı / hataları pencere başına LIMIT_BURST ile sınırlar (O(1), sabit bellek)."""
+
+    def __init__(self, window_s: float = LIMIT_WINDOW_S, burst: int = LIMIT_BURST) -> None:
+        super().__init__()
+        self.window_s = window_s
+        self.burst = burst
+        self._seen: dict = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = record.created
+        with self._lock:
+            st = self._seen.get(key)
+            if st is None or now - st[0] >= self.window_s:
+                if st is not None and st[2]:
+                    record.suppressed = st[2]
+                if st is None and len(self._seen) >= LIMIT_KEYS:
+                    self._seen.clear()
+                self._seen[key] = [now, 1, 0]
+                return True
+            st[1] += 1
+            if st[1] <= self.burst:
+                return True
+            st[2] += 1
+            return False
+
+
+class _KuyrukHandler(QueueHandler):
+    """Çağıran thread'de sadece mesaj birleştirilir (ve varsa traceback metne çevrilir)."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _JsonBicim(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        d = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "lvl": record.levelname,
+            "sub": record.name.split(".", 1)[-1],
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+            "at": f"{os.path.basename(record.pathname)}:{record.lineno}",
+        }
+        ctx = getattr(record, "ctx", None)
+        if ctx:
+            d["ctx"] = ctx
+        n = getattr(record, "suppressed", 0)
+        if n:
+            d["suppressed"] = n
+        if record.exc_text:
+            d["exc"] = record.exc_text
+        return json.dumps(d, ensure_ascii=False, default=str)
+
+
+class _DonenDosya(RotatingFileHandler):
+    """Boyut ya da yaş dolunca döner (.1 .. .N)."""
+
+    def __init__(self, path: str, max_bytes: int, backup: int, max_age_s: float) -> None:
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup, encoding="utf-8", delay=True)
+        self.max_age_s = max_age_s
+        self._opened = time.time()
+
+    def shouldRollover(self, record) -> bool:
+        if self.max_age_s > 0 and time.time() - self._opened >= self.max_age_s:
+            try:
+                if os.path.getsize(self.baseFilename) > 0:
+                    return True
+            except OSError:
+                pass
+            self._opened = time.time()
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._opened = time.time()
+
+
+def _level(v, default: int = logging.INFO) -> int:
+    if isinstance(v, int):
+        return v
+    lv = logging.getLevelName(str(v or "").strip().upper())
+    return lv if isinstance(lv, int) else default
+
+
+def kur(settings: Optional[dict] = None, log_dir: str = LOG_DIR) -> None:
+    """Günlüğü kurar (ikinci çağrıda sadece seviyeleri günceller)."""
+    global _listener, _queue_handler
+    s = settings or {}
+    base = _level(s.get("log_level", "INFO"))
+    levels = s.get("log_levels") or {}
+    root = logging.getLogger(ROOT)
+    root.setLevel(base)
+    for sub in set(SUBSYSTEMS) | set(levels):
+        al(sub).setLevel(_level(levels.get(sub), base))
+    with _lock:
+        if _listener is not None:
+            return
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+        except Exception:
+            pass
+        fh = _DonenDosya(
+            os.path.join(log_dir, LOG_NAME),
+            max_bytes=int(float(s.get("log_max_mb", 5) or 5) * 1_000_000),
+            backup=int(s.get("log_keep", 5) or 5),
+            max_age_s=float(s.get("log_max_hours", 24) or 0) * 3600.0,
+        )
+        fh.setFormatter(_JsonBicim())
+        con = logging.StreamHandler()
+        con.setLevel(logging.WARNING)
+        con.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        q: queue.SimpleQueue = queue.SimpleQueue()
+        qh = _KuyrukHandler(q)
+        qh.addFilter(_TekrarSuzgeci())
+        root.addHandler(qh)
+        root.propagate = False
+        _queue_handler = qh
+        _listener = QueueListener(q, fh, con, respect_handler_level=True)
+        _listener.start()
+
+
+def kapat() -> None:
+    """Kuyruktakileri yazar ve dinleyiciyi durdurur."""
+    global _listener, _queue_handler
+    with _lock:
+        lis, _listener = _listener, None
+        qh, _queue_handler = _queue_handler, None
+    if lis is not None:
+        try:
+            lis.stop()
+        except Exception:
+            pass
+        for h in lis.handlers:
+            try:
+                h.close()
+            except Exception:
+                pass
+    if qh is not None:
+        root = logging.getLogger(ROOT)
+        root.removeHandler(qh)
+        root.propagate = True
@@ -0,0 +1,107 @@
+"""
+hiz_olcer.py
+Selsil Pro V6 - Okuma hızı tahmini (hız göstergesi ve tahmini bitiş)
+
+- Saniye kovaları: son WINDOW_S saniyenin okuma sayıları halka dizide (sabit bellek);
+  son 1 dk'nın tam sayısı ayrıca tutulur, tavan yok (eski 600'lük deque 10 okuma/sn'de doyuyordu)
+- Üstel hareketli ortalama (EWMA): 10 sn / 1 dk / 15 dk ufukları, her kapanan saniyede
+  güncellenir; boş geçen saniyeler tek adımda (üs ile) sönümlenir
+- Isınma düzeltmesi: ilk okumadan bu yana geçen süre ufuktan kısaysa ortalama sıfırdan
+  başladığı için düşük kalmaz (ağırlık toplamına bölünür)
+- Okuma başına maliyet O(1): kaydet() sadece sayaç artırır; saniye kapanışı en çok
+  WINDOW_S kova temizler
+- Saat: time.monotonic (duvar saati ileri / geri alınsa da hız bozulmaz)
+"""
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Optional
+
+HORIZONS = (10, 60, 900)
+WINDOW_S = 60
+
+
+class HizOlcer:
+    def __init__(self, horizons=HORIZONS, clock: Callable[[], float] = time.monotonic) -> None:
+        self.horizons = tuple(int(h) for h in horizons)
+        self._clock = clock
+        self._keep = [math.exp(-1.0 / h) for h in self.horizons]
+        self._ewma = [0.0] * len(self.horizons)
+        self._weight = [0.0] * len(self.horizons)
+        self._ring = [0] * WINDOW_S
+        self._window = 0
+        self._sec: Optional[int] = None
+        self._cur = 0
+        self.total = 0
+
+    def reset(self) -> None:
+        self._ewma = [0.0] * len(self.horizons)
+        self._weight = [0.0] * len(self.horizons)
+        self._ring = [0] * WINDOW_S
+        self._window = 0
+        self._sec = None
+        self._cur = 0
+        self.total = 0
+
+    def kaydet(self, n: int = 1, now: Optional[float] = None) -> None:
+        """Okuma(lar)ı şu anki saniyenin kovasına ekler."""
+        self._advance(int(self._clock() if now is None else now))
+        self._cur += n
+        self.total += n
+
+    def _advance(self, sec: int) -> None:
+        if self._sec is None:
+            self._sec = sec
+            return
+        gap = sec - self._sec
+        if gap <= 0:
+            return
+        # kapanan saniye
+        self._push(self._sec, self._cur)
+        for i, k in enumerate(self._keep):
+            self._ewma[i] = self._ewma[i] * k + self._cur * (1.0 - k)
+            self._weight[i] = self._weight[i] * k + (1.0 - k)
+        # aradaki boş saniyeler (tek adımda)
+        idle = gap - 1
+        if idle > 0:
+            for j in range(1, min(idle, WINDOW_S) + 1):
+                self._push(self._sec + j, 0)
+            for i, k in enumerate(self._keep):
+                d = k ** idle
+                self._ewma[i] *= d
+                self._weight[i] = self._weight[i] * d + (1.0 - d)
+        self._sec = sec
+        self._cur = 0
+
+    def _push(self, sec: int, count: int) -> None:
+        slot = sec % WINDOW_S
+        self._window += count - self._ring[slot]
+        self._ring[slot] = count
+
+    # -------------------------------
+    # Okuma
+    # -------------------------------
+    def rate(self, horizon: int = 60) -> float:
+        """Ufuk (sn) için okuma/sn; ufuk listede yoksa en yakını kullanılır."""
+        self._advance(int(self._clock()))
+        i = min(range(len(self.horizons)), key=lambda j: abs(self.horizons[j] - horizon))
+        w = self._weight[i]
+        return self._ewma[i] / w if w > 1e-9 else 0.0
+
+    def per_min(self, horizon: int = 60) -> float:
+        return self.rate(horizon) * 60.0
+
+    def last_minute(self) -> int:
+        """Son WINDOW_S tam saniyedeki okuma sayısı."""
+        self._advance(int(self._clock()))
+        return self._window
+
+    def eta(self, remaining: int, horizon: int = 60) -> Optional[int]:
+        """Kalan adet için saniye; hız yoksa None."""
+        if remaining <= 0:
+            return 0
+        r = self.rate(horizon)
+        if r <= 1e-6:
+            return None
+        return int(round(remaining / r))
@@ -10,6 +10,11 @@ Amaç:
 Not:
 Bu modül, mevcut veri_yonetimi.py içindeki eski "jobs" tablosunu bozmaz.
 Yeni tablolar: jobs_v2, job_items_v2
+Arama: job_items_fts (FTS5, mümkünse trigram) - barkod / GTIN / seri / koli etiketi,
+tüm işlerde. job_items_v2 üzerindeki tetikleyicilerle güncel tutulur.
+Şema sürümü: PRAGMA user_version + schema_migrations tablosu; her adım bir kez çalışır.
+Eski `jobs` tablosunun aktarımı kurucuda yapılmaz: start_legacy_migration() ile arka planda,
+iş iş (her biri ayrı transaction) ve yarıda kalırsa kaldığı yerden devam ederek yapılır.
 """
 from __future__ import annotations
 
@@ -31,6 +36,21 @@ def _now_iso() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+def _now_read_at() -> str:
+    """Okuma zamanı (milisaniye): ana ekrandaki read_at ile aynı biçim."""
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+def _gs1_fields(raw: str) -> Tuple[str, str]:
+    """Barkoddan (GTIN, seri) çıkarır; GS1 değilse boş döner."""
+    try:
+        import code_parser
+        ai = code_parser.parse_gs1(raw or "")
+        return ai.get("01", "") or "", ai.get("21", "") or ""
+    except Exception:
+        return "", ""
+
+
 @dataclass
 class JobHeader:
     job_id: str
@@ -45,147 +65,273 @@ class JobHeader:
 
 
 class JobYonetimi:
+    # Şema sürümü (PRAGMA user_version). Her adım bir kez çalışır ve schema_migrations'a yazılır.
+    # Hafif adımlar kurucuda (senkron) çalışır; eski kayıt aktarımı (LEGACY_STEP) ağırdır ve
+    # start_legacy_migration() ile arka planda, kaldığı yerden devam edebilir şekilde yapılır.
+    SCHEMA_STEPS = (
+        (1, "base_tables", "_ensure_tables"),
+        (2, "search_index", "_ensure_search_index"),
+    )
+    SCHEMA_VERSION = 2
+    LEGACY_STEP = "legacy_jobs"
+
     def __init__(self, db_path: Optional[str] = None) -> None:
         self.db_path = db_path or DB_PATH
-        self.conn = sqlite3.connect(self.db_path)
+        # açılışta arka planda kurulup UI thread'ine devredilebilir (aynı anda tek thread kullanır)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
-        self._ensure_tables()
-        self._migrate_legacy_jobs_if_needed()
+        self._migrate_schema()
+
+    # -------------------------------
+    # Şema / migration
+    # -------------------------------
+    def _migrate_schema(self) -> None:
+        """Sürümü geride kalan şema adımlarını uygular (güncel DB'de tek PRAGMA sorgusu)."""
+        cur = self.conn.cursor()
+        version = int(cur.execute("PRAGMA user_version").fetchone()[0] or 0)
+        if version >= self.SCHEMA_VERSION:
+            return
+        self._ensure_migrations_table()
+        for step, name, method in self.SCHEMA_STEPS:
+            if step <= version:
+                continue
+            getattr(self, method)()
+            cur.execute(f"PRAGMA user_version = {int(step)}")
+            self._set_migration(name, "DONE")
+            self.conn.commit()
+
+    def _ensure_migrations_table(self) -> None:
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name TEXT PRIMARY KEY,
+                status TEXT,
+                plan_json TEXT,
+                position INTEGER DEFAULT 0,
+                total INTEGER DEFAULT 0,
+                updated_at TEXT
+            )
+            """
+        )
 
+    def _set_migration(self, name: str, status: str, plan: Optional[List[str]] = None,
+                       position: int = 0, total: int = 0) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO schema_migrations (name, status, plan_json, position, total, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                status=excluded.status,
+                plan_json=COALESCE(excluded.plan_json, schema_migrations.plan_json),
+                position=excluded.position,
+                total=excluded.total,
+                updated_at=excluded.updated_at
+            """,
+            (name, status, None if plan is None else json.dumps(plan, ensure_ascii=False),
+             int(position), int(total), _now_iso()),
+        )
 
-    def _migrate_legacy_jobs_if_needed(self) -> None:
+    def migration_status(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """{"status": PENDING|RUNNING|DONE, "position": n, "total": m} (varsayılan: eski kayıt aktarımı)."""
+        self._ensure_migrations_table()
+        row = self.conn.execute(
+            "SELECT status, position, total FROM schema_migrations WHERE name=?",
+            (name or self.LEGACY_STEP,),
+        ).fetchone()
+        if row is None:
+            return {"status": "PENDING", "position": 0, "total": 0}
+        return {"status": row[0], "position": int(row[1] or 0), "total": int(row[2] or 0)}
+
+    def legacy_migration_pending(self) -> bool:
+        return self.migration_status()["status"] != "DONE"
+
+    def run_legacy_migration(self, on_progress=None, stop_event=None) -> bool:
         """
         Eski V3/V4 formatındaki `jobs` tablosunu (filename, work_list, box_labels, count, box_size, last_updated)
         yeni Job V2 tablolarına aktarır.
 
-        - Sadece `jobs_v2` boşsa çalışır (tekrar tekrar kopyalamaz).
+        - Sadece ilk çalıştırmada `jobs_v2` boşsa aktarır (tekrar tekrar kopyalamaz).
+        - Aktarılacak dosya listesi (plan) başta kaydedilir; her iş kendi transaction'ında yazılır
+          ve konum ilerletilir. Yarıda kalırsa sonraki çalıştırmada kaldığı yerden devam eder.
         - job_id olarak `legacy::<filename>` kullanır (benzersiz + deterministik).
+        - on_progress(yapılan, toplam) çağıran thread'den çağrılır.
+        Tamamlandıysa True döner.
         """
-        try:
-            cur = self.conn.cursor()
+        state = self._legacy_plan()
+        if state is None:
+            return True
+        plan, position = state
+        cur = self.conn.cursor()
+        total = len(plan)
+        while position < total:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            filename = plan[position]
+            position += 1
+            try:
+                with self.conn:
+                    self._migrate_legacy_job(cur, filename)
+                    self._set_migration(self.LEGACY_STEP, "RUNNING", position=position, total=total)
+            except Exception:
+                # tek bir kayıtta hata olsa bile diğerlerini taşımaya devam et
+                with self.conn:
+                    self._set_migration(self.LEGACY_STEP, "RUNNING", position=position, total=total)
+            if on_progress is not None:
+                try:
+                    on_progress(position, total)
+                except Exception:
+                    pass
+        self._set_migration(self.LEGACY_STEP, "DONE", position=total, total=total)
+        self.conn.commit()
+        return True
 
-            # V2 tablolarında kayıt var mı?
-            v2_cnt = cur.execute("SELECT COUNT(*) FROM jobs_v2").fetchone()[0]
-            if v2_cnt and int(v2_cnt) > 0:
-                return
+    def _legacy_plan(self) -> Optional[Tuple[List[str], int]]:
+        """Aktarım planını (ilk seferde) kaydeder; (plan, konum) ya da bitmişse None döner."""
+        self._ensure_migrations_table()
+        cur = self.conn.cursor()
+        row = cur.execute(
+            "SELECT status, plan_json, position FROM schema_migrations WHERE name=?", (self.LEGACY_STEP,)
+        ).fetchone()
+        if row is not None and row[0] == "DONE":
+            return None
+        if row is not None and row[0] == "RUNNING":
+            try:
+                plan = json.loads(row[1] or "[]")
+            except Exception:
+                plan = []
+            return plan, int(row[2] or 0)
+        v2_cnt = int(cur.execute("SELECT COUNT(*) FROM jobs_v2").fetchone()[0] or 0)
+        legacy_exists = cur.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='jobs'"
+        ).fetchone()
+        plan: List[str] = []
+        if v2_cnt == 0 and legacy_exists:
+            plan = [
+                (r[0] or "").strip()
+                for r in cur.execute("SELECT filename FROM jobs ORDER BY filename").fetchall()
+                if (r[0] or "").strip()
+            ]
+        if not plan:
+            self._set_migration(self.LEGACY_STEP, "DONE")
+            self.conn.commit()
+            return None
+        self._set_migration(self.LEGACY_STEP, "RUNNING", plan=plan, position=0, total=len(plan))
+        self.conn.commit()
+        return plan, 0
 
-            # Eski tablo var mı?
-            legacy_exists = cur.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='jobs'"
-            ).fetchone()
-            if not legacy_exists:
-                return
+    def migrate_legacy_job(self, filename: str) -> bool:
+        """
+        Tek eski kaydı (devam edilecek iş) hemen aktarır; arka plan aktarımı onu atlar.
+        Plan önce kaydedilir ki bu iş jobs_v2'ye yazıldıktan sonra diğerleri plandan düşmesin.
+        V2'de iş varsa (ya da eski kayıt yoksa) dokunmaz. İş V2'de hazırsa True döner.
+        """
+        filename = (filename or "").strip()
+        if not filename:
+            return False
+        try:
+            self._legacy_plan()
+        except Exception:
+            pass
+        cur = self.conn.cursor()
+        with self.conn:
+            self._migrate_legacy_job(cur, filename)
+        return cur.execute(
+            "SELECT 1 FROM jobs_v2 WHERE job_id=?", (f"legacy::{filename}",)
+        ).fetchone() is not None
+
+    def _migrate_legacy_job(self, cur: sqlite3.Cursor, filename: str) -> None:
+        r = cur.execute(
+            "SELECT filename, work_list, box_labels, count, box_size, last_updated FROM jobs WHERE filename=?",
+            (filename,),
+        ).fetchone()
+        if r is None:
+            return
+        job_id = f"legacy::{filename}"
+        # daha önce aktarıldıysa (devam edilen iş) V2'deki güncel hali ezme
+        if cur.execute("SELECT 1 FROM jobs_v2 WHERE job_id=?", (job_id,)).fetchone() is not None:
+            return
 
-            rows = cur.execute(
-                "SELECT filename, work_list, box_labels, count, box_size, last_updated FROM jobs"
-            ).fetchall()
-            if not rows:
-                return
+        work_list_txt = r[1] or ""
+        done_count = int(r[3] or 0)
+        box_size = int(r[4] or 0)
+        last_updated = r[5] or ""
 
-            for r in rows:
-                try:
-                    filename = (r[0] or "").strip()
-                    if not filename:
-                        continue
-                    job_id = f"legacy::{filename}"
-
-                    work_list_txt = r[1] or ""
-                    box_labels_txt = r[2] or ""
-                    done_count = int(r[3] or 0)
-                    box_size = int(r[4] or 0)
-                    last_updated = r[5] or ""
-
-                    # legacy timestamp -> iso
-                    upd_iso = ""
-                    try:
-                        ts = float(last_updated)
-                        upd_iso = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
-                    except Exception:
-                        upd_iso = str(last_updated)
-
-                    # work_list parse
-                    items_obj = None
-                    try:
-                        items_obj = json.loads(work_list_txt) if work_list_txt else None
-                    except Exception:
-                        items_obj = None
-                    items_list = []
-                    if isinstance(items_obj, dict) and isinstance(items_obj.get("list"), list):
-                        items_list = items_obj.get("list") or []
-                    elif isinstance(items_obj, list):
-                        items_list = items_obj
-                    total = len(items_list)
-
-                    settings = {
-                        "legacy": True,
-                        "box_size": box_size,
-                        "done_count": done_count,
-                        "total_count": total,
-                    }
-                    settings_json = json.dumps(settings, ensure_ascii=False)
-
-                    # header insert
-                    cur.execute(
-                        """
-                        INSERT OR REPLACE INTO jobs_v2
-                        (job_id, job_name, prod_file, box_file, status, created_at, updated_at, settings_json, current_koli_no)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            job_id,
-                            filename,
-                            filename,
-                            "",
-                            "LEGACY",
-                            upd_iso,
-                            upd_iso,
-                            settings_json,
-                            1,
-                        ),
-                    )
-
-                    # items insert
-                    cur.execute("DELETE FROM job_items_v2 WHERE job_id=?", (job_id,))
-                    for it in items_list:
-                        if not isinstance(it, dict):
-                            continue
-                        display_id = int(it.get("id") or 0)
-                        raw = it.get("raw") or ""
-                        raw_disp = it.get("raw_disp") or raw
-                        status = it.get("status") or "PENDING"
-                        koli_no = it.get("box")
-                        if koli_no in (None, "", "-"):
-                            koli_no = 0
-                        try:
-                            koli_no = int(koli_no)
-                        except Exception:
-                            koli_no = 0
-                        koli_label = it.get("label") or "-"
-                        read_at = it.get("read_at") or ""
-                        reject_sent = 1 if int(it.get("reject_sent") or 0) else 0
-                        in_box = it.get("in_box") or ""
-
-                        cur.execute(
-                            """
-                            INSERT INTO job_items_v2
-                            (job_id, display_id, barkod_raw, barkod_disp, status, koli_no, koli_label, read_at, reject_sent, in_box)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (job_id, display_id, raw, raw_disp, status, koli_no, koli_label, read_at, reject_sent, in_box),
-                        )
-                except Exception:
-                    # tek bir kayıtta hata olsa bile diğerlerini taşımaya çalış
-                    continue
+        # legacy timestamp -> iso
+        upd_iso = ""
+        try:
+            ts = float(last_updated)
+            upd_iso = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+        except Exception:
+            upd_iso = str(last_updated)
 
-            self.conn.commit()
+        # work_list parse
+        items_obj = None
+        try:
+            items_obj = json.loads(work_list_txt) if work_list_txt else None
         except Exception:
-            # migration hatası uygulamayı düşürmesin
+            items_obj = None
+        items_list = []
+        if isinstance(items_obj, dict) and isinstance(items_obj.get("list"), list):
+            items_list = items_obj.get("list") or []
+        elif isinstance(items_obj, list):
+            items_list = items_obj
+        total = len(items_list)
+
+        settings = {
+            "legacy": True,
+            "box_size": box_size,
+            "done_count": done_count,
+            "total_count": total,
+        }
+        settings_json = json.dumps(settings, ensure_ascii=False)
+
+        # header insert
+        cur.execute(
+            """
+            INSERT OR REPLACE INTO jobs_v2
+            (job_id, job_name, prod_file, box_file, status, created_at, updated_at, settings_json, current_koli_no)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job_id, filename, filename, "", "LEGACY", upd_iso, upd_iso, settings_json, 1),
+        )
+
+        # items insert
+        cur.execute("DELETE FROM job_items_v2 WHERE job_id=?", (job_id,))
+        rows = []
+        for it in items_list:
+            if not isinstance(it, dict):
+                continue
             try:
-                self.conn.rollback()
+                display_id = int(it.get("id") or 0)
             except Exception:
-                pass
-            return
-
+                display_id = 0
+            raw = it.get("raw") or ""
+            raw_disp = it.get("raw_disp") or raw
+            status = it.get("status") or "PENDING"
+            koli_no = it.get("box")
+            if koli_no in (None, "", "-"):
+                koli_no = 0
+            try:
+                koli_no = int(koli_no)
+            except Exception:
+                koli_no = 0
+            koli_label = it.get("label") or "-"
+            read_at = it.get("read_at") or ""
+            try:
+                reject_sent = 1 if int(it.get("reject_sent") or 0) else 0
+            except Exception:
+                reject_sent = 0
+            in_box = it.get("in_box") or ""
+            gtin, serial = _gs1_fields(raw)
+            rows.append((job_id, display_id, raw, raw_disp, status, koli_no, koli_label, read_at, reject_sent, in_box, gtin, serial))
+        cur.executemany(
+            """
+            INSERT INTO job_items_v2
+            (job_id, display_id, barkod_raw, barkod_disp, status, koli_no, koli_label, read_at, reject_sent, in_box, gtin, serial)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
 
     def close(self) -> None:
         try:
@@ -230,6 +376,65 @@ class JobYonetimi:
         )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_job_items_job ON job_items_v2(job_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_job_items_display ON job_items_v2(job_id, display_id)")
+
+    def _ensure_search_index(self) -> None:
+        """GTIN / seri sütunları + FTS5 arama tablosu + tetikleyiciler (bir kez kurulur)."""
+        cur = self.conn.cursor()
+        cols = {r[1] for r in cur.execute("PRAGMA table_info(job_items_v2)").fetchall()}
+        if "gtin" not in cols:
+            cur.execute("ALTER TABLE job_items_v2 ADD COLUMN gtin TEXT")
+        if "serial" not in cols:
+            cur.execute("ALTER TABLE job_items_v2 ADD COLUMN serial TEXT")
+        exists = cur.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='job_items_fts'"
+        ).fetchone()
+        if exists:
+            self.conn.commit()
+            return
+        # mevcut kayıtlar: GTIN / seri doldur (tetikleyiciler kurulmadan önce)
+        rows = cur.execute("SELECT row_id, barkod_raw FROM job_items_v2 WHERE gtin IS NULL").fetchall()
+        cur.executemany(
+            "UPDATE job_items_v2 SET gtin=?, serial=? WHERE row_id=?",
+            [(*_gs1_fields(r[1]), r[0]) for r in rows],
+        )
+        try:
+            # trigram: parçalı (içeren) arama; SQLite >= 3.34
+            cur.execute(
+                "CREATE VIRTUAL TABLE job_items_fts USING fts5("
+                "barkod_disp, gtin, serial, koli_label, content='job_items_v2', content_rowid='row_id', "
+                "tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            try:
+                cur.execute(
+                    "CREATE VIRTUAL TABLE job_items_fts USING fts5("
+                    "barkod_disp, gtin, serial, koli_label, content='job_items_v2', content_rowid='row_id')"
+                )
+            except sqlite3.OperationalError:
+                # FTS5 yok: arama LIKE ile yapılır
+                self.conn.commit()
+                return
+        cur.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS job_items_fts_ai AFTER INSERT ON job_items_v2 BEGIN
+                INSERT INTO job_items_fts(rowid, barkod_disp, gtin, serial, koli_label)
+                VALUES (new.row_id, new.barkod_disp, new.gtin, new.serial, new.koli_label);
+            END;
+            CREATE TRIGGER IF NOT EXISTS job_items_fts_ad AFTER DELETE ON job_items_v2 BEGIN
+                INSERT INTO job_items_fts(job_items_fts, rowid, barkod_disp, gtin, serial, koli_label)
+                VALUES ('delete', old.row_id, old.barkod_disp, old.gtin, old.serial, old.koli_label);
+            END;
+            CREATE TRIGGER IF NOT EXISTS job_items_fts_au
+            AFTER UPDATE OF barkod_disp, gtin, serial, koli_label ON job_items_v2 BEGIN
+                INSERT INTO job_items_fts(job_items_fts, rowid, barkod_disp, gtin, serial, koli_label)
+                VALUES ('delete', old.row_id, old.barkod_disp, old.gtin, old.serial, old.koli_label);
+                INSERT INTO job_items_fts(rowid, barkod_disp, gtin, serial, koli_label)
+                VALUES (new.row_id, new.barkod_disp, new.gtin, new.serial, new.koli_label);
+            END;
+            """
+        )
+        # mevcut kayıtlar indekse
+        cur.execute("INSERT INTO job_items_fts(job_items_fts) VALUES('rebuild')")
         self.conn.commit()
 
     # -------------------------------
@@ -365,6 +570,48 @@ class JobYonetimi:
             )
         return header, items
 
+    def count_items(self, job_id: str) -> Dict[str, int]:
+        """{durum: adet}"""
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) FROM job_items_v2 WHERE job_id=? GROUP BY status", (job_id,)
+        ).fetchall()
+        return {(r[0] or "PENDING"): int(r[1] or 0) for r in rows}
+
+    def iter_items(self, job_id: str, status: Optional[str] = None, order: str = "id",
+                   limit: Optional[int] = None, batch: int = 2000):
+        """
+        Satırları load_job ile aynı biçimde, parça parça (fetchmany) döndürür; tüm iş belleğe alınmaz.
+        order: "id" (display_id) | "box" (koli no; kolisiz en sonda, koli içinde display_id)
+        """
+        sql = "SELECT display_id, barkod_raw, barkod_disp, status, koli_no, koli_label, in_box FROM job_items_v2 WHERE job_id=?"
+        args: List[Any] = [job_id]
+        if status:
+            sql += " AND status=?"
+            args.append(status)
+        if order == "box":
+            sql += " ORDER BY CASE WHEN koli_no IS NULL OR koli_no<0 THEN 999999 ELSE koli_no END, display_id"
+        else:
+            sql += " ORDER BY display_id"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        cur = self.conn.cursor()
+        cur.execute(sql, args)
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                break
+            for r in rows:
+                yield {
+                    "id": int(r[0] or 0),
+                    "raw": r[1] or "",
+                    "raw_disp": r[2] or "",
+                    "status": r[3] or "PENDING",
+                    "box": r[4] if r[4] is not None else "-",
+                    "label": r[5] or "-",
+                    "in_box": r[6] or "",
+                }
+
     # -------------------------------
     # Items
     # -------------------------------
@@ -384,32 +631,169 @@ class JobYonetimi:
                 koli_no = None
             koli_label = it.get("label", "") or ""
             in_box = it.get("in_box", "") or ""
+            gtin, serial = _gs1_fields(raw)
             cur.execute(
                 """
                 INSERT INTO job_items_v2
-                (job_id, display_id, barkod_raw, barkod_disp, status, koli_no, koli_label, read_at, reject_sent, in_box)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (job_id, display_id, barkod_raw, barkod_disp, status, koli_no, koli_label, read_at, reject_sent, in_box, gtin, serial)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (job_id, display_id, raw, raw_disp, status, koli_no, koli_label, None, 0, in_box),
+                (job_id, display_id, raw, raw_disp, status, koli_no, koli_label, it.get("read_at") or None, 0, in_box, gtin, serial),
             )
         self.conn.commit()
 
-    def reset_read_for_ids(self, job_id: str, display_ids: List[int]) -> None:
-        """Okunanı sil: kayıt kalsın, sadece okuma durumunu sıfırla."""
-        if not display_ids:
-            return
+    def update_item_status(
+        self,
+        job_id: str,
+        display_id: int,
+        status: str,
+        box_no: Optional[str] = None,
+        label: Optional[str] = None,
+        in_box: Optional[str] = None,
+        read_at: Optional[str] = None,
+        manual: int = 0,
+    ) -> None:
+        """Tek satırın okuma durumunu yazar (okuma / manuel doğrulama)."""
+        try:
+            koli_no = int(box_no) if box_no not in (None, "", "-") else None
+        except Exception:
+            koli_no = None
         cur = self.conn.cursor()
-        q = ",".join("?" for _ in display_ids)
         cur.execute(
-            f"""
+            """
             UPDATE job_items_v2
-            SET status='PENDING', koli_no=NULL, koli_label='-', read_at=NULL, reject_sent=0, in_box=''
-            WHERE job_id=? AND display_id IN ({q})
+            SET status=?, koli_no=?, koli_label=?, in_box=?, read_at=?
+            WHERE job_id=? AND display_id=?
             """,
-            [job_id] + [int(x) for x in display_ids],
+            (
+                status,
+                koli_no,
+                label if label is not None else "-",
+                "" if in_box is None else str(in_box),
+                read_at or _now_read_at(),
+                job_id,
+                int(display_id),
+            ),
         )
         self.conn.commit()
 
+    def search_items(self, query: str, limit: int = 500) -> Tuple[List[Dict[str, Any]], float]:
+        """Tüm işlerde barkod / GTIN / seri / koli etiketi araması.
+        Dönüş: (satırlar, süre_ms). Satır: job_id, job_name, id, box, status, read_at, raw_disp, label, in_box, gtin, serial
+        read_at okunmamış satırlarda None.
+        3 karakterden kısa aramalar (trigram yok) LIKE ile yapılır.
+        """
+        q = (query or "").strip()
+        if not q:
+            return [], 0.0
+        t0 = time.perf_counter()
+        cur = self.conn.cursor()
+        sel = (
+            "SELECT i.job_id, j.job_name, i.display_id, i.koli_no, i.status, i.read_at, "
+            "i.barkod_disp, i.koli_label, i.in_box, i.gtin, i.serial "
+            "FROM job_items_v2 i JOIN jobs_v2 j ON j.job_id = i.job_id "
+        )
+        rows = None
+        has_fts = cur.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='job_items_fts'"
+        ).fetchone()
+        if has_fts and len(q) >= 3:
+            try:
+                phrase = '"' + q.replace('"', '""') + '"'
+                rows = cur.execute(
+                    sel + "WHERE i.row_id IN (SELECT rowid FROM job_items_fts WHERE job_items_fts MATCH ?) "
+                    "ORDER BY j.updated_at DESC, i.display_id LIMIT ?",
+                    (phrase, int(limit)),
+                ).fetchall()
+            except sqlite3.OperationalError:
+                rows = None
+        if rows is None:
+            like = f"%{q}%"
+            rows = cur.execute(
+                sel + "WHERE i.barkod_disp LIKE ? OR i.gtin LIKE ? OR i.serial LIKE ? OR i.koli_label LIKE ? "
+                "ORDER BY j.updated_at DESC, i.display_id LIMIT ?",
+                (like, like, like, like, int(limit)),
+            ).fetchall()
+        out: List[Dict[str, Any]] = []
+        for r in rows:
+            out.append(
+                {
+                    "job_id": r[0],
+                    "job_name": r[1] or "",
+                    "id": int(r[2] or 0),
+                    "box": r[3] if r[3] is not None else "-",
+                    "status": r[4] or "PENDING",
+                    "read_at": r[5] or None,
+                    "raw_disp": r[6] or "",
+                    "label": r[7] or "-",
+                    "in_box": r[8] or "",
+                    "gtin": r[9] or "",
+                    "serial": r[10] or "",
+                }
+            )
+        return out, (time.perf_counter() - t0) * 1000.0
+
+    def reset_read_for_ids(self, job_id: str, display_ids: List[int]) -> None:
+        """Okunanı sil: kayıt kalsın, sadece okuma durumunu sıfırla."""
+        if not display_ids:
+            return
+        self.apply_item_batch(job_id, reset_ids=display_ids)
+
+    def apply_item_batch(
+        self,
+        job_id: str,
+        verified: Optional[List[Dict[str, Any]]] = None,
+        reset_ids: Optional[List[int]] = None,
+        delete_ids: Optional[List[int]] = None,
+    ) -> None:
+        """Toplu doğrulama / okuma sıfırlama / satır silme - tek transaction.
+        verified: [{"id", "box", "label", "in_box", "read_at"}, ...]
+        Hata olursa hiçbiri yazılmaz (rollback).
+        """
+        def _koli(v):
+            try:
+                return int(v) if v not in (None, "", "-") else None
+            except Exception:
+                return None
+
+        with self.conn:
+            cur = self.conn.cursor()
+            if verified:
+                now = _now_read_at()
+                cur.executemany(
+                    """
+                    UPDATE job_items_v2
+                    SET status='VERIFIED', koli_no=?, koli_label=?, in_box=?, read_at=?
+                    WHERE job_id=? AND display_id=?
+                    """,
+                    [
+                        (
+                            _koli(it.get("box")),
+                            it.get("label") if it.get("label") is not None else "-",
+                            "" if it.get("in_box") is None else str(it.get("in_box")),
+                            it.get("read_at") or now,
+                            job_id,
+                            int(it.get("id")),
+                        )
+                        for it in verified
+                    ],
+                )
+            if reset_ids:
+                cur.executemany(
+                    """
+                    UPDATE job_items_v2
+                    SET status='PENDING', koli_no=NULL, koli_label='-', read_at=NULL, reject_sent=0, in_box=''
+                    WHERE job_id=? AND display_id=?
+                    """,
+                    [(job_id, int(x)) for x in reset_ids],
+                )
+            if delete_ids:
+                cur.executemany(
+                    "DELETE FROM job_items_v2 WHERE job_id=? AND display_id=?",
+                    [(job_id, int(x)) for x in delete_ids],
+                )
+            cur.execute("UPDATE jobs_v2 SET updated_at=? WHERE job_id=?", (_now_iso(), job_id))
+
     def reset_read_all(self, job_id: str) -> None:
         cur = self.conn.cursor()
         cur.execute(
@@ -421,3 +805,47 @@ class JobYonetimi:
             (job_id,),
         )
         self.conn.commit()
+
+
+def start_legacy_migration(on_progress=None, on_done=None, db_path: Optional[str] = None):
+    """
+    Eski kayıt aktarımını arka planda (kendi bağlantısıyla) çalıştırır.
+    Aktarım zaten bitmişse thread açmaz ve None döner; aksi halde (thread, stop_event) döner.
+    on_progress(yapılan, toplam) / on_done(tamamlandı_mı) worker thread'inden çağrılır.
+    """
+    import threading
+
+    try:
+        jm = JobYonetimi(db_path)
+    except Exception:
+        return None
+    try:
+        pending = jm.legacy_migration_pending()
+    except Exception:
+        pending = False
+    if not pending:
+        jm.close()
+        return None
+
+    stop_event = threading.Event()
+
+    def _worker():
+        ok = False
+        try:
+            ok = jm.run_legacy_migration(on_progress=on_progress, stop_event=stop_event)
+        except Exception:
+            ok = False
+        finally:
+            try:
+                jm.close()
+            except Exception:
+                pass
+        if on_done is not None:
+            try:
+                on_done(ok)
+            except Exception:
+                pass
+
+    t = threading.Thread(target=_worker, name="EskiKayitAktarimi", daemon=True)
+    t.start()
+    return t, stop_event
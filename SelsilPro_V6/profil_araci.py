@@ -0,0 +1,155 @@
+"""
+profil_araci.py
+Selsil Pro V6 - Çalışan istasyonda isteğe bağlı profil (cProfile + tracemalloc)
+
+- Yönetici Paneli'nden sabit süreli pencere (ör. 60 sn canlı okuma) başlatılır; süre
+  dolunca (ya da Durdur ile) kendiliğinden kapanır
+- cProfile Tk (UI) thread'inde açılır: okuma işleme, tablo / ekran yenileme, DB yazma
+  burada koşar; arka plan thread'leri (yazıcı, scanner soketi) profile girmez
+- tracemalloc pencere başında ve sonunda anlık görüntü alır: en çok bellek tutan ve
+  pencere içinde en çok büyüyen satırlar
+- Çıktı logs klasörüne: profil_<zaman>.pstats (snakeviz / pstats ile açılır) ve
+  profil_<zaman>.txt (kümülatif süreye göre ilk 20 fonksiyon + bellek satırları)
+- Kapalıyken maliyet yok: cProfile / tracemalloc sadece başlatınca import edilip açılır
+"""
+from __future__ import annotations
+
+import io
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from gunluk import LOG_DIR
+
+TOP_FUNCS = 20
+TOP_ALLOC = 15
+TRACE_FRAMES = 8
+
+
+class ProfilOturumu:
+    def __init__(self, root, log_dir: str = LOG_DIR) -> None:
+        self.root = root
+        self._log_dir = log_dir
+        self._prof = None
+        self._snap0 = None
+        self._own_trace = False
+        self._after_id = None
+        self._on_done: Optional[Callable[[str, str], None]] = None
+        self.started_at: Optional[float] = None
+        self.seconds = 0.0
+        self.last_summary = ""
+        self.last_paths: tuple = ()
+
+    @property
+    def running(self) -> bool:
+        return self._prof is not None
+
+    def remaining(self) -> float:
+        if not self.running or self.started_at is None:
+            return 0.0
+        return max(0.0, self.seconds - (time.monotonic() - self.started_at))
+
+    def start(self, seconds: float = 60.0, memory: bool = True,
+              on_done: Optional[Callable[[str, str], None]] = None) -> None:
+        """Tk thread'inden çağrılır. on_done(özet, txt yolu) bitince UI thread'inde çağrılır."""
+        if self.running:
+            return
+        import cProfile
+
+        self.seconds = max(1.0, float(seconds))
+        self._on_done = on_done
+        self._snap0 = None
+        self._own_trace = False
+        if memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self._own_trace = True
+            self._snap0 = tracemalloc.take_snapshot()
+        self._prof = cProfile.Profile()
+        self.started_at = time.monotonic()
+        self._prof.enable()
+        self._after_id = self.root.after(int(self.seconds * 1000), self.stop)
+
+    def stop(self) -> Optional[str]:
+        """Profili kapatır, dosyaları yazar; özet metnini döndürür."""
+        prof, self._prof = self._prof, None
+        if prof is None:
+            return None
+        prof.disable()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        took = time.monotonic() - (self.started_at or time.monotonic())
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        try:
+            os.makedirs(self._log_dir, exist_ok=True)
+        except Exception:
+            pass
+        pstats_path = os.path.join(self._log_dir, f"profil_{stamp}.pstats")
+        txt_path = os.path.join(self._log_dir, f"profil_{stamp}.txt")
+
+        import pstats
+
+        try:
+            prof.dump_stats(pstats_path)
+        except Exception:
+            pstats_path = ""
+        buf = io.StringIO()
+        st = pstats.Stats(prof, stream=buf)
+        st.strip_dirs().sort_stats("cumulative").print_stats(TOP_FUNCS)
+        lines = [
+            f"Selsil Pro profil - {stamp} ({took:.1f} sn, UI thread)",
+            f"pstats: {pstats_path or '-'}",
+            "",
+            f"Kümülatif süreye göre ilk {TOP_FUNCS} fonksiyon:",
+            buf.getvalue().strip(),
+        ]
+        lines += self._memory_lines()
+        text = "\n".join(lines) + "\n"
+        try:
+            with open(txt_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            txt_path = ""
+        self.last_summary = text
+        self.last_paths = (pstats_path, txt_path)
+        cb, self._on_done = self._on_done, None
+        if cb is not None:
+            try:
+                cb(text, txt_path)
+            except Exception:
+                pass
+        return text
+
+    def _memory_lines(self) -> list:
+        if self._snap0 is None:
+            return []
+        import tracemalloc
+
+        out = []
+        try:
+            snap = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ))
+            cur, peak = tracemalloc.get_traced_memory()
+            out += ["", f"tracemalloc: şu an {cur / 1e6:.1f} MB, tepe {peak / 1e6:.1f} MB",
+                    f"En çok bellek tutan {TOP_ALLOC} satır:"]
+            out += [f"  {s}" for s in snap.statistics("lineno")[:TOP_ALLOC]]
+            out += ["", f"Pencere içinde en çok büyüyen {TOP_ALLOC} satır:"]
+            out += [f"  {s}" for s in snap.compare_to(self._snap0, "lineno")[:TOP_ALLOC]]
+        except Exception:
+            pass
+        finally:
+            self._snap0 = None
+            if self._own_trace:
+                tracemalloc.stop()
+                self._own_trace = False
+        return out
@@ -0,0 +1,138 @@
+"""Reject darbe gecikmesi ölçümü (Linux pty loopback).
+
+RejectSystem'i gerçek bir COM portu yerine pty çiftine bağlar ve planlanan
+darbe anı ile hattın gerçekten değiştiği an arasındaki farkı ölçer.
+
+pty'lerde modem hatları (DTR/RTS) yoktur; bu yüzden sahte seri nesne DTR
+değişimini slave uca tek bayt olarak yazar (1 = açık, 0 = kapalı). Master ucu
+okuyan thread her baytı time.monotonic() ile damgalar.
+
+Kullanım:
+    python reject_olcum.py --count 100 --interval 0.1 --duration 0.05
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from donanim_servisleri import RejectSystem
+
+
+class PtySerial:
+    """serial.Serial'in RejectSystem'in kullandığı kadarını taklit eder."""
+
+    def __init__(self, fd: int):
+        self._fd = fd
+        self.port = None
+        self.is_open = False
+        self._dtr = False
+        self.rts = False
+        self.cts = False
+
+    def open(self):
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+    @property
+    def dtr(self) -> bool:
+        return self._dtr
+
+    @dtr.setter
+    def dtr(self, on: bool):
+        self._dtr = bool(on)
+        if self.is_open:
+            os.write(self._fd, b"\x01" if on else b"\x00")
+
+
+def _reader(fd: int, events: list, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            data = os.read(fd, 64)
+        except OSError:
+            return
+        ts = time.monotonic()
+        for b in data:
+            events.append((b, ts))
+
+
+def _percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100.0 * (len(values) - 1)))))
+    return values[k]
+
+
+def olc(count: int = 100, interval: float = 0.1, duration: float = 0.05, lead: float = 0.01) -> dict:
+    """count adet darbe planlar, açılış (0x01) gecikmelerini ms olarak döndürür.
+    Darbeler üst üste binerse hat tek darbe gibi açık kalır; interval > duration olmalı."""
+    duration = max(duration, 0.05)  # RejectScheduler en kısa darbe
+    if interval <= duration:
+        raise ValueError("interval, darbe süresinden (en az 0.05 sn) büyük olmalı")
+    import pty
+    import tty
+
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    events: list = []
+    stop = threading.Event()
+    t = threading.Thread(target=_reader, args=(master, events, stop), daemon=True)
+    t.start()
+
+    rej = RejectSystem("pty", serial_factory=lambda: PtySerial(slave))
+    if not rej.is_active:
+        raise RuntimeError(f"pty açılamadı: {rej.last_error}")
+
+    planned = []
+    start = time.monotonic() + 0.1
+    for i in range(count):
+        fire_at = start + lead + i * interval
+        planned.append(fire_at)
+        rej.schedule_pulse(fire_at, duration)
+
+    time.sleep(max(0.0, planned[-1] - time.monotonic()) + duration + 0.2)
+    rej.close()
+    stop.set()
+    try:
+        os.close(slave)
+        os.close(master)
+    except OSError:
+        pass
+
+    on_ts = [ts for b, ts in events if b == 1]
+    lat = [(ts - p) * 1000.0 for p, ts in zip(planned, on_ts)]
+    return {
+        "count": len(lat),
+        "missing": count - len(lat),
+        "min_ms": min(lat) if lat else 0.0,
+        "avg_ms": (sum(lat) / len(lat)) if lat else 0.0,
+        "p99_ms": _percentile(lat, 99),
+        "max_ms": max(lat) if lat else 0.0,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Reject darbe gecikmesi ölçümü (pty)")
+    ap.add_argument("--count", type=int, default=100)
+    ap.add_argument("--interval", type=float, default=0.1, help="darbeler arası saniye")
+    ap.add_argument("--duration", type=float, default=0.05, help="darbe süresi (sn, en az 0.05)")
+    args = ap.parse_args(argv)
+
+    if not sys.platform.startswith("linux"):
+        print("Bu ölçüm sadece Linux pty ile çalışır.")
+        return 1
+    r = olc(args.count, args.interval, args.duration)
+    print(
+        f"darbe={r['count']} eksik={r['missing']}  "
+        f"min={r['min_ms']:.3f}ms  ort={r['avg_ms']:.3f}ms  "
+        f"p99={r['p99_ms']:.3f}ms  max={r['max_ms']:.3f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+ses_motoru.py
+Selsil Pro V6 - Sesli geri bildirim (okuma / tekrar / hata / alarm tonları)
+
+- Tonlar bir kez sentezlenir (16 bit PCM WAV, bellekte) ve ayrı bir çalma thread'inde çalınır;
+  tarama akışı (Tk thread'i) sesi hiç beklemez
+- Kuyrukta aynı ton zaten bekliyorsa yenisi eklenmez (okuma patlamasında tonlar birikmez);
+  hata / alarm gelince bekleyen başarılı / tekrar tonları atılır
+- Arka uç değiştirilebilir: winsound (Windows), aplay (Linux ALSA), bell (Tk zili), none
+  ayarlar.json: "sound_backend": "auto" | "winsound" | "aplay" | "bell" | "none"
+"""
+from __future__ import annotations
+
+import io
+import math
+import shutil
+import subprocess
+import threading
+import wave
+from array import array
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+RATE = 22050
+GAP_MS = 20
+MAX_PENDING = 4
+
+# (frekans Hz, süre ms) dizileri
+TONLAR: Dict[str, List[Tuple[int, int]]] = {
+    "ok": [(2000, 130), (2000, 130)],                      # BİP BİP (güçlü)
+    "dup": [(1400, 90), (1400, 90), (900, 120)],           # 3 kısa, farklı desen
+    "err": [(500, 220), (350, 260)],                       # düşük + uzun uyarı
+    "alarm": [(2000, 150), (1000, 150)] * 3,               # reject alarmı
+    "other": [(1200, 120)],
+}
+ONCELIKLI = ("err", "alarm")
+
+
+def sentezle(segments: List[Tuple[int, int]], rate: int = RATE) -> bytes:
+    """Ton dizisini WAV (mono, 16 bit) olarak üretir. Tıklama olmasın diye uçlar yumuşatılır."""
+    pcm = array("h")
+    ramp = max(1, rate // 500)  # ~2 ms
+    gap = array("h", bytes(2 * (rate * GAP_MS // 1000)))
+    for freq, ms in segments:
+        n = rate * ms // 1000
+        k = 2.0 * math.pi * freq / rate
+        for i in range(n):
+            amp = 0.6
+            if i < ramp:
+                amp *= i / ramp
+            elif i > n - ramp:
+                amp *= (n - i) / ramp
+            pcm.append(int(32767 * amp * math.sin(k * i)))
+        pcm.extend(gap)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+# -------------------------------
+# Arka uçlar: play(kind, wav) çalma thread'inden çağrılır, bitene kadar bekleyebilir
+# -------------------------------
+class SessizArka:
+    name = "none"
+
+    def play(self, kind: str, wav: bytes) -> None:
+        pass
+
+
+class ZilArka:
+    """Ses kartı yoksa Tk zili (root.after ile UI thread'inde)."""
+    name = "bell"
+
+    def __init__(self, root) -> None:
+        self.root = root
+
+    def play(self, kind: str, wav: bytes) -> None:
+        try:
+            self.root.after(0, self.root.bell)
+        except Exception:
+            pass
+
+
+class WinsoundArka:
+    name = "winsound"
+
+    def __init__(self) -> None:
+        import winsound
+        self._ws = winsound
+
+    def play(self, kind: str, wav: bytes) -> None:
+        try:
+            self._ws.PlaySound(wav, self._ws.SND_MEMORY | self._ws.SND_NODEFAULT)
+        except Exception:
+            # ses aygıtı yoksa PC hoparlörü
+            for freq, ms in TONLAR.get(kind, TONLAR["other"]):
+                self._ws.Beep(freq, ms)
+
+
+class AplayArka:
+    name = "aplay"
+
+    def __init__(self, exe: Optional[str] = None) -> None:
+        self.exe = exe or shutil.which("aplay")
+        if not self.exe:
+            raise RuntimeError("aplay bulunamadı")
+
+    def play(self, kind: str, wav: bytes) -> None:
+        subprocess.run([self.exe, "-q", "-"], input=wav, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=5)
+
+
+def arka_sec(name: str = "auto", root=None):
+    """Ayar değerine göre arka uç. Açılamazsa bir sonrakine düşer (en son bell / none)."""
+    name = (name or "auto").strip().lower()
+    order = {
+        "auto": ("winsound", "aplay", "bell"),
+        "winsound": ("winsound", "bell"),
+        "aplay": ("aplay", "bell"),
+        "bell": ("bell",),
+        "none": (),
+    }.get(name, ("winsound", "aplay", "bell"))
+    for n in order:
+        try:
+            if n == "winsound":
+                return WinsoundArka()
+            if n == "aplay":
+                return AplayArka()
+            if n == "bell" and root is not None:
+                return ZilArka(root)
+        except Exception:
+            continue
+    return SessizArka()
+
+
+class SesMotoru:
+    def __init__(self, backend_fn: Callable[[], object]) -> None:
+        # arka uç ve ton tamponları çalma thread'inde hazırlanır (açılışı yavaşlatmaz)
+        self._backend_fn = backend_fn
+        self.backend = None
+        self._wavs: Dict[str, bytes] = {}
+        self._pending: deque = deque()
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self.played = 0
+        self.dropped = 0
+
+    def play(self, kind: str) -> None:
+        """Tonu kuyruğa ekler ve hemen döner."""
+        if kind not in TONLAR:
+            kind = "other"
+        with self._cv:
+            if kind in self._pending:
+                self.dropped += 1
+                return
+            if kind in ONCELIKLI:
+                kept = [k for k in self._pending if k in ONCELIKLI]
+                self.dropped += len(self._pending) - len(kept)
+                self._pending = deque(kept)
+            if len(self._pending) >= MAX_PENDING:
+                self.dropped += 1
+                return
+            self._pending.append(kind)
+            self._ensure_thread()
+            self._cv.notify()
+
+    def warm(self) -> None:
+        """Çalma thread'ini başlatır: arka uç açılır, tüm tonlar önceden sentezlenir."""
+        with self._cv:
+            self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SesMotoru", daemon=True)
+            self._thread.start()
+
+    def set_backend(self, backend_fn: Callable[[], object]) -> None:
+        with self._cv:
+            self._backend_fn = backend_fn
+            self.backend = None
+
+    def stop(self) -> None:
+        with self._cv:
+            self._stop = True
+            self._pending.clear()
+            self._cv.notify()
+
+    def _run(self) -> None:
+        for k, seg in TONLAR.items():
+            self._wavs[k] = sentezle(seg)
+        while True:
+            with self._cv:
+                while not self._pending and not self._stop:
+                    self._cv.wait()
+                if self._stop:
+                    return
+                kind = self._pending.popleft()
+                if self.backend is None:
+                    try:
+                        self.backend = self._backend_fn()
+                    except Exception:
+                        self.backend = SessizArka()
+                backend = self.backend
+            try:
+                backend.play(kind, self._wavs[kind])
+                self.played += 1
+            except Exception:
+                pass
@@ -0,0 +1,369 @@
+"""
+soak_testi.py
+Selsil Pro V6 - Uzun süreli (soak) test: sızıntı ve kayma tespiti
+
+Gerçek AnaEkran'ı açar; kamera yerine scanner simülatörünü, yazıcılar yerine Zebra
+emülatörünü bağlar ve hedef hızda saatlerce okuma yaptırır. Her iş bitince aynı
+boyutta yeni bir iş açılır (vardiya içinde iş değişimi gibi); böylece sürekli
+büyüyen bir şey varsa işler arası döngüde görünür.
+
+Örnek alınan ölçüler (--sample saniyede bir):
+- rss_mb: süreç belleği, py_mb: tracemalloc ile izlenen Python belleği, objects: gc nesne sayısı
+- db_b_item: veritabanı (db + wal) baytı / iş satırı sayısı, wal_mb
+- scan_rows / scan_ring / scan_log_kb: scanner raporu tablosu, bellekteki halka, iş günlük dosyası
+- after: bekleyen Tk after çağrıları
+- lat_p50 / lat_p95 / lat_max: okuma gecikmesi (ms, soketten alınma -> işleme bitişi)
+
+Isınma (--warmup oranı) atıldıktan sonra seri 4 pencereye bölünür; pencere medyanları
+hiç düşmeden artıyor ve toplam artış eşiği aşıyorsa ölçü "BÜYÜYOR" sayılır ve test
+başarısız biter (çıkış kodu 1). Sonuç her koşu için logs/soak_<zaman>.txt dosyasına yazılır
+(özet, tracemalloc en çok büyüyen satırlar, tüm örnekler).
+
+Not: üretim veritabanına dokunulmaz; "SOAK_..." işleri geçici klasördeki ayrı bir
+SelsilPro.db'ye yazılır ve test bitince silinir (--keep-db ile bırakılır). Reject kapalıdır
+(foreign / noread arızaları gerçek DTR darbesi üretmez). Ayarlar dosyaya değişmeden
+kaydedilir (scanner / yazıcı adresleri sadece bellekte yönlendirilir).
+
+Kullanım:
+    python soak_testi.py --hours 8 --rate 5 --job-size 5000 --box 24
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+
+import job_yonetimi
+import veri_yonetimi
+import yazdirma_kuyrugu
+from code_parser import GS
+from gunluk import LOG_DIR
+
+# ölçü: (mutlak eşik, oransal eşik) - ikisinden büyüğü aşılırsa büyüme sayılır
+KONTROL: Dict[str, Tuple[float, float]] = {
+    "rss_mb": (15.0, 0.10),
+    "py_mb": (5.0, 0.10),
+    "objects": (5000, 0.05),
+    "db_b_item": (64, 0.10),
+    "wal_mb": (8.0, 0.50),
+    "scan_rows": (1, 0.0),
+    "scan_ring": (1, 0.0),
+    "scan_log_kb": (64, 0.50),
+    "after": (5, 0.0),
+    "lat_p95": (5.0, 0.25),
+}
+KOLONLAR = ("t_s", "jobs", "sent", "verified", "printed", "rss_mb", "py_mb", "objects", "db_b_item", "wal_mb",
+            "scan_rows", "scan_ring", "scan_log_kb", "after", "lat_p50", "lat_p95", "lat_max")
+
+
+def rss_mb() -> Optional[float]:
+    """Süreç RSS (MB): psutil varsa o, yoksa /proc (Linux) ya da GetProcessMemoryInfo (Windows)."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / 1e6
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except Exception:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class _PMC(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        pmc = _PMC()
+        pmc.cb = ctypes.sizeof(_PMC)
+        h = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(h, ctypes.byref(pmc), pmc.cb):
+            return pmc.WorkingSetSize / 1e6
+    except Exception:
+        pass
+    return None
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except Exception:
+        return 0
+
+
+def _pct(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    v = sorted(values)
+    return v[min(len(v) - 1, int(q * len(v)))]
+
+
+def buyume(values: List[float], abs_tol: float, rel_tol: float) -> Tuple[Optional[bool], List[float]]:
+    """Seri 4 pencereye bölünür; medyanlar hiç düşmeden artıyor ve artış eşiği aşıyorsa True.
+    Örnek yetersizse (None, [])."""
+    vals = [v for v in values if v is not None]
+    if len(vals) < 8:
+        return None, []
+    n = len(vals) // 4
+    meds = [median(vals[i * n:(i + 1) * n if i < 3 else len(vals)]) for i in range(4)]
+    rising = all(meds[i + 1] >= meds[i] for i in range(3))
+    return bool(rising and meds[3] - meds[0] > max(abs_tol, rel_tol * abs(meds[0]))), meds
+
+
+def make_codes(job_no: int, count: int, stamp: str) -> List[str]:
+    """Gerçekçi GS1 kodları (GTIN + seri); işler arası çakışmaz."""
+    return [f"0108690000000001{GS}21S{stamp}{job_no:03d}{i:06d}" for i in range(count)]
+
+
+class SoakTesti:
+    def __init__(self, args) -> None:
+        self.args = args
+        self.stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.samples: List[dict] = []
+        self.jobs = 0
+        self.sent_before = 0
+        self.t0 = 0.0
+        self.end_t = 0.0
+        self.next_sample = 0.0
+        self.snap0 = None
+        self.failed: Optional[bool] = None
+        self.report_path = os.path.join(LOG_DIR, f"soak_{self.stamp}.txt")
+        self._db = None
+        self._job_done_at: Optional[float] = None
+        self.db_dir = ""
+        self.db_path = ""
+
+    # -------------------------------
+    # Çalıştırma
+    # -------------------------------
+    def run(self) -> int:
+        import tkinter as tk
+        from ana_ekran import AnaEkran
+
+        # üretim veritabanı yerine geçici DB (modüller DB_PATH'i bağlantı anında okur)
+        self.db_dir = tempfile.mkdtemp(prefix="selsil_soak_")
+        self.db_path = os.path.join(self.db_dir, job_yonetimi.DB_NAME)
+        for mod in (job_yonetimi, veri_yonetimi, yazdirma_kuyrugu):
+            mod.DB_PATH = self.db_path
+        tracemalloc.start()
+        try:
+            self.root = tk.Tk()
+            self.app = AnaEkran(self.root, resume_last_job=False)
+            self.root.after(500, self._wait_boot)
+            self.root.mainloop()
+        finally:
+            if self.args.keep_db:
+                print(f"Test veritabanı: {self.db_path}")
+            else:
+                shutil.rmtree(self.db_dir, ignore_errors=True)
+        return 1 if self.failed else 0
+
+    def _wait_boot(self) -> None:
+        app = self.app
+        if app.job_manager is None or app.donanim.scanner_thread is None:
+            self.root.after(200, self._wait_boot)
+            return
+        a = self.args
+        try:
+            if int(app.var_date_required.get() or 0) == 1 and not (app.var_prod_date.get() or "").strip():
+                print("UYARI: üretim tarihi zorunlu ama boş; okumalar DATE olarak düşecek.")
+        except Exception:
+            pass
+        try:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        except Exception:
+            self._db = None
+        # foreign / noread arızaları gerçek reject darbesi üretmesin
+        app.donanim.reject_user_enabled = False
+        app.donanim.start_printer_emulator(a.printer_speed, 64)
+        self.t0 = time.monotonic()
+        self.end_t = self.t0 + a.hours * 3600.0
+        self.next_sample = self.t0 + a.sample
+        self._next_job()
+        print(f"Soak başladı: {a.hours} saat, {a.rate} kod/sn, iş {a.job_size} kod, rapor {self.report_path}")
+        self.root.after(1000, self._tick)
+
+    def _next_job(self) -> None:
+        app, a = self.app, self.args
+        don = app.donanim
+        sim = don.scanner_simulator
+        if sim is not None:
+            self.sent_before += sim.counts.get("code", 0) + sim.counts.get("merge", 0)
+            don.stop_scanner_simulator()
+        self.jobs += 1
+        codes = make_codes(self.jobs, a.job_size, self.stamp)
+        app.items_per_box = a.box
+        app.box_label_list = [f"SOAK-{self.stamp}-{self.jobs:03d}-K{n:05d}" for n in range(1, a.job_size // a.box + 2)]
+        app.veri.load_product_codes(f"SOAK_{self.stamp}_{self.jobs:03d}.csv", codes)
+        app.veri.save_job_db()
+        app.refresh_all()
+        faults = {"double": a.double, "foreign": a.foreign, "noread": a.noread, "split": a.split, "merge": a.merge}
+        don.start_scanner_simulator(codes, rate=a.rate, jitter=a.jitter, faults=faults)
+        self._job_done_at = None
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        sim = self.app.donanim.scanner_simulator
+        # iş bitti: son okumalar işlensin diye biraz bekleyip yeni iş
+        if sim is not None and sim.done.is_set() and now < self.end_t:
+            if self._job_done_at is None:
+                self._job_done_at = now
+            elif now - self._job_done_at >= 3.0:
+                self._next_job()
+        if now >= self.next_sample:
+            self.next_sample += self.args.sample
+            self._sample(now)
+        if now >= self.end_t:
+            self._finish()
+            return
+        self.root.after(1000, self._tick)
+
+    # -------------------------------
+    # Ölçüm
+    # -------------------------------
+    def _sample(self, now: float) -> None:
+        app = self.app
+        if self.snap0 is None and now - self.t0 >= self.args.hours * 3600.0 * self.args.warmup:
+            self.snap0 = tracemalloc.take_snapshot()
+        lat = list(app.scan_latency)
+        app.scan_latency.clear()
+        sim = app.donanim.scanner_simulator
+        sent = self.sent_before + (sim.counts.get("code", 0) + sim.counts.get("merge", 0) if sim else 0)
+        printed = sum(e.stats().get("printed", 0) for e in app.donanim.printer_emulators.values())
+        db = _size(self.db_path) + _size(self.db_path + "-wal")
+        items = 0
+        if self._db is not None:
+            try:
+                items = self._db.execute("SELECT COUNT(*) FROM job_items_v2").fetchone()[0]
+            except Exception:
+                items = 0
+        try:
+            after = len(self.root.tk.splitlist(self.root.tk.call("after", "info")))
+        except Exception:
+            after = None
+        try:
+            scan_rows = len(app.scan_tree.get_children())
+        except Exception:
+            scan_rows = None
+        row = {
+            "t_s": round(now - self.t0, 1),
+            "jobs": self.jobs,
+            "sent": sent,
+            "verified": app.verified_count,
+            "printed": printed,
+            "rss_mb": rss_mb(),
+            "py_mb": tracemalloc.get_traced_memory()[0] / 1e6,
+            "objects": len(gc.get_objects()),
+            "db_b_item": (db / items) if items else None,
+            "wal_mb": _size(self.db_path + "-wal") / 1e6,
+            "scan_rows": scan_rows,
+            "scan_ring": len(app.scan_log.ring),
+            "scan_log_kb": _size(app.scan_log._path) / 1e3 if app.scan_log._path else 0.0,
+            "after": after,
+            "lat_p50": _pct(lat, 0.50),
+            "lat_p95": _pct(lat, 0.95),
+            "lat_max": max(lat) if lat else None,
+        }
+        self.samples.append(row)
+        print(" ".join(f"{k}={_fmt(row[k])}" for k in KOLONLAR))
+
+    # -------------------------------
+    # Sonuç
+    # -------------------------------
+    def _verdicts(self) -> List[Tuple[str, Optional[bool], List[float]]]:
+        skip = int(len(self.samples) * self.args.warmup)
+        rows = self.samples[skip:]
+        out = []
+        for key, (abs_tol, rel_tol) in KONTROL.items():
+            grows, meds = buyume([r[key] for r in rows], abs_tol, rel_tol)
+            out.append((key, grows, meds))
+        return out
+
+    def _finish(self) -> None:
+        verdicts = self._verdicts()
+        self.failed = any(g for _k, g, _m in verdicts)
+        a = self.args
+        lines = [
+            f"Selsil Pro soak testi - {self.stamp}",
+            f"Süre: {a.hours} saat, hız {a.rate} kod/sn (sapma {a.jitter}), iş boyu {a.job_size}, koli {a.box}",
+            f"Arızalar: double {a.double}, foreign {a.foreign}, noread {a.noread}, split {a.split}, merge {a.merge}",
+            f"İş sayısı: {self.jobs}, örnek: {len(self.samples)} ({a.sample} sn), ısınma oranı {a.warmup}",
+            f"SONUÇ: {'BAŞARISIZ' if self.failed else 'GEÇTİ'}",
+            "",
+            "Ölçü          durum      pencere medyanları (ısınma sonrası)",
+        ]
+        for key, grows, meds in verdicts:
+            state = "yetersiz" if grows is None else ("BÜYÜYOR" if grows else "ok")
+            lines.append(f"  {key:<12} {state:<10} {' -> '.join(_fmt(m) for m in meds)}")
+        if self.snap0 is not None:
+            lines += ["", "tracemalloc - ısınmadan sonra en çok büyüyen 15 satır:"]
+            try:
+                for st in tracemalloc.take_snapshot().compare_to(self.snap0, "lineno")[:15]:
+                    lines.append(f"  {st}")
+            except Exception:
+                pass
+        lines += ["", "\t".join(KOLONLAR)]
+        for r in self.samples:
+            lines.append("\t".join(_fmt(r[k]) for k in KOLONLAR))
+        text = "\n".join(lines) + "\n"
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            pass
+        print("\n".join(lines[:8 + len(verdicts)]))
+        print(f"Rapor: {self.report_path}")
+        try:
+            if self._db is not None:
+                self._db.close()
+        except Exception:
+            pass
+        self.app.on_exit()
+
+
+def _fmt(v) -> str:
+    if v is None:
+        return "-"
+    if isinstance(v, float):
+        return f"{v:.2f}"
+    return str(v)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Selsil Pro soak testi (sızıntı / kayma tespiti)")
+    ap.add_argument("--hours", type=float, default=8.0)
+    ap.add_argument("--rate", type=float, default=5.0, help="kod/sn")
+    ap.add_argument("--jitter", type=float, default=0.1)
+    ap.add_argument("--job-size", type=int, default=5000, help="iş başına kod sayısı")
+    ap.add_argument("--box", type=int, default=24, help="koli içi adet")
+    ap.add_argument("--sample", type=float, default=30.0, help="örnek aralığı (sn)")
+    ap.add_argument("--warmup", type=float, default=0.2, help="değerlendirmeden atılan baş kısım (oran)")
+    ap.add_argument("--printer-speed", type=float, default=8.0, help="emülatör etiket/sn")
+    ap.add_argument("--double", type=float, default=0.01)
+    ap.add_argument("--foreign", type=float, default=0.005)
+    ap.add_argument("--noread", type=float, default=0.005)
+    ap.add_argument("--split", type=float, default=0.0)
+    ap.add_argument("--merge", type=float, default=0.0)
+    ap.add_argument("--keep-db", action="store_true", help="geçici test veritabanını silme")
+    args = ap.parse_args()
+    sys.exit(SoakTesti(args).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+tarama_gunlugu.py
+Selsil Pro V6 - Scanner olay günlüğü (DUP / MISS / BAD / DATE / MANUAL)
+
+- Bellekte sabit boyutlu halka (deque, maxlen): son olaylar kompakt tuple olarak tutulur
+  (mini tablo ve hızlı erişim için); vardiya boyunca RAM büyümez
+- Her olay iş başına ayrı bir dosyaya eklenir (logs/tarama_<iş>.log, sadece ekleme)
+- Rapor penceresi dosyadan sayfa sayfa okur (satır başlangıç ofsetleri array('q') ile
+  tutulur: olay başına 8 bayt); tüm vardiya geçmişi görüntülenebilir
+- Zaman damgası her kayıtta aynı tip: epoch saniye (float)
+
+Kayıt: (no, ts, type, barcode, row_id, box, message)
+Dosya satırı: ts \\t type \\t row_id \\t box \\t barcode \\t message  (tab / satır sonu kaçışlı)
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from gunluk import LOG_DIR
+
+RING_SIZE = 500
+
+Kayit = Tuple[int, float, str, str, Optional[int], Optional[str], str]
+
+_ESC = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+_UNESC = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+
+def _esc(v) -> str:
+    s = "" if v is None else str(v)
+    if "\\" in s or "\t" in s or "\n" in s or "\r" in s:
+        s = "".join(_ESC.get(ch, ch) for ch in s)
+    return s
+
+
+def _unesc(s: str) -> str:
+    if "\\" not in s:
+        return s
+    out, i = [], 0
+    while i < len(s):
+        ch = s[i]
+        if ch == "\\" and i + 1 < len(s):
+            out.append(_UNESC.get(s[i + 1], s[i + 1]))
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def ts_text(ts: float) -> str:
+    try:
+        return datetime.fromtimestamp(float(ts)).strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return str(ts)
+
+
+def guvenli_ad(job_key: Optional[str]) -> str:
+    """İş anahtarından dosya adı parçası (farklı adlar aynı dosyaya düşmesin diye crc eklenir)."""
+    key = str(job_key or "genel")
+    safe = re.sub(r"[^0-9A-Za-z_.-]+", "_", key)[:80] or "genel"
+    if safe != key:
+        safe += "_%08x" % zlib.crc32(key.encode("utf-8"))
+    return safe
+
+
+class TaramaGunlugu:
+    def __init__(self, ring_size: int = RING_SIZE, log_dir: str = LOG_DIR) -> None:
+        self.ring: deque = deque(maxlen=int(ring_size))
+        self._log_dir = log_dir
+        self._lock = threading.Lock()
+        self._job: Optional[str] = None
+        self._path: Optional[str] = None
+        self._fh = None
+        self._offsets = array("q")
+        self._seq = 0
+
+    # -------------------------------
+    # İş değişimi / dosya
+    # -------------------------------
+    def set_job(self, job_key: Optional[str]) -> None:
+        """Olayların yazılacağı iş dosyasını seçer (aynı işse bir şey yapmaz)."""
+        key = str(job_key or "genel")
+        with self._lock:
+            if key == self._job and self._fh is not None:
+                return
+            self._close()
+            self._job = key
+            safe = guvenli_ad(key)
+            try:
+                os.makedirs(self._log_dir, exist_ok=True)
+            except Exception:
+                pass
+            self._path = os.path.join(self._log_dir, f"tarama_{safe}.log")
+            self._offsets = array("q")
+            try:
+                self._fh = open(self._path, "ab")
+                self._index_file()
+            except Exception:
+                self._fh = None
+            self._seq = len(self._offsets)
+
+    def _index_file(self) -> None:
+        # mevcut dosyadaki satır başları (bir kez, açılışta)
+        off = 0
+        partial = False
+        with open(self._path, "rb") as f:
+            for line in f:
+                self._offsets.append(off)
+                partial = not line.endswith(b"\n")
+                off += len(line)
+        if partial:
+            # yarım kalmış son satır (ani kapanma): kapat, yeni kayıt ayrı satıra yazılsın
+            self._fh.write(b"\n")
+            self._fh.flush()
+
+    def _close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+        self._fh = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    # -------------------------------
+    # Yazma
+    # -------------------------------
+    def append(self, typ: str, barcode: str, row_id=None, box=None, message: str = "",
+               ts: Optional[float] = None) -> Kayit:
+        ts = time.time() if ts is None else float(ts)
+        try:
+            row_id = int(row_id) if row_id not in (None, "") else None
+        except Exception:
+            row_id = None
+        box = None if box in (None, "") else str(box)
+        if self._job is None:
+            self.set_job(None)
+        with self._lock:
+            self._seq += 1
+            rec: Kayit = (self._seq, ts, str(typ), "" if barcode is None else str(barcode), row_id, box, message or "")
+            self.ring.append(rec)
+            if self._fh is not None:
+                line = "\t".join(
+                    (f"{ts:.3f}", _esc(typ), "" if row_id is None else str(row_id), _esc(box),
+                     _esc(rec[3]), _esc(message))
+                ) + "\n"
+                try:
+                    self._offsets.append(self._fh.tell())
+                    self._fh.write(line.encode("utf-8"))
+                    self._fh.flush()
+                except Exception:
+                    pass
+        return rec
+
+    # -------------------------------
+    # Okuma
+    # -------------------------------
+    def count(self) -> int:
+        """Dosyadaki olay sayısı (dosya yoksa halkadaki)."""
+        with self._lock:
+            return len(self._offsets) if self._fh is not None else len(self.ring)
+
+    def last(self, n: int) -> List[Kayit]:
+        with self._lock:
+            return list(self.ring)[-n:] if n > 0 else []
+
+    def read_page(self, page: int, page_size: int = 500) -> List[Kayit]:
+        """En yeniden eskiye sayfa (0 = en yeni). Dosyadan okunur."""
+        with self._lock:
+            if self._fh is None:
+                items = list(reversed(self.ring))
+                return items[page * page_size:(page + 1) * page_size]
+            n = len(self._offsets)
+            hi = n - page * page_size
+            lo = max(0, hi - page_size)
+            if hi <= 0:
+                return []
+            start = self._offsets[lo]
+            end = self._offsets[hi] if hi < n else self._fh.tell()
+            path = self._path
+        out: List[Kayit] = []
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read(end - start)
+        except Exception:
+            return []
+        no = lo
+        for raw in data.split(b"\n"):
+            if not raw:
+                continue
+            no += 1
+            p = raw.decode("utf-8", errors="replace").split("\t")
+            p += [""] * (6 - len(p))
+            try:
+                ts = float(p[0])
+            except Exception:
+                ts = 0.0
+            try:
+                rid = int(p[2]) if p[2] else None
+            except Exception:
+                rid = None
+            out.append((no, ts, _unesc(p[1]), _unesc(p[4]), rid, _unesc(p[3]) or None, _unesc(p[5])))
+        out.reverse()
+        return out
+
+    def clear(self) -> None:
+        """Halkayı boşaltır; iş dosyası arşivlenir (silinmez) ve yenisi açılır."""
+        with self._lock:
+            self.ring.clear()
+            path, job = self._path, self._job
+            self._close()
+            if path and os.path.exists(path) and os.path.getsize(path) > 0:
+                try:
+                    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    os.replace(path, path[:-4] + f"_{stamp}.log")
+                except Exception:
+                    pass
+            self._job = None
+        self.set_job(job)
@@ -0,0 +1,204 @@
+"""
+tarama_kaydi.py
+Selsil Pro V6 - Scanner oturum kaydı (kameradan gelen ham baytlar)
+
+- listen_to_scanner her recv() parçasını olduğu gibi, alınma anıyla (time.monotonic)
+  iş başına bir dosyaya yazar: logs/kayit/tarama_<iş>.ssr (sadece ekleme)
+- Parça sınırları korunur: bölünmüş / birleşik TCP paketleri aynen tekrar oynatılabilir
+- Kompakt ikili biçim (okuma başına 7 bayt + veri), sık flush yok (en geç 1 sn'de bir)
+- Okuma: oku(path) -> (mono_ts, tür, veri, iş) olayları; ani kapanmada yarım kalan son
+  kayıt okurken atlanır, dosya yeniden açılınca kesilir
+
+Dosya: MAGIC, ardından kayıtlar (little endian):
+  S  oturum:   <dd mono, epoch> <H uzunluk> iş anahtarı (utf-8)
+  C  bağlandı: <I önceki kayda göre µs>
+  D  veri:     <I önceki kayda göre µs> <H uzunluk> ham baytlar
+  T  zaman:    <d mono>  (fark 32 bite sığmadığında)
+ayarlar.json: "scan_record": 1 | 0
+"""
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from gunluk import LOG_DIR
+from tarama_gunlugu import guvenli_ad
+
+KAYIT_DIR = os.path.join(LOG_DIR, "kayit")
+MAGIC = b"SSRK\x01"
+FLUSH_S = 1.0
+
+_SESSION = struct.Struct("<ddH")
+_DELTA = struct.Struct("<I")
+_DATA = struct.Struct("<IH")
+_TIME = struct.Struct("<d")
+_MAX_DELTA = 0xFFFFFFFF
+
+# (mono_ts, tür "S" | "C" | "D", veri, iş anahtarı)
+Olay = Tuple[float, str, bytes, str]
+
+
+def kayit_yolu(job_key: Optional[str], log_dir: str = KAYIT_DIR) -> str:
+    return os.path.join(log_dir, f"tarama_{guvenli_ad(job_key)}.ssr")
+
+
+class TaramaKaydedici:
+    def __init__(self, log_dir: str = KAYIT_DIR) -> None:
+        self._log_dir = log_dir
+        self._lock = threading.Lock()
+        self._job: Optional[str] = None
+        self._fh = None
+        self._last_ts = 0.0
+        self._last_flush = 0.0
+        self.path: Optional[str] = None
+        self.records = 0
+
+    def _open(self, job_key: str, ts: float) -> None:
+        self._close()
+        self._job = job_key
+        self.path = kayit_yolu(job_key, self._log_dir)
+        try:
+            os.makedirs(self._log_dir, exist_ok=True)
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            good = _gecerli_boy(self.path) if size else 0
+            if size and good < size:
+                # yarım kalmış son kayıt (ani kapanma) kesilir; yeni oturum sağlam yere eklenir
+                with open(self.path, "r+b") as f:
+                    f.truncate(good)
+            self._fh = open(self.path, "ab", buffering=64 * 1024)
+            if good == 0:
+                self._fh.write(MAGIC)
+            key = job_key.encode("utf-8")[:0xFFFF]
+            self._fh.write(b"S" + _SESSION.pack(ts, time.time(), len(key)) + key)
+        except Exception:
+            self._fh = None
+        self._last_ts = ts
+
+    def _delta(self, ts: float) -> int:
+        d = int(round((ts - self._last_ts) * 1e6))
+        if d < 0:
+            d = 0
+        if d > _MAX_DELTA:
+            self._fh.write(b"T" + _TIME.pack(ts))
+            d = 0
+        self._last_ts = ts
+        return d
+
+    def _prepare(self, job_key, ts: float) -> bool:
+        key = str(job_key or "genel")
+        if key != self._job or self._fh is None:
+            self._open(key, ts)
+        return self._fh is not None
+
+    def connected(self, job_key, ts: float) -> None:
+        """Scanner bağlantısı (yeniden) kuruldu."""
+        with self._lock:
+            try:
+                if self._prepare(job_key, ts):
+                    self._fh.write(b"C" + _DELTA.pack(self._delta(ts)))
+            except Exception:
+                pass
+
+    def write(self, job_key, data: bytes, ts: float) -> None:
+        """recv() parçasını yazar (scanner thread'inden çağrılır)."""
+        with self._lock:
+            try:
+                if not self._prepare(job_key, ts):
+                    return
+                data = bytes(data[:0xFFFF])
+                self._fh.write(b"D" + _DATA.pack(self._delta(ts), len(data)) + data)
+                self.records += 1
+                if ts - self._last_flush >= FLUSH_S:
+                    self._fh.flush()
+                    self._last_flush = ts
+            except Exception:
+                pass
+
+    def flush(self) -> None:
+        """Bekleyen kayıtları diske yazar (scanner boştayken çağrılır)."""
+        with self._lock:
+            if self._fh is not None:
+                try:
+                    self._fh.flush()
+                except Exception:
+                    pass
+
+    def _close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+        self._fh = None
+        self._job = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+def _olaylar(buf: bytes):
+    """(kaydın bittiği ofset, olay) çiftleri; bozuk / yarım kayıtta durur."""
+    i = len(MAGIC)
+    n = len(buf)
+    ts = 0.0
+    job = ""
+    try:
+        while i < n:
+            tag = buf[i:i + 1]
+            i += 1
+            if tag == b"D":
+                d, ln = _DATA.unpack_from(buf, i)
+                i += _DATA.size
+                if i + ln > n:
+                    return
+                ts += d / 1e6
+                i += ln
+                yield i, (ts, "D", buf[i - ln:i], job)
+            elif tag == b"C":
+                (d,) = _DELTA.unpack_from(buf, i)
+                i += _DELTA.size
+                ts += d / 1e6
+                yield i, (ts, "C", b"", job)
+            elif tag == b"S":
+                ts, _epoch, ln = _SESSION.unpack_from(buf, i)
+                i += _SESSION.size
+                if i + ln > n:
+                    return
+                job = buf[i:i + ln].decode("utf-8", errors="replace")
+                i += ln
+                yield i, (ts, "S", b"", job)
+            elif tag == b"T":
+                (ts,) = _TIME.unpack_from(buf, i)
+                i += _TIME.size
+                yield i, None
+            else:
+                return
+    except struct.error:
+        return
+
+
+def _gecerli_boy(path: str) -> int:
+    """Dosyanın sağlam kısmının uzunluğu (ani kapanmada yarım kalan son kayıt hariç)."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    if not buf.startswith(MAGIC):
+        return 0
+    end = len(MAGIC)
+    for end, _ev in _olaylar(buf):
+        pass
+    return end
+
+
+def oku(path: str) -> Iterator[Olay]:
+    """Kayıt dosyasındaki olaylar (sırayla). Bozuk / yarım kuyruk sessizce biter."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    if not buf.startswith(MAGIC):
+        raise ValueError("Tarama kaydı değil: " + path)
+    for _end, ev in _olaylar(buf):
+        if ev is not None:
+            yield ev
@@ -0,0 +1,278 @@
+"""
+tarama_tekrar.py
+Selsil Pro V6 - Scanner oturum kaydını tekrar oynatma (hata ayıklama / benchmark)
+
+Kayıttaki (logs/kayit/tarama_<iş>.ssr) ham parçaları gerçek AnaEkran'a, soketten
+geliyormuş gibi aynı okuma yolundan (ingest_scanner_data -> _on_scan -> process_barcode)
+verir ve sonuçta oluşan iş durumunu asıl işle karşılaştırır.
+
+- Hız: 1 (gerçek zaman), N (N kat hızlı) ya da 0 (en hızlı: her parça işlenince sıradaki)
+- Üretim veritabanına dokunulmaz: SelsilPro.db geçici bir kopyaya alınır (yazdırma kuyruğu
+  boşaltılır), tekrar orada aynı kod listesiyle "TEKRAR_..." adında yeni bir iş açar (koli adedi
+  ve koli etiketleri asıl işten alınır); kopya bitince silinir (--keep-db ile bırakılır)
+- Canlı scanner dinlenmez ve reject portu hiç açılmaz; etiketler yazıcılara değil Zebra
+  emülatörüne gider
+- Fark: satır başına durum / koli / etiket / koli içi sıra ve olay günlüğü (DUP / MISS / BAD)
+  sayıları; süre, okuma/sn ve gecikme (p50 / p95 / en çok) ölçülür
+- Rapor: logs/tekrar_<zaman>.txt; fark yoksa çıkış kodu 0, varsa 1
+
+Not: karşılaştırma işin başından beri kaydedildiğini varsayar (kayıt iş yarıdayken
+başladıysa önceki okumalar farklı görünür).
+
+Kullanım:
+    python tarama_tekrar.py logs/kayit/tarama_<iş>.ssr --speed 10
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+import job_yonetimi
+import veri_yonetimi
+import yazdirma_kuyrugu
+from gunluk import LOG_DIR
+from tarama_gunlugu import TaramaGunlugu
+from tarama_kaydi import oku
+
+ALANLAR = ("status", "box", "label", "in_box")
+MAX_FARK_SATIRI = 500
+
+
+def _norm(v) -> str:
+    return "-" if v in (None, "") else str(v)
+
+
+def log_counts(job_key: str) -> Counter:
+    """İş olay günlüğündeki tür sayıları (DUP / MISS / BAD / DATE / MANUAL)."""
+    lg = TaramaGunlugu()
+    out: Counter = Counter()
+    try:
+        lg.set_job(job_key)
+        page = 0
+        while True:
+            recs = lg.read_page(page, 2000)
+            if not recs:
+                break
+            out.update(r[2] for r in recs)
+            page += 1
+    finally:
+        lg.close()
+    return out
+
+
+def diff_items(orig: List[dict], replay: List[dict]) -> List[str]:
+    """Sıra numarasına göre (asıl display_id sırası = tekrar işinde 1..n) alan farkları."""
+    by_id = {int(it.get("id") or 0): it for it in replay}
+    out = []
+    for pos, o in enumerate(orig, 1):
+        r = by_id.get(pos)
+        if r is None:
+            out.append(f"#{o.get('id')}: tekrar işinde yok")
+            continue
+        diffs = [f"{k} {_norm(o.get(k))} -> {_norm(r.get(k))}" for k in ALANLAR if _norm(o.get(k)) != _norm(r.get(k))]
+        if diffs:
+            out.append(f"#{o.get('id')} {str(o.get('raw', ''))[:40]!r}: " + ", ".join(diffs))
+    return out
+
+
+class TaramaTekrari:
+    def __init__(self, args) -> None:
+        self.args = args
+        self.stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.report_path = os.path.join(LOG_DIR, f"tekrar_{self.stamp}.txt")
+        self.events: List[tuple] = []
+        self.job_key: Optional[str] = None
+        self.orig_items: List[dict] = []
+        self.latency: List[float] = []
+        self.fed = 0
+        self.t_start = 0.0
+        self.t_end = 0.0
+        self.result: Optional[int] = None
+        self.db_dir = ""
+        self.db_path = ""
+        self._fed_done = threading.Event()
+
+    def _load_events(self) -> None:
+        events = list(oku(self.args.file))
+        keys = [e[3] for e in events if e[1] == "S"]
+        self.job_key = self.args.job or (keys[0] if keys else None)
+        self.events = [e for e in events if e[1] == "D" and e[3] == self.job_key]
+
+    # -------------------------------
+    # Çalıştırma
+    # -------------------------------
+    def run(self) -> int:
+        import tkinter as tk
+        from ana_ekran import AnaEkran
+
+        self._load_events()
+        if not self.events:
+            print(f"Kayıtta '{self.job_key}' işi için okuma yok.")
+            return 2
+        self._copy_db()
+        try:
+            self.root = tk.Tk()
+            # reject portu ve canlı scanner açılıştan itibaren kapalı
+            self.app = AnaEkran(self.root, resume_last_job=False, live_devices=False)
+            self.root.after(500, self._wait_boot)
+            self.root.mainloop()
+        finally:
+            if self.args.keep_db:
+                print(f"Tekrar veritabanı: {self.db_path}")
+            else:
+                shutil.rmtree(self.db_dir, ignore_errors=True)
+        return 2 if self.result is None else self.result
+
+    def _copy_db(self) -> None:
+        """Üretim DB'sini geçici kopyaya alır ve modülleri oraya yönlendirir (DB_PATH bağlantı anında okunur)."""
+        src_path = job_yonetimi.DB_PATH
+        self.db_dir = tempfile.mkdtemp(prefix="selsil_tekrar_")
+        self.db_path = os.path.join(self.db_dir, job_yonetimi.DB_NAME)
+        dst = sqlite3.connect(self.db_path)
+        try:
+            if os.path.exists(src_path):
+                src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+                try:
+                    src.backup(dst)
+                finally:
+                    src.close()
+            # üretimde bekleyen etiketler kopyada basılmasın (kuyruk sadece cihaz adını tutar)
+            try:
+                with dst:
+                    dst.execute("DELETE FROM print_spool")
+            except sqlite3.OperationalError:
+                pass
+        finally:
+            dst.close()
+        for mod in (job_yonetimi, veri_yonetimi, yazdirma_kuyrugu):
+            mod.DB_PATH = self.db_path
+
+    def _wait_boot(self) -> None:
+        app = self.app
+        if app.job_manager is None:
+            self.root.after(200, self._wait_boot)
+            return
+        # gerçek yazıcılar yerine emülatör
+        app.donanim.start_printer_emulator()
+
+        header, items = app.job_manager.load_job(str(self.job_key))
+        if header is None:
+            print(f"İş veritabanında yok: {self.job_key}")
+            self.result = 2
+            app.on_exit()
+            return
+        self.orig_items = sorted(items, key=lambda it: int(it.get("id") or 0))
+        # koli adedi / koli etiketleri asıl işten
+        app.load_job_v2(header.job_id)
+        box_labels = list(app.box_label_list)
+        per_box = app.items_per_box
+        app.veri.load_product_codes(f"TEKRAR_{header.job_name}_{self.stamp}", [it.get("raw", "") for it in self.orig_items])
+        app.box_label_list = box_labels
+        app.items_per_box = per_box
+        app.scan_latency.clear()
+        app.refresh_all()
+        print(f"Tekrar: {len(self.events)} parça, iş {header.job_name}, hız {self.args.speed or 'en hızlı'}")
+        self.t_start = time.monotonic()
+        threading.Thread(target=self._feed, name="TaramaTekrari", daemon=True).start()
+        self.root.after(500, self._poll)
+
+    def _feed(self) -> None:
+        """Parçaları kayıttaki aralıklarla (hız katsayısına bölünerek) okuma yoluna verir."""
+        don = self.app.donanim
+        speed = float(self.args.speed or 0)
+        base = self.events[0][0]
+        done = threading.Event()
+        for ts, _kind, data, _job in self.events:
+            if speed > 0:
+                wait = self.t_start + (ts - base) / speed - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+            don.ingest_scanner_data(data, time.monotonic())
+            self.fed += 1
+            if speed <= 0:
+                # en hızlı: bir önceki parça UI thread'inde işlenmeden sıradakini verme
+                done.clear()
+                self.root.after(0, done.set)
+                done.wait()
+        self.root.after(0, self._fed_done.set)
+
+    def _poll(self) -> None:
+        self.latency.extend(self.app.scan_latency)
+        self.app.scan_latency.clear()
+        if not self._fed_done.is_set():
+            self.root.after(500, self._poll)
+            return
+        self.t_end = time.monotonic()
+        self._finish()
+
+    # -------------------------------
+    # Sonuç
+    # -------------------------------
+    def _finish(self) -> None:
+        app = self.app
+        replay_job = app.current_job_id
+        diffs = diff_items(self.orig_items, app.work_list)
+        c_orig = log_counts(str(self.job_key))
+        app.scan_log.close()
+        c_rep = log_counts(str(replay_job or app.current_file))
+        kinds = sorted(set(c_orig) | set(c_rep))
+        log_diff = [f"{k}: {c_orig.get(k, 0)} -> {c_rep.get(k, 0)}" for k in kinds if c_orig.get(k, 0) != c_rep.get(k, 0)]
+        self.result = 1 if (diffs or log_diff) else 0
+
+        took = max(1e-9, self.t_end - self.t_start)
+        lat = sorted(self.latency)
+
+        def _p(q):
+            return f"{lat[min(len(lat) - 1, int(q * len(lat)))]:.1f}" if lat else "-"
+
+        verified_o = sum(1 for it in self.orig_items if it.get("status") == "VERIFIED")
+        verified_r = sum(1 for it in app.work_list if it.get("status") == "VERIFIED")
+        lines = [
+            f"Selsil Pro tarama tekrarı - {self.stamp}",
+            f"Kayıt: {self.args.file}",
+            f"İş: {self.job_key} -> {replay_job}",
+            f"Hız: {self.args.speed or 'en hızlı'}, parça: {self.fed}, süre {took:.1f} sn ({self.fed / took:.1f} parça/sn)",
+            f"Gecikme (ms): p50 {_p(0.50)}, p95 {_p(0.95)}, en çok {_p(1.0)}",
+            f"Okunan: {verified_o} -> {verified_r}",
+            "Olay günlüğü: " + (", ".join(f"{k} {c_orig.get(k, 0)}/{c_rep.get(k, 0)}" for k in kinds) or "-"),
+            f"SONUÇ: {'FARK VAR' if self.result else 'AYNI'} ({len(diffs)} satır, {len(log_diff)} olay türü)",
+        ]
+        if log_diff:
+            lines += ["", "Olay günlüğü farkları (asıl -> tekrar):"] + [f"  {d}" for d in log_diff]
+        if diffs:
+            lines += ["", "Satır farkları (asıl -> tekrar):"] + [f"  {d}" for d in diffs[:MAX_FARK_SATIRI]]
+            if len(diffs) > MAX_FARK_SATIRI:
+                lines.append(f"  ... {len(diffs) - MAX_FARK_SATIRI} satır daha")
+        text = "\n".join(lines) + "\n"
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            pass
+        print("\n".join(lines[:8]))
+        print(f"Rapor: {self.report_path}")
+        app.on_exit()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Scanner oturum kaydını tekrar oynat ve iş durumunu karşılaştır")
+    ap.add_argument("file", help="logs/kayit/tarama_<iş>.ssr")
+    ap.add_argument("--speed", type=float, default=1.0, help="1 = gerçek zaman, N = N kat, 0 = en hızlı")
+    ap.add_argument("--job", default=None, help="kayıtta birden çok iş varsa iş anahtarı (job_id)")
+    ap.add_argument("--keep-db", action="store_true", help="geçici tekrar veritabanını silme")
+    args = ap.parse_args()
+    sys.exit(TaramaTekrari(args).run())
+
+
+if __name__ == "__main__":
+    main()
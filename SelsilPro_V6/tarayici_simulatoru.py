@@ -0,0 +1,291 @@
+"""
+tarayici_simulatoru.py
+Selsil Pro V6 - Scanner (Cognex kamera) trafik simülatörü
+
+Gerçek kamera olmadan listen_to_scanner'ı ve tüm okuma akışını denemek için
+kod listesini hat hızında TCP üzerinden gönderir.
+
+- Sunucu modu (kamera gibi): uygulama scanner_ip:scanner_port'a bağlanır;
+  bağlantı koparsa simülatör yeniden bağlanmasını bekler
+- İstemci modu: verilen adrese bağlanıp gönderir
+- Kaynak: ürün dosyası (CSV / TXT, uygulamanın okuduğu biçim) ya da kod listesi
+- Hız (kod/sn) ve sapma (jitter, periyodun oranı olarak)
+- GS gösterimi: "gs" (ASCII 29) | "placeholder" (!s!) | "none" (ayraçsız)
+- Arızalar (olasılık 0..1): noread, double, foreign, split (kod iki TCP parçasında),
+  merge (iki kod tek parçada), drop (gönderimden sonra bağlantıyı kopar)
+- truth: gönderilen her olayın kaydı (no, zaman, tür, kod); sonuçlar uygulamanın
+  tarama günlüğüyle karşılaştırılarak kaçan / yanlış sınıflanan okumalar bulunur
+- Not: listen_to_scanner her recv() parçasını tek okuma sayar; split / merge arızaları
+  bu yüzden bölünmüş / birleşmiş okuma olarak görünür (ölçülmek istenen de budur)
+
+Kullanım:
+    python tarayici_simulatoru.py urunler.csv --port 9004 --rate 10 --jitter 0.2 --split 0.05 --merge 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from code_parser import GS, PLACEHOLDER_GS_TOKENS
+
+FAULTS = ("noread", "double", "foreign", "split", "merge", "drop")
+NOREAD_TEXT = "NoRead"
+
+
+def load_codes(path: str) -> List[str]:
+    """Ürün dosyasını uygulamanın okuduğu şekilde okur."""
+    from veri_yonetimi import _read_barcode_records
+
+    return [c for c in _read_barcode_records(path) if str(c).strip()]
+
+
+def render_code(code: str, gs_mode: str = "gs") -> str:
+    """Kodu kameranın göndereceği biçime çevirir (GS / !s! / ayraçsız)."""
+    for tok in PLACEHOLDER_GS_TOKENS:
+        code = code.replace(tok, GS)
+    if gs_mode == "placeholder":
+        return code.replace(GS, PLACEHOLDER_GS_TOKENS[0])
+    if gs_mode == "none":
+        return code.replace(GS, "")
+    return code
+
+
+class TarayiciSimulatoru:
+    def __init__(self, codes: Iterable[str], rate: float = 5.0, jitter: float = 0.0, gs_mode: str = "gs",
+                 suffix: str = "\r\n", faults: Optional[Dict[str, float]] = None, loop: bool = False,
+                 seed: Optional[int] = None) -> None:
+        self.codes = list(codes)
+        self.rate = float(rate)
+        self.jitter = float(jitter)
+        self.gs_mode = gs_mode
+        self.suffix = suffix
+        self.faults = {k: float((faults or {}).get(k, 0.0) or 0.0) for k in FAULTS}
+        self.loop = loop
+        self.rng = random.Random(seed)
+        self.truth: List[Tuple[int, float, str, str]] = []
+        self.counts: Counter = Counter()
+        self.port = 0
+        self.done = threading.Event()
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self._srv: Optional[socket.socket] = None
+        self._have_client = threading.Condition()
+        self._seq = 0
+        self._foreign_seq = 0
+
+    # -------------------------------
+    # Bağlantı
+    # -------------------------------
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "TarayiciSimulatoru":
+        """Kamera gibi dinler; uygulamanın bağlanmasını bekleyerek gönderir."""
+        srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        srv.bind((host, int(port)))
+        srv.listen(1)
+        self.port = srv.getsockname()[1]
+        self._srv = srv
+        threading.Thread(target=self._accept_loop, name="TarayiciSim-accept", daemon=True).start()
+        threading.Thread(target=self._run, name="TarayiciSim", daemon=True).start()
+        return self
+
+    def connect(self, host: str, port: int) -> "TarayiciSimulatoru":
+        """İstemci modu: karşı tarafa bağlanır (koparsa yeniden dener)."""
+        self.port = int(port)
+
+        def _dial():
+            while not self._stop.is_set():
+                if self._sock is None:
+                    try:
+                        s = socket.create_connection((host, int(port)), timeout=2)
+                        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                        self._set_client(s)
+                    except Exception:
+                        pass
+                self._stop.wait(0.5)
+
+        threading.Thread(target=_dial, name="TarayiciSim-dial", daemon=True).start()
+        threading.Thread(target=self._run, name="TarayiciSim", daemon=True).start()
+        return self
+
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                c, _ = self._srv.accept()
+            except Exception:
+                return
+            c.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._set_client(c)
+
+    def _set_client(self, c: Optional[socket.socket]) -> None:
+        with self._have_client:
+            old, self._sock = self._sock, c
+            self._have_client.notify_all()
+        if old is not None and old is not c:
+            try:
+                old.close()
+            except Exception:
+                pass
+
+    def _wait_client(self) -> Optional[socket.socket]:
+        with self._have_client:
+            while self._sock is None and not self._stop.is_set():
+                self._have_client.wait(0.5)
+            return self._sock
+
+    def stop(self) -> None:
+        self._stop.set()
+        for s in (self._srv, self._sock):
+            if s is not None:
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except Exception:
+                    pass
+                try:
+                    s.close()
+                except Exception:
+                    pass
+        with self._have_client:
+            self._have_client.notify_all()
+
+    # -------------------------------
+    # Gönderim
+    # -------------------------------
+    def _hit(self, fault: str) -> bool:
+        p = self.faults.get(fault, 0.0)
+        return p > 0 and self.rng.random() < p
+
+    def _frame(self, code: str) -> bytes:
+        return (render_code(code, self.gs_mode) + self.suffix).encode("latin-1", errors="replace")
+
+    def _record(self, kind: str, code: str) -> None:
+        self._seq += 1
+        self.truth.append((self._seq, time.monotonic(), kind, code))
+        self.counts[kind] += 1
+
+    def _send(self, s: socket.socket, data: bytes, split: bool) -> bool:
+        try:
+            if split and len(data) > 2:
+                k = self.rng.randint(1, len(data) - 1)
+                s.sendall(data[:k])
+                time.sleep(0.002)
+                s.sendall(data[k:])
+            else:
+                s.sendall(data)
+            return True
+        except Exception:
+            self._set_client(None)
+            return False
+
+    def _events(self):
+        while True:
+            for code in self.codes:
+                yield code
+            if not self.loop:
+                return
+
+    def _run(self) -> None:
+        period = 1.0 / self.rate if self.rate > 0 else 0.0
+        events = self._events()
+        pending: Optional[str] = None
+        next_t = None
+        try:
+            while not self._stop.is_set():
+                s = self._wait_client()
+                if s is None:
+                    return
+                if next_t is None:
+                    next_t = time.monotonic()
+                code = pending if pending is not None else next(events, None)
+                pending = None
+                if code is None:
+                    break
+                wait = next_t - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                step = period * (1.0 + self.rng.gauss(0.0, self.jitter)) if self.jitter else period
+                next_t += max(0.0, step)
+
+                if self._hit("noread"):
+                    # kamera okuyamadı: kod yerine NoRead gelir, ürün bir daha gelmez
+                    if self._send(s, (NOREAD_TEXT + self.suffix).encode("ascii"), False):
+                        self._record("noread", code)
+                    continue
+                if self._hit("foreign"):
+                    self._foreign_seq += 1
+                    fake = f"0100000000000000{GS}21SIM{self._foreign_seq:06d}"
+                    if self._send(s, self._frame(fake), False):
+                        self._record("foreign", fake)
+                    pending = code  # asıl ürün bir sonraki olayda gelir
+                    continue
+                data = self._frame(code)
+                kinds = ["code"]
+                codes = [code]
+                if self._hit("double"):
+                    data += data
+                    kinds.append("double")
+                    codes.append(code)
+                if self._hit("merge"):
+                    nxt = next(events, None)
+                    if nxt is not None:
+                        data += self._frame(nxt)
+                        kinds.append("merge")
+                        codes.append(nxt)
+                split = self._hit("split")
+                if not self._send(s, data, split):
+                    pending = code
+                    continue
+                for k, c in zip(kinds, codes):
+                    self._record(k, c)
+                if split:
+                    self.counts["split"] += 1
+                if self._hit("drop"):
+                    self.counts["drop"] += 1
+                    self._set_client(None)
+        finally:
+            self.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Scanner trafik simülatörü")
+    ap.add_argument("source", help="ürün dosyası (CSV / TXT)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9004)
+    ap.add_argument("--client", action="store_true", help="dinleme yerine host:port'a bağlan")
+    ap.add_argument("--rate", type=float, default=5.0, help="kod/sn")
+    ap.add_argument("--jitter", type=float, default=0.0, help="periyot sapması (oran, ör. 0.2)")
+    ap.add_argument("--gs", choices=("gs", "placeholder", "none"), default="gs")
+    ap.add_argument("--loop", action="store_true", help="liste bitince başa dön")
+    ap.add_argument("--seed", type=int, default=None)
+    for f in FAULTS:
+        ap.add_argument(f"--{f}", type=float, default=0.0, help=f"{f} olasılığı (0..1)")
+    args = ap.parse_args()
+
+    sim = TarayiciSimulatoru(
+        load_codes(args.source), rate=args.rate, jitter=args.jitter, gs_mode=args.gs,
+        faults={f: getattr(args, f) for f in FAULTS}, loop=args.loop, seed=args.seed,
+    )
+    if args.client:
+        sim.connect(args.host, args.port)
+    else:
+        sim.serve(args.host, args.port)
+        print(f"Dinleniyor: {args.host}:{sim.port} ({len(sim.codes)} kod)")
+    try:
+        while not sim.done.wait(1.0):
+            print(sim.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+    print("Bitti:", sim.stats())
+
+
+if __name__ == "__main__":
+    main()
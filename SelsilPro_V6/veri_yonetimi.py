@@ -14,8 +14,11 @@ import unicodedata
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+import gunluk
+
 DB_NAME = "SelsilPro.db"
 DB_PATH = os.path.join(os.path.dirname(__file__), DB_NAME)
+_log_db = gunluk.al("db")
 
 # -----------------------------
 # Metin/etiket temizleme yardımcıları
@@ -243,8 +246,14 @@ class VeriYonetimi:
             self.settings["printer_enabled"] = int(self.app.var_printer_enabled.get())
         except Exception:
             pass
+        data = self.settings
+        # yazıcı emülatörü açıksa dosyaya asıl yazıcı adresleri yazılır
+        saved = getattr(getattr(self.app, "donanim", None), "_emu_saved", None)
+        if saved:
+            data = dict(self.settings)
+            data.update(saved)
         with open("ayarlar.json", "w", encoding="utf-8") as f:
-            json.dump(self.settings, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2)
 
     def init_db(self):
         self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
@@ -274,7 +283,7 @@ class VeriYonetimi:
             )
             self.conn.commit()
         except Exception:
-            pass
+            _log_db.exception("İş kaydedilemedi", extra={"ctx": {"file": self.app.current_file}})
 
     def load_last_job(self):
         try:
@@ -286,6 +295,11 @@ class VeriYonetimi:
                     # Öncelik: Job V2 üzerinden yükle (migration varsa legacy::<filename> olarak bulunur)
                     try:
                         job_id = f"legacy::{filename}"
+                        # eski kayıt henüz aktarılmadıysa (yükseltme sonrası ilk açılış) bu işi şimdi
+                        # aktar; yoksa okumalar eski tabloya yazılır, sonraki açılışta V2 kopyası eski kalır
+                        jm = getattr(self.app, "job_manager", None)
+                        if jm is not None:
+                            jm.migrate_legacy_job(filename)
                         if hasattr(self.app, "load_job_v2"):
                             ok = self.app.load_job_v2(job_id)
                             if ok:
@@ -477,61 +491,7 @@ class VeriYonetimi:
                 self.save_settings()
             except Exception:
                 pass
-            self.app.current_file = filename
-            self.app.work_list = []
-            self.app.verified_count = 0
-            uid = 1
-            for clean_data in new_data_list:
-                search_val = _sanitize_text(clean_data)
-                self.app.work_list.append({
-                    "id": uid,
-                    "raw": clean_data,
-                    "raw_disp": clean_data.replace(chr(29), "|"),
-                    "search": search_val,
-                    "search_nogs": search_val.replace(chr(29), ""),
-                    "status": "PENDING",
-                    "box": "-",
-                    "label": "-"
-                })
-                uid += 1
-
-            self.app.btn_prod.config(text=f"✅ ÜRÜN: {filename}", bg="#d1e7dd", fg="#0f5132")
-            if hasattr(self.app, 'refresh_all'):
-                self.app.refresh_all()
-            elif hasattr(self.app, 'refresh_table'):
-                self.app.refresh_table()
-
-            # --- Job V2: yüklenen ürün listesini DB'ye yaz ve aktif job yap ---
-            try:
-                jm = getattr(self.app, "job_manager", None)
-                if jm is not None:
-                    # mevcut box dosyası / ayarlar
-                    box_file = getattr(self.app, "current_box_file", "") or self.settings.get("last_box_filename", "") or ""
-                    try:
-                        settings = self.app._collect_job_settings() if hasattr(self.app, "_collect_job_settings") else dict(self.settings)
-                    except Exception:
-                        settings = dict(self.settings)
-
-                    try:
-                        current_koli_no = int(getattr(self.app, "next_print_info", {}).get("box_num", 1) or 1)
-                    except Exception:
-                        current_koli_no = 1
-
-                    # iş adı: ürün dosyası + zaman (çakışmayı önler)
-                    try:
-                        import datetime as _dt
-                        ts = _dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-                    except Exception:
-                        ts = str(int(time.time()))
-                    job_name = f"{filename} ({ts})"
-
-                    job_id = jm.create_job(job_name, filename, box_file, settings, current_koli_no=current_koli_no)
-                    jm.upsert_items_from_work_list(job_id, self.app.work_list)
-                    jm.set_active_job(job_id)
-                    self.app.current_job_id = job_id
-            except Exception:
-                # Job sistemi çalışmasa bile UI devam etsin
-                pass
+            self.load_product_codes(filename, new_data_list)
 
         elif ftype == 'box':
             self.app.box_label_list = new_data_list
@@ -552,92 +512,182 @@ class VeriYonetimi:
         elif hasattr(self.app, 'update_ui'):
             self.app.update_ui()
 
-    def get_export_path(self, suffix: str):
+    def load_product_codes(self, filename: str, new_data_list):
+        """Ürün kod listesini yeni iş olarak açar (dosya seçimi / sihirbaz olmadan; soak testi de kullanır)."""
+        self.app.current_file = filename
+        self.app.work_list = []
+        self.app.verified_count = 0
+        uid = 1
+        for clean_data in new_data_list:
+            search_val = _sanitize_text(clean_data)
+            self.app.work_list.append({
+                "id": uid,
+                "raw": clean_data,
+                "raw_disp": clean_data.replace(chr(29), "|"),
+                "search": search_val,
+                "search_nogs": search_val.replace(chr(29), ""),
+                "status": "PENDING",
+                "box": "-",
+                "label": "-"
+            })
+            uid += 1
+
+        self.app.btn_prod.config(text=f"✅ ÜRÜN: {filename}", bg="#d1e7dd", fg="#0f5132")
+        if hasattr(self.app, 'refresh_all'):
+            self.app.refresh_all()
+        elif hasattr(self.app, 'refresh_table'):
+            self.app.refresh_table()
+
+        # --- Job V2: yüklenen ürün listesini DB'ye yaz ve aktif job yap ---
+        try:
+            jm = getattr(self.app, "job_manager", None)
+            if jm is not None:
+                # mevcut box dosyası / ayarlar
+                box_file = getattr(self.app, "current_box_file", "") or self.settings.get("last_box_filename", "") or ""
+                try:
+                    settings = self.app._collect_job_settings() if hasattr(self.app, "_collect_job_settings") else dict(self.settings)
+                except Exception:
+                    settings = dict(self.settings)
+
+                try:
+                    current_koli_no = int(getattr(self.app, "next_print_info", {}).get("box_num", 1) or 1)
+                except Exception:
+                    current_koli_no = 1
+
+                # iş adı: ürün dosyası + zaman (çakışmayı önler)
+                try:
+                    import datetime as _dt
+                    ts = _dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+                except Exception:
+                    ts = str(int(time.time()))
+                job_name = f"{filename} ({ts})"
+
+                job_id = jm.create_job(job_name, filename, box_file, settings, current_koli_no=current_koli_no)
+                jm.upsert_items_from_work_list(job_id, self.app.work_list)
+                jm.set_active_job(job_id)
+                try:
+                    self.app.donanim.end_print_job(self.app.current_job_id)
+                except Exception:
+                    pass
+                self.app.current_job_id = job_id
+        except Exception:
+            # Job sistemi çalışmasa bile UI devam etsin
+            pass
+
+    def get_export_path(self, suffix: str, base: str | None = None):
         work_dir = self.settings.get("work_dir", "")
         if not work_dir or not os.path.exists(work_dir):
             work_dir = os.getcwd()
-        base_name = os.path.splitext(self.app.current_file)[0]
+        base_name = os.path.splitext(base or self.app.current_file)[0]
         filename = f"{base_name}_{suffix}.csv"
         return os.path.join(work_dir, filename), work_dir
 
-    def export_finished(self, silent: bool = False):
-        finished_items = [i for i in self.app.work_list if i['status'] == 'VERIFIED']
-        if not finished_items:
+    # -----------------------------
+    # Raporlar (disa_aktarim: tek geçiş, arka planda, iptal edilebilir)
+    # -----------------------------
+    def export_running(self) -> bool:
+        exp = getattr(self, "_exporter", None)
+        return exp is not None and exp.running
+
+    def cancel_export(self):
+        exp = getattr(self, "_exporter", None)
+        if exp is not None and exp.running:
+            exp.cancel()
+
+    def _start_export(self, kinds, silent: bool = False, job_id: str | None = None, base: str | None = None):
+        """kinds raporlarını arka planda üretir. job_id verilirse iş belleğe alınmadan DB'den yazılır."""
+        import disa_aktarim
+
+        if self.export_running():
             if not silent:
-                return messagebox.showinfo("Bilgi", "Veri yok.")
+                messagebox.showwarning("Uyarı", "Rapor yazılıyor, lütfen bitmesini bekleyin.")
+            return None
+        if disa_aktarim.PDF in kinds:
+            try:
+                import reportlab  # noqa: F401
+            except Exception:
+                return messagebox.showerror("Hata", "PDF için 'reportlab' kütüphanesi gerekli. Lütfen tekrar çalıştırın; kurulum otomatik yapılacaktır.")
+
+        paths = {}
+        work_dir = os.getcwd()
+        for k in kinds:
+            full_path, work_dir = self.get_export_path(k, base)
+            if k == disa_aktarim.PDF:
+                full_path = os.path.splitext(full_path)[0] + ".pdf"
+            paths[k] = full_path
+        # boş rapor: tekli istekte "Veri yok" (dosya yazılmaz); toplu üretimde boş dosya yazılır. PDF boşsa hiç yazılmaz.
+        skip = {disa_aktarim.PDF}
+        if not silent and len(kinds) == 1:
+            skip.update(kinds)
+
+        root = self.app.root
+        last = [0.0]
+
+        def _progress(done, total):
+            now = time.monotonic()
+            if now - last[0] < 0.2:
+                return
+            last[0] = now
+            pct = int(done * 100 / total) if total else 0
+            root.after(0, lambda: self._export_message(f"📄 Rapor yazılıyor... %{pct}"))
+
+        def _done(res):
+            root.after(0, lambda: self._export_finished_ui(res, kinds, silent, work_dir))
+
+        exp = disa_aktarim.DisaAktarici(paths, on_progress=_progress, on_done=_done, skip_empty=skip)
+        self._exporter = exp
+        if job_id:
+            return exp.start_db(job_id)
+        return exp.start_items(self.app.work_list)
+
+    def _export_message(self, text: str):
         try:
-            finished_items.sort(key=lambda x: int(x['box']) if str(x['box']).isdigit() else 999999)
+            self.app.lbl_message.configure(text=text)
         except Exception:
             pass
-        full_path, work_dir = self.get_export_path("finish")
+
+    def _export_finished_ui(self, res, kinds, silent: bool, work_dir: str):
+        import disa_aktarim
+
+        if res.errors:
+            messagebox.showerror("Hata", "\n".join(res.errors.values()))
+            return
+        if res.cancelled:
+            self._export_message("Rapor iptal edildi.")
+            return
+        self._export_message(f"📄 {len(res.paths)} rapor yazıldı.")
+        if silent:
+            return
+        if res.empty and not res.paths:
+            messagebox.showinfo("Bilgi", "Veri yok.")
+            return
+        if len(kinds) > 1:
+            messagebox.showinfo("Başarılı", "3 rapor üretildi (Detay + Tekli + Kalanlar).")
+            return
+        path = next(iter(res.paths.values()), "")
+        title = "PDF kaydedildi" if disa_aktarim.PDF in res.paths else "Kaydedildi"
+        messagebox.showinfo("Başarılı", f"{title}\n{path}")
         try:
-            with open(full_path, "w", newline='', encoding="utf-8") as f:
-                writer = csv.writer(f, delimiter=';')
-                for item in finished_items:
-                    writer.writerow([item.get('box'), item.get('label'), item.get('raw')])
-            if not silent:
-                messagebox.showinfo("Başarılı", f"Kaydedildi\\n{full_path}")
-            if not silent:
-                try:
-                    os.startfile(work_dir)
-                except Exception:
-                    pass
-        except Exception as e:
-            messagebox.showerror("Hata", str(e))
+            os.startfile(work_dir)
+        except Exception:
+            pass
+
+    def export_finished(self, silent: bool = False):
+        return self._start_export(("finish",), silent)
 
     def export_finished_single(self, silent: bool = False):
-        finished_items = [i for i in self.app.work_list if i['status'] == 'VERIFIED']
-        if not finished_items:
-            if not silent:
-                return messagebox.showinfo("Bilgi", "Veri yok.")
-        finished_items.sort(key=lambda x: x['id'])
-        full_path, work_dir = self.get_export_path("bitenlertekli")
-        try:
-            with open(full_path, "w", newline='', encoding="utf-8") as f:
-                for item in finished_items:
-                    f.write(f"{item['raw']}\n")
-            if not silent:
-                messagebox.showinfo("Başarılı", f"Kaydedildi\\n{full_path}")
-            if not silent:
-                try:
-                    os.startfile(work_dir)
-                except Exception:
-                    pass
-        except Exception as e:
-            messagebox.showerror("Hata", str(e))
+        return self._start_export(("bitenlertekli",), silent)
 
     def export_remaining(self, silent: bool = False):
-        remaining_items = [i for i in self.app.work_list if i['status'] == 'PENDING']
-        if not remaining_items:
-            if not silent:
-                return messagebox.showinfo("Bilgi", "Veri yok.")
-        remaining_items.sort(key=lambda x: x['id'])
-        full_path, work_dir = self.get_export_path("okunmayanlar")
-        try:
-            with open(full_path, "w", newline='', encoding="utf-8") as f:
-                for item in remaining_items:
-                    f.write(f"{item['raw']}\n")
-            if not silent:
-                messagebox.showinfo("Başarılı", f"Kaydedildi\\n{full_path}")
-            if not silent:
-                try:
-                    os.startfile(work_dir)
-                except Exception:
-                    pass
-        except Exception as e:
-            messagebox.showerror("Hata", str(e))
-
+        return self._start_export(("okunmayanlar",), silent)
 
     def export_all_three(self, silent: bool = False):
-        """Bitenler (Detay) + Bitenler (Tekli) + Kalanlar raporlarını aynı anda üretir."""
-        self.export_finished(silent=True if silent else False)
-        self.export_finished_single(silent=True if silent else False)
-        self.export_remaining(silent=True if silent else False)
-        if not silent:
-            try:
-                messagebox.showinfo("Başarılı", "3 rapor üretildi (Detay + Tekli + Kalanlar).")
-            except Exception:
-                pass
+        """Bitenler (Detay) + Bitenler (Tekli) + Kalanlar raporlarını aynı anda (tek geçişte) üretir."""
+        return self._start_export(("finish", "bitenlertekli", "okunmayanlar"), silent)
+
+    def export_pdf_report(self, silent: bool = False):
+        """Basit PDF raporu üretir (Bitenler + Kalanlar özet)."""
+        return self._start_export(("rapor_pdf",), silent)
 
     
     def open_history_window(self):
@@ -664,6 +714,16 @@ class VeriYonetimi:
         frm.pack(fill="both", expand=True)
 
         ttk.Label(frm, text="Geçmiş İşler", font=("Segoe UI", 14, "bold")).pack(anchor="w", pady=(0, 8))
+        try:
+            mig = jm.migration_status()
+            if mig.get("status") == "RUNNING":
+                ttk.Label(
+                    frm,
+                    text=f"Eski kayıtlar aktarılıyor ({mig.get('position', 0)}/{mig.get('total', 0)}); liste eksik olabilir.",
+                    foreground="#664d03",
+                ).pack(anchor="w", pady=(0, 6))
+        except Exception:
+            pass
 
         cols = ("Durum", "İş Adı", "Ürün Dosyası", "Koli Dosyası", "Güncelleme", "JobId")
         tree = ttk.Treeview(frm, columns=cols, show="headings", height=18)
@@ -736,8 +796,20 @@ class VeriYonetimi:
             except Exception as e:
                 messagebox.showerror("Hata", f"Kopyalama başarısız: {e}")
 
+        def rapor_al():
+            # iş yüklenmeden, satırlar DB'den akışla yazılır (çok büyük işlerde de bellek sabit)
+            jid = get_selected_job_id()
+            if not jid:
+                messagebox.showwarning("Uyarı", "Lütfen bir iş seçin.")
+                return
+            vals = tree.item(tree.selection()[0], "values") or ()
+            name = (vals[1] if len(vals) > 1 else "") or "is"
+            if self._start_export(("finish", "bitenlertekli", "okunmayanlar"), job_id=jid, base=name) is not None:
+                messagebox.showinfo("Bilgi", "Raporlar arka planda yazılıyor (Detay + Tekli + Kalanlar).", parent=win)
+
         ttk.Button(btns, text="Devam Et", command=devam_et).pack(side="left")
         ttk.Button(btns, text="Kopyala (Yeni İş)", command=kopyala_yeni_is).pack(side="left", padx=8)
+        ttk.Button(btns, text="Rapor Al", command=rapor_al).pack(side="left")
         ttk.Button(btns, text="Yenile", command=refresh).pack(side="right")
 
 
@@ -764,71 +836,3 @@ class VeriYonetimi:
             self.app.refresh_all()
         elif hasattr(self.app, 'update_ui'):
             self.app.update_ui()
-
-
-    def export_pdf_report(self, silent: bool = False):
-        """Basit PDF raporu üretir (Bitenler + Kalanlar özet)."""
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.pdfgen import canvas
-        except Exception:
-            return messagebox.showerror("Hata", "PDF için 'reportlab' kütüphanesi gerekli. Lütfen tekrar çalıştırın; kurulum otomatik yapılacaktır.")
-
-        finished = [i for i in self.app.work_list if i.get('status') == 'VERIFIED']
-        remaining = [i for i in self.app.work_list if i.get('status') == 'PENDING']
-
-        if not finished and not remaining:
-            if not silent:
-                return messagebox.showinfo("Bilgi", "Veri yok.")
-            return
-
-        full_path, work_dir = self.get_export_path("rapor_pdf")
-        # uzantıyı pdf yap
-        if not full_path.lower().endswith(".pdf"):
-            full_path = os.path.splitext(full_path)[0] + ".pdf"
-
-        try:
-            c = canvas.Canvas(full_path, pagesize=A4)
-            w, h = A4
-            y = h - 40
-
-            def line(txt, step=16, bold=False):
-                nonlocal y
-                if y < 60:
-                    c.showPage()
-                    y = h - 40
-                c.setFont("Helvetica-Bold" if bold else "Helvetica", 11 if bold else 10)
-                c.drawString(40, y, txt)
-                y -= step
-
-            line("SELSIL PRO - PDF RAPORU", step=20, bold=True)
-            line(datetime.datetime.now().strftime("Tarih: %d.%m.%Y %H:%M"))
-            line(f"Toplam Kayıt: {len(self.app.work_list)}")
-            line(f"Biten (VERIFIED): {len(finished)}")
-            line(f"Kalan (PENDING): {len(remaining)}")
-            line("")
-
-            # Örnek ilk 40 satır (bitenler)
-            if finished:
-                line("BİTENLER (İlk 40)", step=18, bold=True)
-                for it in finished[:40]:
-                    raw = str(it.get("raw", ""))[:120]
-                    line(f"- {it.get('box','-')} | {it.get('label','-')} | {raw}")
-
-            if remaining:
-                line("")
-                line("KALANLAR (İlk 40)", step=18, bold=True)
-                for it in remaining[:40]:
-                    raw = str(it.get("raw", ""))[:120]
-                    line(f"- {it.get('id','-')} | {raw}")
-
-            c.save()
-
-            if not silent:
-                messagebox.showinfo("Başarılı", f"PDF kaydedildi\n{full_path}")
-                try:
-                    os.startfile(work_dir)
-                except Exception:
-                    pass
-        except Exception as e:
-            messagebox.showerror("Hata", str(e))
\ No newline at end of file
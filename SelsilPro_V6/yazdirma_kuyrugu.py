@@ -0,0 +1,637 @@
+"""
+yazdirma_kuyrugu.py
+Selsil Pro V6 - Kalıcı yazdırma kuyruğu (spooler)
+
+Amaç:
+- Etiket gönderimleri kaybolmasın: her iş SQLite'a yazılır (print_spool tablosu)
+- Her yazıcı (box / prod / prod2) için ayrı worker; aynı cihazda sıra kesin FIFO
+  (baştaki iş gönderilmeden / düşmeden sıradaki gönderilmez)
+- Gönderim onayı beklemez (boru hattı): en çok MAX_INFLIGHT iş yazıcıya art arda gönderilir,
+  onay arka planda etiket sayacından alınır. Bağlantı kilidi sadece gönderim ve tek sorgu
+  süresince tutulur (izleyici beklemez)
+- Gönderim hatasında artan bekleme ile yeniden deneme; MAX_ATTEMPTS sonra DEAD
+  (Yönetici Paneli > Yazdırma Kuyruğu'ndan yeniden denenebilir / silinebilir)
+- Onay yazıcıdan alınır:
+    Etiket sayacı (SGD odometer.total_label_count, basılan etiket adedi): sayaç başlangıcına
+             her işin kopya sayısı eklenir; sayaç işin beklenen değerine (önceki işler + kendi
+             kopyaları) ulaşınca -> basıldı. Başlangıç sadece bilinmiyorsa okunur (ilk iş,
+             bağlantı değişimi / kapanışı, zaman aşımı); bilinirken boştaki işe sorgu beklenmez,
+             koli yazıcısında boşta IDLE_SYNC_S'de bir tazelenir
+             (~HQOD kullanılmaz: NONRESETTABLE değeri etiket değil ortam uzunluğudur - inç / cm)
+    ~HS    : sayaç yoksa tampondaki format ve partide kalan etiket 0 ise -> bekleyenler basıldı;
+             sayaç 1 sn ilerlemezse hata (kağıt / kafa) kontrolü için
+    Kağıt yok / kafa açık gibi durumlarda iş tekrar GÖNDERİLMEZ, onay beklenir
+    (yazıcı tamponundaki etiket sorun giderilince basılır; çift etiket olmaz)
+    ~HS'ye hiç cevap vermeyen cihazda gönderim başarılıysa iş tamam sayılır
+- Sayaç CONFIRM_TIMEOUT_S boyunca ilerlemezse bekleyen işler DEAD olur; kopya sayısı basılmayan
+  kadara indirilir (yeniden denemede basılanlar tekrar gönderilmez)
+
+Durumlar: PENDING -> SENT (gönderiliyor / onay bekliyor) -> DONE | DEAD
+Uygulama SENT durumdayken kapandıysa iş DEAD'e alınır (basılıp basılmadığı bilinmez).
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from job_yonetimi import DB_PATH
+from yazici_izleme import parse_hs
+
+FAULT_FLAGS = ("paper_out", "head_open", "ribbon_out", "paused")
+
+
+LABEL_COUNT_CMD = b'! U1 getvar "odometer.total_label_count"\r\n'
+
+
+def parse_label_count(resp: bytes) -> Optional[int]:
+    """SGD getvar cevabındaki ("1234") etiket sayısını döndürür (yoksa / "?" ise None)."""
+    try:
+        text = resp.decode("ascii", errors="ignore")
+    except Exception:
+        return None
+    m = re.search(r'"\s*(\d+)\s*"', text)
+    return int(m.group(1)) if m else None
+
+
+def _sgd_done(buf: bytes) -> bool:
+    return buf.count(b'"') >= 2
+
+
+class YazdirmaKuyrugu:
+    MAX_ATTEMPTS = 8
+    BACKOFF_BASE_S = 1.0
+    BACKOFF_MAX_S = 60.0
+    CONFIRM_TIMEOUT_S = 15.0
+    FAULT_WAIT_S = 600.0
+    POLL_S = 0.3
+    MAX_INFLIGHT = 16
+    IDLE_SYNC_S = 5.0
+
+    def __init__(
+        self,
+        devices: List[str],
+        resolve_fn: Callable[[str], Optional[Tuple[str, int]]],
+        link_fn: Callable[[str, int], Any],
+        db_path: Optional[str] = None,
+        on_dead: Optional[Callable[[Dict[str, Any]], None]] = None,
+        keep_open: Tuple[str, ...] = ("box",),
+    ) -> None:
+        self.db_path = db_path or DB_PATH
+        self._resolve = resolve_fn
+        self._link_fn = link_fn
+        self._on_dead = on_dead
+        self._keep_open = set(keep_open)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._db_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._stop = False
+        # cihaz başına sayaçlar (Yönetici paneli / yük dağıtımı için)
+        self.counters: Dict[str, Dict[str, float]] = {
+            d: {"done": 0, "labels": 0, "retries": 0, "dead": 0, "confirm_ms_sum": 0.0, "last_done_ts": 0.0}
+            for d in devices
+        }
+        self._ensure_tables()
+        self._recover_after_restart()
+        self._threads = []
+        for d in devices:
+            t = threading.Thread(target=self._worker, args=(d,), name=f"Spool-{d}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    # -------------------------------
+    # DB
+    # -------------------------------
+    def _ensure_tables(self) -> None:
+        with self._db_lock:
+            cur = self.conn.cursor()
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS print_spool (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    device TEXT,
+                    label TEXT,
+                    zpl TEXT,
+                    copies INTEGER DEFAULT 1,
+                    status TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    next_try REAL DEFAULT 0,
+                    created_at REAL,
+                    done_at REAL,
+                    confirm TEXT,
+                    last_error TEXT
+                )
+                """
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_print_spool_dev ON print_spool(device, status, id)")
+            self.conn.commit()
+
+    def _recover_after_restart(self) -> None:
+        with self._db_lock:
+            self.conn.execute(
+                "UPDATE print_spool SET status='DEAD', last_error=? WHERE status='SENT'",
+                ("Onay alınamadı (uygulama yeniden başladı)",),
+            )
+            self.conn.commit()
+
+    def _exec(self, sql: str, args: tuple = ()) -> None:
+        with self._db_lock:
+            self.conn.execute(sql, args)
+            self.conn.commit()
+
+    def _head(self, device: str) -> Optional[sqlite3.Row]:
+        with self._db_lock:
+            return self.conn.execute(
+                "SELECT * FROM print_spool WHERE device=? AND status='PENDING' ORDER BY id LIMIT 1",
+                (device,),
+            ).fetchone()
+
+    # -------------------------------
+    # Dışarıdan
+    # -------------------------------
+    def enqueue(self, device: str, zpl: str, copies: int = 1, label: str = "") -> int:
+        with self._db_lock:
+            cur = self.conn.execute(
+                "INSERT INTO print_spool(device, label, zpl, copies, status, attempts, next_try, created_at) "
+                "VALUES(?,?,?,?, 'PENDING', 0, 0, ?)",
+                (device, label, zpl, max(1, int(copies or 1)), time.time()),
+            )
+            self.conn.commit()
+            job_id = int(cur.lastrowid)
+        with self._cond:
+            self._cond.notify_all()
+        return job_id
+
+    def depth(self, device: str) -> int:
+        """Cihazın bekleyen + gönderilmiş (onay bekleyen) iş sayısı."""
+        with self._db_lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM print_spool WHERE device=? AND status IN ('PENDING','SENT')", (device,)
+            ).fetchone()
+        return int(row[0] or 0)
+
+    def list_jobs(self, statuses: Optional[List[str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        sql = "SELECT id, device, label, copies, status, attempts, created_at, done_at, confirm, last_error FROM print_spool"
+        args: list = []
+        if statuses:
+            sql += " WHERE status IN (%s)" % ",".join("?" * len(statuses))
+            args.extend(statuses)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(int(limit))
+        with self._db_lock:
+            rows = self.conn.execute(sql, tuple(args)).fetchall()
+        return [dict(r) for r in rows]
+
+    def retry(self, job_ids: List[int]) -> int:
+        """DEAD işleri kuyruğa geri alır (aynı cihazda FIFO sırası id'ye göredir)."""
+        if not job_ids:
+            return 0
+        q = ",".join("?" * len(job_ids))
+        with self._db_lock:
+            cur = self.conn.execute(
+                f"UPDATE print_spool SET status='PENDING', attempts=0, next_try=0, last_error=NULL "
+                f"WHERE status='DEAD' AND id IN ({q})",
+                tuple(int(x) for x in job_ids),
+            )
+            self.conn.commit()
+            n = cur.rowcount
+        with self._cond:
+            self._cond.notify_all()
+        return int(n or 0)
+
+    def delete(self, job_ids: List[int]) -> int:
+        if not job_ids:
+            return 0
+        q = ",".join("?" * len(job_ids))
+        with self._db_lock:
+            cur = self.conn.execute(
+                f"DELETE FROM print_spool WHERE status IN ('DEAD','DONE','PENDING') AND id IN ({q})",
+                tuple(int(x) for x in job_ids),
+            )
+            self.conn.commit()
+            return int(cur.rowcount or 0)
+
+    def move_pending(self, src: str, dst: str) -> int:
+        """src cihazın bekleyen işlerini dst'ye taşır (failover). id sırası korunur."""
+        with self._db_lock:
+            cur = self.conn.execute(
+                "UPDATE print_spool SET device=?, next_try=0 WHERE device=? AND status='PENDING'", (dst, src)
+            )
+            self.conn.commit()
+            n = int(cur.rowcount or 0)
+        if n:
+            with self._cond:
+                self._cond.notify_all()
+        return n
+
+    def purge_done(self, older_than_s: float = 7 * 24 * 3600) -> None:
+        self._exec("DELETE FROM print_spool WHERE status='DONE' AND done_at < ?", (time.time() - older_than_s,))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for d, c in self.counters.items():
+            done = int(c["done"])
+            out[d] = {
+                "done": done,
+                "labels": int(c["labels"]),
+                "retries": int(c["retries"]),
+                "dead": int(c["dead"]),
+                "avg_confirm_ms": round(c["confirm_ms_sum"] / done, 1) if done else 0.0,
+                "queue": self.depth(d),
+            }
+        return out
+
+    def stop(self) -> None:
+        self._stop = True
+        with self._cond:
+            self._cond.notify_all()
+
+    # -------------------------------
+    # Worker (cihaz başına)
+    # -------------------------------
+    def _worker(self, device: str) -> None:
+        fl = _Ucus()
+        while not self._stop:
+            job = self._head(device) if len(fl.jobs) < self.MAX_INFLIGHT else None
+            if job is not None and float(job["next_try"] or 0) <= time.time():
+                try:
+                    if self._send_job(device, job, fl):
+                        continue  # sıradakini hemen gönder (onay beklenmez)
+                except Exception as ex:
+                    self._fail(device, job, f"{type(ex).__name__}: {ex}")
+                    continue
+            if fl.jobs:
+                self._poll(device, fl)
+                with self._cond:
+                    self._cond.wait(self.POLL_S)
+                continue
+            if job is None:
+                self._idle_sync(device, fl)
+                with self._cond:
+                    self._cond.wait(1.0)
+                continue
+            # FIFO: baştaki iş beklerken sıradakiler gönderilmez
+            with self._cond:
+                self._cond.wait(max(0.05, min(float(job["next_try"] or 0) - time.time(), 1.0)))
+
+    def _send_job(self, device: str, job: sqlite3.Row, fl: "_Ucus") -> bool:
+        """İşi gönderir ve onay bekleyenlere ekler; gönderemediyse (adres değişti, öncekiler
+        bekleniyor) False."""
+        target = self._resolve(device)
+        if not target or not target[0]:
+            self._fail(device, job, "IP tanımlı değil")
+            return True
+        ip, port = target
+        link = self._link_fn(ip, port)
+        if fl.jobs and link is not fl.link:
+            return False
+        copies = int(job["copies"] or 1)
+        data = (job["zpl"] or "").encode("utf-8")
+        if not link.lock.acquire(timeout=5):
+            self._fail(device, job, "Yazıcı meşgul")
+            return True
+        sent = 0
+        try:
+            # işi sahiplen: bu arada başka cihaza taşındıysa (failover) gönderme
+            with self._db_lock:
+                cur = self.conn.execute(
+                    "UPDATE print_spool SET status='SENT', attempts=attempts+1 "
+                    "WHERE id=? AND device=? AND status='PENDING'",
+                    (job["id"], device),
+                )
+                self.conn.commit()
+                claimed = cur.rowcount == 1
+            if not claimed:
+                return True
+            if not link.warm():
+                self._fail(device, job, f"Bağlanamadı ({ip}:{port})")
+                return True
+            if not fl.jobs:
+                # boşta: sayaç başlangıcı sadece bilinmiyorsa okunur, sonraki işler üst üste eklenir
+                if link is not fl.link:
+                    fl.forget(link)
+                if fl.end is None and fl.counter is not False:
+                    base = self._label_count(link)
+                    fl.counter = base is not None
+                    fl.synced_at = time.monotonic()
+                else:
+                    base = fl.end
+                fl.reset(base)
+            try:
+                for _ in range(copies):
+                    link.send(data, keep_open=True)
+                    sent += 1
+            except Exception:
+                if sent:
+                    # gönderilen kopyalar yazıcıda: tekrar denemede sadece kalanlar gönderilsin
+                    self._exec("UPDATE print_spool SET copies=? WHERE id=?", (copies - sent, job["id"]))
+                    if fl.end is not None:
+                        fl.end += sent
+                raise
+        finally:
+            link.lock.release()
+        fl.link = link
+        fl.add(job, copies)
+        return True
+
+    def _poll(self, device: str, fl: "_Ucus") -> None:
+        """Onay bekleyen işler: etiket sayacı beklenen değere ulaşanlar DONE; sayaç yoksa
+        ya da ilerlemiyorsa ~HS (hata / tampon boş)."""
+        link = fl.link
+        if link is None or not link.lock.acquire(timeout=1):
+            return
+        count = None
+        flags = None
+        try:
+            now = time.monotonic()
+            if fl.base is not None:
+                count = self._label_count(link)
+            if count is None or now - fl.progress_at >= 1.0:
+                try:
+                    flags = parse_hs(link.query(b"~HS\r\n", 3, 0.8))
+                except Exception:
+                    flags = None
+        finally:
+            link.lock.release()
+
+        now = time.monotonic()
+        if count is not None:
+            if fl.last_count is None or count > fl.last_count:
+                fl.last_count = count
+                fl.progress_at = now
+                fl.synced_at = now
+            while fl.jobs and fl.jobs[0]["start"] is not None and count >= fl.jobs[0]["start"] + fl.jobs[0]["copies"]:
+                self._done(device, fl.jobs.pop(0), "label_count")
+            if not fl.jobs and fl.end is not None:
+                # hepsi basıldı: sonraki işin başlangıcı bilinen sayaç (dışarıdan basılan dahil)
+                fl.end = max(fl.end, count)
+        elif fl.base is None:
+            if flags is None:
+                if not fl.hs_answered:
+                    # ~HS desteklemeyen cihaz: gönderim başarılı = tamam
+                    while fl.jobs:
+                        self._done(device, fl.jobs.pop(0), "sent")
+            else:
+                fl.hs_answered = True
+                if not any(flags.get(k) for k in FAULT_FLAGS):
+                    drained = flags.get("formats_in_buffer", -1) == 0 and flags.get("labels_remaining", -1) in (0, -1)
+                    # tampon boş, format henüz işlenmemişken de görülebilir: önce meşgul görülmüş
+                    # olmalı ya da son gönderimden en az 1 sn sonra art arda iki kez boş
+                    if not drained:
+                        fl.seen_busy = True
+                        fl.idle_polls = 0
+                    else:
+                        fl.idle_polls += 1
+                        if fl.seen_busy or (fl.idle_polls >= 2 and now - fl.last_send >= 1.0):
+                            while fl.jobs:
+                                self._done(device, fl.jobs.pop(0), "hs")
+
+        if flags is not None and any(flags.get(k) for k in FAULT_FLAGS):
+            # yazıcı hatada: tekrar gönderme, sorun giderilene kadar bekle (en fazla FAULT_WAIT_S)
+            if fl.fault_since is None:
+                fl.fault_since = now
+        elif flags is not None and fl.fault_since is not None:
+            fl.fault_since = None
+            fl.progress_at = now
+
+        if fl.jobs:
+            if fl.fault_since is not None:
+                expired = now - fl.fault_since > self.FAULT_WAIT_S
+            else:
+                expired = now - fl.progress_at > self.CONFIRM_TIMEOUT_S
+            if expired:
+                last = count if count is not None else fl.last_count
+                while fl.jobs:
+                    e = fl.jobs.pop(0)
+                    printed = 0
+                    if last is not None and e["start"] is not None:
+                        printed = max(0, min(e["copies"], last - e["start"]))
+                    left = e["copies"] - printed
+                    # yeniden denemede basılmış kopyalar tekrar gönderilmez
+                    self._exec("UPDATE print_spool SET copies=? WHERE id=?", (max(1, left), e["job"]["id"]))
+                    self._dead(device, e["job"], f"Yazıcı onayı alınamadı ({printed}/{e['copies']} basıldı)")
+                # tamponda kalanlar sonradan basılabilir: başlangıç artık bilinmiyor
+                fl.end = None
+
+        if not fl.jobs and device not in self._keep_open:
+            # bağlantı kapalıyken başka yoldan basılanlar görülmez: sonraki işte sayaç yeniden okunur
+            fl.end = None
+            if link.lock.acquire(timeout=1):
+                try:
+                    link.close()
+                finally:
+                    link.lock.release()
+
+    def _idle_sync(self, device: str, fl: "_Ucus") -> None:
+        """Boştaki açık (koli) bağlantıda bilinen sayaç başlangıcını arada bir tazeler; böylece
+        sıradaki iş gönderilmeden önce sorgu beklemez. Kilit meşgulse atlanır."""
+        link = fl.link
+        if (fl.jobs or link is None or fl.end is None or device not in self._keep_open
+                or time.monotonic() - fl.synced_at < self.IDLE_SYNC_S or link.sock is None):
+            return
+        if not link.lock.acquire(blocking=False):
+            return
+        try:
+            count = self._label_count(link)
+        finally:
+            link.lock.release()
+        fl.synced_at = time.monotonic()
+        fl.end = count
+
+    def _done(self, device: str, e: Dict[str, Any], confirm: str) -> None:
+        c = self.counters.setdefault(device, {"done": 0, "labels": 0, "retries": 0, "dead": 0, "confirm_ms_sum": 0.0, "last_done_ts": 0.0})
+        c["done"] += 1
+        c["labels"] += e["copies"]
+        c["confirm_ms_sum"] += (time.monotonic() - e["t0"]) * 1000.0
+        c["last_done_ts"] = time.time()
+        self._exec(
+            "UPDATE print_spool SET status='DONE', done_at=?, confirm=?, last_error=NULL WHERE id=?",
+            (time.time(), confirm, e["job"]["id"]),
+        )
+
+    def _label_count(self, link) -> Optional[int]:
+        try:
+            return parse_label_count(link.query(LABEL_COUNT_CMD, timeout=0.5, until=_sgd_done))
+        except Exception:
+            return None
+
+    def _fail(self, device: str, job: sqlite3.Row, err: str) -> None:
+        attempts = int(job["attempts"] or 0) + 1
+        c = self.counters.get(device)
+        if c is not None:
+            c["retries"] += 1
+        if attempts >= self.MAX_ATTEMPTS:
+            self._exec("UPDATE print_spool SET attempts=? WHERE id=?", (attempts, job["id"]))
+            self._dead(device, job, err)
+            return
+        backoff = min(self.BACKOFF_MAX_S, self.BACKOFF_BASE_S * (2 ** (attempts - 1)))
+        self._exec(
+            "UPDATE print_spool SET status='PENDING', attempts=?, next_try=?, last_error=? WHERE id=?",
+            (attempts, time.time() + backoff, err, job["id"]),
+        )
+
+    def _dead(self, device: str, job: sqlite3.Row, err: str) -> None:
+        self._exec("UPDATE print_spool SET status='DEAD', last_error=? WHERE id=?", (err, job["id"]))
+        c = self.counters.get(device)
+        if c is not None:
+            c["dead"] += 1
+        if self._on_dead is not None:
+            try:
+                d = dict(job)
+                d["status"] = "DEAD"
+                d["last_error"] = err
+                d.pop("zpl", None)
+                self._on_dead(d)
+            except Exception:
+                pass
+
+
+class _Ucus:
+    """Bir cihazda gönderilmiş, onay bekleyen işler (gönderim sırasıyla).
+    base / end: ilk işten önce bilinen etiket sayacı ve son işten sonra beklenen sayaç
+    (bilinmiyorsa / sayaç yoksa None). İşler bitince end sonraki işin başlangıcıdır.
+    counter: bağlantı etiket sayacını destekliyor mu (None: henüz sorulmadı)."""
+
+    def __init__(self) -> None:
+        self.jobs: List[Dict[str, Any]] = []
+        self.link = None
+        self.counter: Optional[bool] = None
+        self.synced_at = 0.0
+        self.reset(None)
+
+    def forget(self, link) -> None:
+        """Başka bağlantıya (adres değişti) geçiş: sayaç bilgisi geçersiz."""
+        self.link = link
+        self.end = None
+        self.counter = None
+
+    def reset(self, base: Optional[int]) -> None:
+        now = time.monotonic()
+        self.base = base
+        self.end = base
+        self.last_count = base
+        self.progress_at = now
+        self.last_send = now
+        self.fault_since: Optional[float] = None
+        self.hs_answered = False
+        self.seen_busy = False
+        self.idle_polls = 0
+
+    def add(self, job: sqlite3.Row, copies: int) -> None:
+        start = self.end
+        self.end = None if start is None else start + copies
+        now = time.monotonic()
+        self.jobs.append({"job": job, "copies": copies, "start": start, "t0": now})
+        self.last_send = now
+        if len(self.jobs) == 1:
+            self.progress_at = now
+        self.seen_busy = False
+        self.idle_polls = 0
+
+
+class YaziciGrubu:
+    """Aynı tip etiketi basabilen yazıcılar (ör. prod + prod2) arasında iş dağıtımı.
+
+    mode:
+      - "single"      : ilk üye asıl, diğerleri yedek (sadece arızada devreye girer)
+      - "round_robin" : sağlıklı üyeler arasında sırayla
+      - "least_queue" : kuyruğu (PENDING + SENT) en kısa sağlıklı üyeye
+    Sıra gereken etiketler için sticky_key verilir: aynı anahtarlı işler, yazıcı sağlıklı
+    kaldıkça hep aynı üyeye gider (o üyenin FIFO kuyruğu sırayı korur). Anahtarlar
+    "<iş>|..." biçimindedir; iş bitince forget("<iş>|") ile silinir, en çok MAX_STICKY tutulur.
+    Bir üye arızaya düşünce bekleyen (PENDING) işleri sağlıklı üyeye taşınır; taşıma
+    id sırasını bozmaz.
+    """
+
+    RATE_WINDOW_S = 60.0
+    MAX_STICKY = 512
+
+    def __init__(self, members: List[str], spool: YazdirmaKuyrugu,
+                 health_fn: Callable[[str], Optional[bool]], mode: str = "single") -> None:
+        self.members = list(members)
+        self.spool = spool
+        self._health = health_fn
+        self.mode = mode
+        self._rr = 0
+        self._sticky: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.dispatched: Dict[str, int] = {m: 0 for m in self.members}
+        self._recent: Dict[str, List[float]] = {m: [] for m in self.members}
+        self.failovers = 0
+
+    def _healthy(self, dev: str) -> bool:
+        try:
+            ok = self._health(dev)
+        except Exception:
+            ok = None
+        # henüz yoklanmamış cihaz (None) sağlıklı sayılır; kuyruk zaten yeniden dener
+        return ok is not False
+
+    def pick(self, sticky_key: Optional[str] = None) -> str:
+        with self._lock:
+            healthy = [m for m in self.members if self._healthy(m)]
+            if not healthy:
+                return self.members[0]
+            if sticky_key is not None:
+                dev = self._sticky.get(sticky_key)
+                if dev in healthy:
+                    return dev
+            if self.mode == "least_queue":
+                dev = min(healthy, key=lambda m: (self.spool.depth(m), self.members.index(m)))
+            elif self.mode == "round_robin":
+                dev = healthy[self._rr % len(healthy)]
+                self._rr += 1
+            else:
+                dev = healthy[0]
+            if sticky_key is not None:
+                self._sticky[sticky_key] = dev
+                while len(self._sticky) > self.MAX_STICKY:
+                    self._sticky.pop(next(iter(self._sticky)))
+            return dev
+
+    def forget(self, prefix: str) -> int:
+        """prefix ile başlayan sticky anahtarlarını siler (iş bitti)."""
+        with self._lock:
+            keys = [k for k in self._sticky if k.startswith(prefix)]
+            for k in keys:
+                del self._sticky[k]
+        return len(keys)
+
+    def dispatch(self, zpl: str, copies: int = 1, label: str = "", sticky_key: Optional[str] = None) -> Tuple[str, int]:
+        dev = self.pick(sticky_key)
+        job_id = self.spool.enqueue(dev, zpl, copies=copies, label=label)
+        now = time.monotonic()
+        with self._lock:
+            self.dispatched[dev] = self.dispatched.get(dev, 0) + 1
+            rec = self._recent.setdefault(dev, [])
+            rec.append(now)
+            while rec and now - rec[0] > self.RATE_WINDOW_S:
+                rec.pop(0)
+        return dev, job_id
+
+    def on_health(self, dev: str, ok: bool) -> None:
+        """Yazıcı izleyicisinden: üye arızaya düştüyse bekleyen işlerini taşı."""
+        if ok or dev not in self.members:
+            return
+        healthy = [m for m in self.members if m != dev and self._healthy(m)]
+        if not healthy:
+            return
+        dst = min(healthy, key=lambda m: self.spool.depth(m))
+        if self.spool.move_pending(dev, dst):
+            self.failovers += 1
+        with self._lock:
+            for k, v in list(self._sticky.items()):
+                if v == dev:
+                    self._sticky[k] = dst
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for m in self.members:
+                rec = [t for t in self._recent.get(m, []) if now - t <= self.RATE_WINDOW_S]
+                out[m] = {"dispatched": self.dispatched.get(m, 0), "per_min": len(rec), "healthy": self._healthy(m)}
+        return out
@@ -0,0 +1,470 @@
+"""Zebra yazıcı emülatörü (yerel TCP sunucu).
+
+Hatta gitmeden baskı yolunu (yazdırma kuyruğu, ~HS izleyici, koli / ürün etiketi)
+denemek ve yük testi yapmak için 9100 portunu taklit eder.
+
+- ZPL akışı çözülür: ^XA / ^XZ, ^FD..^FS, ^FN, ^PQ, ^DF (format sakla) / ^XF (format çağır),
+  ~HS (durum), ~HQOD (baskı metresi: gerçek yazıcıdaki gibi inç cinsinden ortam uzunluğu),
+  ~SD (koyuluk), ~JA (tamponu boşalt), SGD "! U1 getvar" (odometer.total_label_count: etiket sayısı)
+- Her etiket alınma / basılma zamanıyla kaydedilir (isteğe bağlı JSONL dosyası)
+- Baskı hızı (etiket/sn) ve tampon sınırı simüle edilir: tampon doluyken bağlantıdan
+  okuma durur, gönderen taraf TCP'de bekler (gerçek yazıcıdaki gibi)
+- Kağıt bitti / kafa açık / duraklatıldı / ribon bitti ve bağlantı kopması tetiklenebilir
+- stats(): alınan / basılan etiket, etiket/sn (son 10 sn), tampon, sayaç
+
+Kullanım (komut satırı):
+    python yazici_emulatoru.py --ports 9101,9102,9103 --speed 8 --buffer 64
+Kod içinden (yük testi / Yönetici Paneli):
+    emu = ZebraEmulatoru(port=0).start(); ... emu.port ...; emu.stop()
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+STX, ETX = "\x02", "\x03"
+RATE_WINDOW_S = 10.0
+
+
+@dataclass
+class Etiket:
+    no: int
+    conn: int
+    received: float                   # time.monotonic()
+    printed: float = 0.0
+    copies: int = 1
+    template: str = ""                # ^XF ile çağrılan format
+    fields: List[str] = field(default_factory=list)
+
+
+class _Format:
+    """^XA..^XZ arasında toplanan alanlar."""
+
+    def __init__(self) -> None:
+        self.items: List[Tuple[str, Any]] = []   # ("fd", metin) | ("fn", no)
+        self.fn: Dict[int, str] = {}
+        self.cur_fn: Optional[int] = None
+        self.df: str = ""
+        self.xf: str = ""
+        self.qty = 1
+
+
+class ZebraEmulatoru:
+    def __init__(self, host: str = "127.0.0.1", port: int = 9100, speed_lps: float = 8.0,
+                 buffer_limit: int = 64, record_path: Optional[str] = None,
+                 disconnect_every: int = 0, keep: int = 100000, label_length_in: float = 1.25) -> None:
+        self.host = host
+        self.port = int(port)
+        self.speed_lps = float(speed_lps)
+        self.buffer_limit = max(1, int(buffer_limit))
+        self.disconnect_every = int(disconnect_every)
+        self.flags = {"paper_out": False, "head_open": False, "paused": False, "ribbon_out": False}
+        self.darkness = 0
+        self.label_length_in = float(label_length_in)   # ~HQOD ortam uzunluğu hesabı için
+        self.labels: deque = deque(maxlen=int(keep))
+        self.templates: Dict[str, List[Tuple[str, Any]]] = {}
+        self.odometer = 0
+        self.received = 0
+        self.max_buffer = 0
+        self._buffer: deque = deque()
+        self._printing: Optional[Etiket] = None
+        self._left = 0                        # basılmakta olan etiketin kalan kopyası
+        self._cv = threading.Condition()
+        self._stop = False
+        self._online = True
+        self._srv: Optional[socket.socket] = None
+        self._clients: Dict[int, socket.socket] = {}
+        self._conn_seq = 0
+        self._printed_ts: deque = deque()
+        self._record = open(record_path, "a", encoding="utf-8") if record_path else None
+
+    # -------------------------------
+    # Yaşam döngüsü
+    # -------------------------------
+    def start(self) -> "ZebraEmulatoru":
+        self._listen()
+        threading.Thread(target=self._print_loop, name=f"ZebraEmu-{self.port}-baski", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        with self._cv:
+            self._stop = True
+            self._cv.notify_all()
+        self._close_listener()
+        self.drop_connections()
+        if self._record is not None:
+            try:
+                self._record.close()
+            except Exception:
+                pass
+
+    def _listen(self) -> None:
+        srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        srv.bind((self.host, self.port))
+        srv.listen(8)
+        self.port = srv.getsockname()[1]
+        self._srv = srv
+        threading.Thread(target=self._accept_loop, args=(srv,), name=f"ZebraEmu-{self.port}", daemon=True).start()
+
+    def _close_listener(self) -> None:
+        srv, self._srv = self._srv, None
+        if srv is not None:
+            try:
+                # accept() içindeki thread'i uyandırır; sadece close() portu açık bırakabilir
+                srv.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+            try:
+                srv.close()
+            except Exception:
+                pass
+
+    # -------------------------------
+    # Arıza / ayar
+    # -------------------------------
+    def set_fault(self, **flags: bool) -> None:
+        """set_fault(paper_out=True) gibi. Hata varken baskı durur, tampon dolmaya devam eder."""
+        with self._cv:
+            for k, v in flags.items():
+                if k in self.flags:
+                    self.flags[k] = bool(v)
+            self._cv.notify_all()
+
+    def set_online(self, online: bool) -> None:
+        """False: port kapanır (bağlanılamaz), açık bağlantılar düşer. True: yeniden dinler."""
+        if online == self._online:
+            return
+        self._online = online
+        if online:
+            self._listen()
+        else:
+            self._close_listener()
+            self.drop_connections()
+
+    def drop_connections(self) -> None:
+        with self._cv:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for c in clients:
+            try:
+                c.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+            try:
+                c.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._cv:
+            while self._printed_ts and now - self._printed_ts[0] > RATE_WINDOW_S:
+                self._printed_ts.popleft()
+            span = min(RATE_WINDOW_S, now - self._printed_ts[0]) if self._printed_ts else 0.0
+            return {
+                "port": self.port,
+                "received": self.received,
+                "printed": self.odometer,
+                "labels_per_s": round(len(self._printed_ts) / span, 2) if span > 0 else 0.0,
+                "buffer": len(self._buffer) + (1 if self._printing else 0),
+                "max_buffer": self.max_buffer,
+                "connections": len(self._clients),
+                "online": self._online,
+                "flags": dict(self.flags),
+            }
+
+    # -------------------------------
+    # Bağlantılar
+    # -------------------------------
+    def _accept_loop(self, srv: socket.socket) -> None:
+        while not self._stop:
+            try:
+                c, _addr = srv.accept()
+            except Exception:
+                return
+            with self._cv:
+                self._conn_seq += 1
+                cid = self._conn_seq
+                self._clients[cid] = c
+            threading.Thread(target=self._client_loop, args=(cid, c), name=f"ZebraEmu-{self.port}-{cid}", daemon=True).start()
+
+    def _client_loop(self, cid: int, c: socket.socket) -> None:
+        buf = ""
+        fmt: Optional[_Format] = None
+        formats_on_conn = 0
+        try:
+            while not self._stop:
+                # tampon doluysa okuma: gönderen taraf TCP'de bekler
+                with self._cv:
+                    while len(self._buffer) >= self.buffer_limit and not self._stop and cid in self._clients:
+                        self._cv.wait(0.5)
+                    if cid not in self._clients:
+                        return
+                data = c.recv(4096)
+                if not data:
+                    return
+                buf += data.decode("utf-8", errors="replace")
+                buf, fmt, done = self._parse(buf, fmt, cid, c)
+                formats_on_conn += done
+                if self.disconnect_every and formats_on_conn >= self.disconnect_every:
+                    return
+        except Exception:
+            return
+        finally:
+            with self._cv:
+                self._clients.pop(cid, None)
+            try:
+                c.close()
+            except Exception:
+                pass
+
+    # -------------------------------
+    # ZPL
+    # -------------------------------
+    def _parse(self, buf: str, fmt: Optional[_Format], cid: int, c: socket.socket):
+        """Tam komutları işler; yarım kalan kısmı geri döndürür. (kalan, format, tamamlanan format sayısı)"""
+        done = 0
+        i, n = 0, len(buf)
+        while i < n:
+            ch = buf[i]
+            if ch == "!":
+                # SGD: ! U1 getvar "ad" (satır sonuna kadar)
+                head = buf[i:i + 4]
+                if head != "! U1":
+                    if len(head) < 4 and "! U1".startswith(head):
+                        break  # yarım komut: devamını bekle
+                    i += 1
+                    continue
+                end = buf.find("\n", i)
+                if end < 0:
+                    break
+                self._sgd(c, buf[i + 4:end].strip())
+                i = end + 1
+                continue
+            if ch not in "^~":
+                i += 1
+                continue
+            if i + 3 > n:
+                break
+            cmd = buf[i + 1:i + 3].upper()
+            if ch == "~":
+                if cmd == "HS":
+                    self._reply(c, self._hs_text())
+                    i += 3
+                    continue
+                if cmd == "JA":
+                    with self._cv:
+                        self._buffer.clear()
+                        self._cv.notify_all()
+                    i += 3
+                    continue
+                if cmd in ("HQ", "SD"):
+                    if i + 5 > n:
+                        break
+                    arg = buf[i + 3:i + 5]
+                    if cmd == "HQ" and arg.upper() == "OD":
+                        self._reply(c, self._odometer_text())
+                    elif cmd == "SD":
+                        try:
+                            self.darkness = int(arg)
+                        except Exception:
+                            pass
+                    i += 5
+                    continue
+            if ch == "^" and cmd == "XA":
+                fmt = _Format()
+                i += 3
+                continue
+            if ch == "^" and cmd == "XZ":
+                if fmt is not None:
+                    done += self._end_format(fmt, cid)
+                fmt = None
+                i += 3
+                continue
+            # parametreli komut: sonraki ^ / ~ (^FD için ^FS) gelene kadar bekle
+            if ch == "^" and cmd == "FD":
+                end = buf.find("^FS", i + 3)
+                if end < 0:
+                    end = buf.upper().find("^FS", i + 3)
+                if end < 0:
+                    break
+                arg = buf[i + 3:end]
+                nxt = end
+            else:
+                nxt = min([p for p in (buf.find("^", i + 1), buf.find("~", i + 1)) if p >= 0], default=-1)
+                if nxt < 0:
+                    break
+                arg = buf[i + 3:nxt]
+            if fmt is not None:
+                self._format_cmd(fmt, cmd, arg.strip("\r\n"))
+            i = nxt
+        return buf[i:], fmt, done
+
+    def _format_cmd(self, fmt: _Format, cmd: str, arg: str) -> None:
+        if cmd == "FD":
+            if fmt.cur_fn is not None and not fmt.df:
+                fmt.fn[fmt.cur_fn] = arg
+            else:
+                fmt.items.append(("fd", arg))
+        elif cmd == "FN":
+            try:
+                num = int("".join(ch for ch in arg if ch.isdigit()) or 0)
+            except Exception:
+                num = 0
+            if fmt.df:
+                fmt.items.append(("fn", num))
+            else:
+                fmt.cur_fn = num
+        elif cmd == "FS":
+            fmt.cur_fn = None
+        elif cmd == "PQ":
+            try:
+                fmt.qty = max(1, int(arg.split(",")[0] or 1))
+            except Exception:
+                fmt.qty = 1
+        elif cmd == "DF":
+            fmt.df = arg.split(",")[0].strip() or "FORMAT"
+        elif cmd == "XF":
+            fmt.xf = arg.split(",")[0].strip()
+
+    def _end_format(self, fmt: _Format, cid: int) -> int:
+        if fmt.df:
+            self.templates[fmt.df] = list(fmt.items)
+            return 0
+        items = list(self.templates.get(fmt.xf, [])) + fmt.items if fmt.xf else fmt.items
+        fields = [v if kind == "fd" else fmt.fn.get(v, "") for kind, v in items]
+        if not fields and not fmt.xf:
+            return 0
+        with self._cv:
+            self.received += 1
+            lbl = Etiket(self.received, cid, time.monotonic(), copies=fmt.qty, template=fmt.xf, fields=fields)
+            self._buffer.append(lbl)
+            self.max_buffer = max(self.max_buffer, len(self._buffer))
+            self._cv.notify_all()
+        return 1
+
+    def _hs_text(self) -> str:
+        with self._cv:
+            formats = len(self._buffer) + (1 if self._printing else 0)
+            remaining = self._left + sum(b.copies for b in self._buffer)
+        f = self.flags
+        return (
+            f"{STX}030,{int(f['paper_out'])},{int(f['paused'])},1245,{formats:03d},0,0,0,000,0,0,0{ETX}\r\n"
+            f"{STX}000,0,{int(f['head_open'])},{int(f['ribbon_out'])},0,0,0,0,{remaining:08d},1,000{ETX}\r\n"
+            f"{STX}1234,0{ETX}\r\n"
+        )
+
+    def _odometer_text(self) -> str:
+        # gerçek ~HQOD: sayaçlar basılan ortam uzunluğudur (inç, '"'), etiket adedi değil
+        inches = int(self.odometer * self.label_length_in)
+        return (
+            f"{STX}\r\n  PRINT METERS\r\n"
+            f"     TOTAL NONRESETTABLE:  {inches:>12} \"\r\n"
+            f"     USER RESETTABLE CNTR1:{inches:>12} \"\r\n"
+            f"     USER RESETTABLE CNTR2:{inches:>12} \"\r\n{ETX}\r\n"
+        )
+
+    def _sgd(self, c: socket.socket, line: str) -> None:
+        """SGD getvar: bilinen değişken için "değer", bilinmeyen için "?" (gerçek yazıcıdaki gibi)."""
+        parts = line.split(None, 1)
+        if not parts or parts[0].lower() != "getvar":
+            return
+        name = parts[1].strip().strip('"').lower() if len(parts) > 1 else ""
+        if name == "odometer.total_label_count":
+            with self._cv:
+                value = str(self.odometer)
+        else:
+            value = "?"
+        self._reply(c, f'"{value}"')
+
+    @staticmethod
+    def _reply(c: socket.socket, text: str) -> None:
+        try:
+            c.sendall(text.encode("ascii", errors="replace"))
+        except Exception:
+            pass
+
+    # -------------------------------
+    # Baskı motoru
+    # -------------------------------
+    def _faulted(self) -> bool:
+        return any(self.flags.values())
+
+    def _print_loop(self) -> None:
+        while True:
+            with self._cv:
+                while not self._stop and (not self._buffer or self._faulted()) and self._printing is None:
+                    self._cv.wait()
+                if self._stop:
+                    return
+                if self._printing is None:
+                    self._printing = self._buffer.popleft()
+                    self._left = self._printing.copies
+                    self._cv.notify_all()
+                while self._faulted() and not self._stop:
+                    self._cv.wait()
+                if self._stop:
+                    return
+            time.sleep(1.0 / self.speed_lps if self.speed_lps > 0 else 0)
+            with self._cv:
+                lbl = self._printing
+                if lbl is None:
+                    continue
+                self._left -= 1
+                self.odometer += 1
+                self._printed_ts.append(time.monotonic())
+                if self._left <= 0:
+                    lbl.printed = time.monotonic()
+                    self.labels.append(lbl)
+                    self._printing = None
+                    if self._record is not None:
+                        try:
+                            self._record.write(json.dumps(asdict(lbl), ensure_ascii=False) + "\n")
+                            self._record.flush()
+                        except Exception:
+                            pass
+
+
+def start_many(ports: List[int], host: str = "127.0.0.1", **cfg: Any) -> List[ZebraEmulatoru]:
+    """Birden fazla yazıcı (ör. box / prod / prod2) için emülatör başlatır."""
+    return [ZebraEmulatoru(host=host, port=p, **cfg).start() for p in ports]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Zebra yazıcı emülatörü")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--ports", default="9100", help="virgülle ayrılmış portlar (ör. 9101,9102,9103)")
+    ap.add_argument("--speed", type=float, default=8.0, help="etiket/sn")
+    ap.add_argument("--buffer", type=int, default=64, help="tampondaki en fazla format")
+    ap.add_argument("--record", default=None, help="etiket kaydı (JSONL); port numarası eklenir")
+    ap.add_argument("--disconnect-every", type=int, default=0, help="her N formatta bağlantıyı kopar")
+    args = ap.parse_args()
+
+    emus = []
+    for p in [int(x) for x in args.ports.split(",") if x.strip()]:
+        rec = f"{args.record}.{p}.jsonl" if args.record else None
+        emus.append(ZebraEmulatoru(args.host, p, args.speed, args.buffer, rec, args.disconnect_every).start())
+    print("Dinleniyor:", ", ".join(f"{args.host}:{e.port}" for e in emus))
+    try:
+        while True:
+            time.sleep(1.0)
+            print(" | ".join(
+                f"{s['port']}: alınan {s['received']} basılan {s['printed']} {s['labels_per_s']}/sn tampon {s['buffer']}"
+                for s in (e.stats() for e in emus)
+            ))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for e in emus:
+            e.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Zebra yazıcı durum izleyicisi (asyncio).
+
+- Tüm yazıcılar tek bir asyncio döngüsünde aynı anda yoklanır (ayrı daemon thread)
+- Yoklama bağlantı açıp `~HS` (Host Status) gönderir; kağıt bitti / kafa açık /
+  duraklatıldı bilgisi cevaptan okunur
+- Son LIVENESS_S içinde başarılı bir baskı yapılmışsa bağlantı açılmaz; baskı
+  yolunun canlılık bilgisi kullanılır. Baskı sürerken (uç kilitli) yoklama atlanır,
+  baskı bağlantısı açık tutuluyorsa ~HS o bağlantı üzerinden sorulur
+- Durum değişmedikçe yoklama aralığı katlanarak uzar; değişince kısaya döner
+- Durum değişiklikleri on_change(device, durum) ile bildirilir (izleyici thread'inden)
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# status: OK | OFFLINE | PAPER_OUT | HEAD_OPEN | PAUSED | RIBBON_OUT | NO_IP | DISABLED
+DURUM_YAZI = {
+    "OK": "HAZIR",
+    "OFFLINE": "BAĞLI DEĞİL",
+    "PAPER_OUT": "KAĞIT YOK",
+    "HEAD_OPEN": "KAFA AÇIK",
+    "PAUSED": "DURAKLATILDI",
+    "RIBBON_OUT": "RİBON YOK",
+    "NO_IP": "IP YOK",
+    "DISABLED": "PASİF",
+}
+
+
+@dataclass
+class YaziciDurumu:
+    device: str
+    ip: str = ""
+    port: int = 9100
+    status: str = "OFFLINE"
+    online: bool = False
+    flags: Dict[str, Any] = field(default_factory=dict)
+    ts: float = 0.0
+    source: str = "probe"  # probe | liveness | print
+
+    @property
+    def ok(self) -> bool:
+        return self.online and self.status == "OK"
+
+    def key(self) -> tuple:
+        return (self.ip, self.port, self.status, self.online)
+
+
+def parse_hs(resp: bytes) -> Optional[Dict[str, Any]]:
+    """~HS cevabını çözer. Cevap 3 satırdır (STX ... ETX).
+    1. satır: aaa,b,c,dddd,eee,...  -> b = kağıt bitti, c = duraklatıldı, eee = tampondaki format sayısı
+    2. satır: mmm,n,o,p,q,r,s,t,uuuuuuuu,... -> o = kafa açık, p = ribon bitti, u = partide kalan etiket
+    Çözülemezse None döner. Sayısal alanlar yoksa -1 olur.
+    """
+    try:
+        text = resp.decode("ascii", errors="ignore")
+    except Exception:
+        return None
+    lines = []
+    for chunk in text.split("\x03"):
+        chunk = chunk.strip().lstrip("\x02").strip()
+        if chunk:
+            lines.append(chunk.split(","))
+    if len(lines) < 2 or len(lines[0]) < 3 or len(lines[1]) < 4:
+        return None
+
+    def _flag(v: str) -> bool:
+        return v.strip() == "1"
+
+    def _num(row: list, i: int) -> int:
+        try:
+            return int(row[i].strip())
+        except Exception:
+            return -1
+
+    return {
+        "paper_out": _flag(lines[0][1]),
+        "paused": _flag(lines[0][2]),
+        "head_open": _flag(lines[1][2]),
+        "ribbon_out": _flag(lines[1][3]),
+        "formats_in_buffer": _num(lines[0], 4),
+        "labels_remaining": _num(lines[1], 8),
+    }
+
+
+def _status_from_flags(flags: Dict[str, bool]) -> str:
+    if flags.get("head_open"):
+        return "HEAD_OPEN"
+    if flags.get("paper_out"):
+        return "PAPER_OUT"
+    if flags.get("ribbon_out"):
+        return "RIBBON_OUT"
+    if flags.get("paused"):
+        return "PAUSED"
+    return "OK"
+
+
+class YaziciIzleyici:
+    """Yazıcıları arka planda izler.
+
+    targets_fn() -> {device: (ip, port, enabled)}   (her turda okunur; ayar değişikliği yakalanır)
+    link_fn(ip, port) -> nesne: .lock (threading.Lock), .last_ok (monotonic), .last_fail
+    on_change(device, YaziciDurumu)
+    """
+
+    TICK_S = 0.25
+    BASE_S = 2.0
+    MAX_OK_S = 30.0
+    MAX_BAD_S = 10.0
+    LIVENESS_S = 10.0
+    CONNECT_TIMEOUT_S = 0.6
+    READ_TIMEOUT_S = 0.8
+
+    def __init__(self, targets_fn: Callable[[], Dict[str, Tuple[str, int, bool]]],
+                 on_change: Callable[[str, YaziciDurumu], None],
+                 link_fn: Optional[Callable[[str, int], object]] = None):
+        self._targets_fn = targets_fn
+        self._on_change = on_change
+        self._link_fn = link_fn
+        self.states: Dict[str, YaziciDurumu] = {}
+        self._interval: Dict[str, float] = {}
+        self._due: Dict[str, float] = {}
+        self._poke: set = set()
+        self._lock = threading.Lock()
+        self._stop = False
+        self.probe_count = 0
+        self.skipped_count = 0
+        self._thread = threading.Thread(target=self._run, name="YaziciIzleyici", daemon=True)
+        self._thread.start()
+
+    # --- dışarıdan ---
+    def poke(self, device: str | None = None) -> None:
+        """Bir (veya tüm) cihazı hemen yoklat (rozet çift tık)."""
+        with self._lock:
+            if device is None:
+                self._poke.update(self._due.keys() or ("box", "prod", "prod2"))
+            else:
+                self._poke.add(device)
+
+    def report_print(self, ip: str, port: int, ok: bool) -> None:
+        """Baskı yolu sonucu: başarısız baskı cihazı hemen yeniden yoklatır."""
+        if ok:
+            return
+        with self._lock:
+            for dev, st in self.states.items():
+                if st.ip == ip and st.port == port:
+                    self._poke.add(dev)
+
+    def stop(self) -> None:
+        self._stop = True
+
+    # --- izleyici thread ---
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        except Exception:
+            pass
+
+    async def _main(self):
+        while not self._stop:
+            try:
+                targets = self._targets_fn() or {}
+            except Exception:
+                targets = {}
+            now = time.monotonic()
+            with self._lock:
+                poked, self._poke = self._poke, set()
+            jobs = []
+            for dev, (ip, port, enabled) in targets.items():
+                prev = self.states.get(dev)
+                moved = prev is None or prev.ip != ip or prev.port != port
+                if not enabled or not ip:
+                    st = YaziciDurumu(dev, ip, port, "DISABLED" if not enabled else "NO_IP", False, {}, now, "probe")
+                    self._publish(dev, st)
+                    continue
+                if moved or dev in poked or now >= self._due.get(dev, 0.0):
+                    jobs.append(self._check(dev, ip, port, force=(moved or dev in poked)))
+            if jobs:
+                await asyncio.gather(*jobs, return_exceptions=True)
+            await asyncio.sleep(self.TICK_S)
+
+    async def _check(self, dev: str, ip: str, port: int, force: bool):
+        prev = self.states.get(dev)
+        link = None
+        if self._link_fn is not None:
+            try:
+                link = self._link_fn(ip, port)
+            except Exception:
+                link = None
+        now = time.monotonic()
+
+        # Baskı yolu yakın zamanda başarılıysa bağlantı açma
+        if (not force) and link is not None and prev is not None and prev.online:
+            last_ok = float(getattr(link, "last_ok", 0.0) or 0.0)
+            last_fail = float(getattr(link, "last_fail", 0.0) or 0.0)
+            if last_ok > last_fail and (now - last_ok) < self.LIVENESS_S:
+                self.skipped_count += 1
+                st = YaziciDurumu(dev, ip, port, prev.status, True, dict(prev.flags), now, "liveness")
+                self._publish(dev, st)
+                return
+
+        # Baskı sürüyorsa yoklama yapma (tek bağlantılı Zebra portu)
+        lk = getattr(link, "lock", None) if link is not None else None
+        if lk is not None and not lk.acquire(blocking=False):
+            self.skipped_count += 1
+            self._due[dev] = now + self.BASE_S
+            return
+        try:
+            if getattr(link, "sock", None) is not None:
+                # açık (ısıtılmış) baskı bağlantısı varsa ikinci bağlantı açma
+                loop = asyncio.get_running_loop()
+                st = await loop.run_in_executor(None, self._probe_link, dev, link)
+            else:
+                st = await self._probe(dev, ip, port)
+        finally:
+            if lk is not None:
+                lk.release()
+        self._publish(dev, st)
+
+    async def _probe(self, dev: str, ip: str, port: int) -> YaziciDurumu:
+        self.probe_count += 1
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), self.CONNECT_TIMEOUT_S)
+        except Exception:
+            return YaziciDurumu(dev, ip, port, "OFFLINE", False, {}, time.monotonic())
+        try:
+            writer.write(b"~HS\r\n")
+            await writer.drain()
+            buf = b""
+            deadline = time.monotonic() + self.READ_TIMEOUT_S
+            while buf.count(b"\x03") < 3:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                try:
+                    chunk = await asyncio.wait_for(reader.read(256), left)
+                except asyncio.TimeoutError:
+                    break
+                if not chunk:
+                    break
+                buf += chunk
+            flags = parse_hs(buf) or {}
+            # ~HS'ye cevap vermeyen cihaz: bağlantı var, durum bilinmiyor -> HAZIR say
+            return YaziciDurumu(dev, ip, port, _status_from_flags(flags), True, flags, time.monotonic())
+        except Exception:
+            return YaziciDurumu(dev, ip, port, "OFFLINE", False, {}, time.monotonic())
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    def _probe_link(self, dev: str, link) -> YaziciDurumu:
+        self.probe_count += 1
+        try:
+            buf = link.query(b"~HS\r\n", 3, self.READ_TIMEOUT_S)
+        except Exception:
+            link.close()
+            return YaziciDurumu(dev, link.ip, link.port, "OFFLINE", False, {}, time.monotonic())
+        if getattr(link, "sock", None) is None and not buf:
+            return YaziciDurumu(dev, link.ip, link.port, "OFFLINE", False, {}, time.monotonic())
+        flags = parse_hs(buf) or {}
+        return YaziciDurumu(dev, link.ip, link.port, _status_from_flags(flags), True, flags, time.monotonic())
+
+    def _publish(self, dev: str, st: YaziciDurumu):
+        prev = self.states.get(dev)
+        changed = prev is None or prev.key() != st.key()
+        self.states[dev] = st
+        if changed:
+            self._interval[dev] = self.BASE_S
+        else:
+            cap = self.MAX_OK_S if st.ok else self.MAX_BAD_S
+            self._interval[dev] = min(cap, self._interval.get(dev, self.BASE_S) * 2.0)
+        self._due[dev] = time.monotonic() + self._interval[dev]
+        if changed:
+            try:
+                self._on_change(dev, st)
+            except Exception:
+                pass
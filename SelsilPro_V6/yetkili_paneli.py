@@ -3,6 +3,10 @@ Yetkili Paneli (Ayarlar / Yönetim)
 
 - Ayarlar Penceresi: yazdırma ölçüleri + koyuluk + konum + tablo sütun görünürlüğü
 - Yönetici Paneli: şifreli; kritik IP/Port + Reject süre/gecikme + silme işlemleri
+  + yazdırma kuyruğu (bekleyen / basılamayan etiketler)
+  + test: yerel Zebra yazıcı emülatörü (hatta gitmeden baskı yolunu denemek için),
+    scanner simülatörü ve ana döngü donma sayaçları
+  + profil: süreli cProfile / tracemalloc (logs/profil_<zaman>.*)
 
 Bu modül, ana ekrandan çağrılan isimler için geriye dönük uyumluluk sağlar:
 open_ayarlar_penceresi / require_password_then / open_yonetici_paneli
@@ -10,9 +14,12 @@ open_ayarlar_penceresi / require_password_then / open_yonetici_paneli
 from __future__ import annotations
 
 import hashlib
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from tarama_gunlugu import ts_text
+
 try:
     import dizayn
 except Exception:
@@ -423,6 +430,344 @@ class YetkiliPaneli:
     # -----------------------------
     # YÖNETİCİ PANELİ (şifreli)
     # -----------------------------
+    def _build_spool_tab(self, tab: tk.Frame, win: tk.Toplevel):
+        """Yazdırma kuyruğu: basılamayan (DEAD) / bekleyen / tamamlanan işler + cihaz sayaçları."""
+        spool = getattr(self.app.donanim, "print_spool", None)
+        if spool is None:
+            tk.Label(tab, text="Yazdırma kuyruğu devrede değil.", fg="#6c757d").pack(pady=20)
+            return
+
+        top = tk.Frame(tab)
+        top.pack(fill="x", padx=10, pady=(10, 4))
+        filters = {
+            "Basılamayan": ["DEAD"],
+            "Bekleyen": ["PENDING", "SENT"],
+            "Tamamlanan": ["DONE"],
+            "Hepsi": None,
+        }
+        v_filter = tk.StringVar(value="Basılamayan")
+        tk.Label(top, text="Göster:").pack(side="left")
+        cb = ttk.Combobox(top, textvariable=v_filter, values=list(filters.keys()), state="readonly", width=14)
+        cb.pack(side="left", padx=6)
+        lbl_stats = tk.Label(top, text="", fg="#6c757d")
+        lbl_stats.pack(side="left", padx=10)
+
+        cols = ("id", "device", "label", "copies", "status", "attempts", "created", "error")
+        heads = ("#", "Cihaz", "Etiket", "Adet", "Durum", "Deneme", "Zaman", "Hata")
+        widths = (50, 60, 200, 40, 70, 55, 120, 200)
+        frm = tk.Frame(tab)
+        frm.pack(fill="both", expand=True, padx=10, pady=4)
+        tree = ttk.Treeview(frm, columns=cols, show="headings", height=12, selectmode="extended")
+        for c, h, w in zip(cols, heads, widths):
+            tree.heading(c, text=h)
+            tree.column(c, width=w, anchor="w", stretch=(c in ("label", "error")))
+        ysb = ttk.Scrollbar(frm, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=ysb.set)
+        tree.pack(side="left", fill="both", expand=True)
+        ysb.pack(side="right", fill="y")
+
+        def _refresh():
+            tree.delete(*tree.get_children())
+            for j in spool.list_jobs(filters.get(v_filter.get())):
+                ts = time.strftime("%d.%m %H:%M:%S", time.localtime(j.get("created_at") or 0))
+                tree.insert("", "end", iid=str(j["id"]), values=(
+                    j["id"], j["device"], j.get("label") or "", j.get("copies") or 1, j["status"],
+                    j.get("attempts") or 0, ts, j.get("last_error") or "",
+                ))
+            parts = []
+            grp = getattr(self.app.donanim, "prod_group", None)
+            gst = grp.stats() if grp is not None else {}
+            for dev, st in spool.stats().items():
+                txt = f"{dev}: {st['labels']} etiket, kuyruk {st['queue']}, hata {st['dead']}, ort. onay {st['avg_confirm_ms']} ms"
+                if dev in gst:
+                    txt += f", {gst[dev]['per_min']}/dk"
+                parts.append(txt)
+            lbl_stats.config(text=" | ".join(parts), wraplength=560, justify="left")
+
+        def _selected() -> list[int]:
+            return [int(x) for x in tree.selection()]
+
+        def _retry():
+            ids = _selected()
+            if not ids:
+                return messagebox.showwarning("Uyarı", "Lütfen listeden en az 1 iş seçin.", parent=win)
+            n = spool.retry(ids)
+            messagebox.showinfo("Bilgi", f"{n} iş yeniden kuyruğa alındı.", parent=win)
+            _refresh()
+
+        def _delete():
+            ids = _selected()
+            if not ids:
+                return messagebox.showwarning("Uyarı", "Lütfen listeden en az 1 iş seçin.", parent=win)
+            if not messagebox.askyesno("Onay", f"Seçili {len(ids)} iş silinsin mi?", parent=win):
+                return
+            n = spool.delete(ids)
+            messagebox.showinfo("Bilgi", f"{n} iş silindi.", parent=win)
+            _refresh()
+
+        cb.bind("<<ComboboxSelected>>", lambda _e: _refresh())
+        bar = tk.Frame(tab)
+        bar.pack(fill="x", padx=10, pady=8)
+        tk.Button(bar, text="Yenile", width=12, command=_refresh).pack(side="left")
+        tk.Button(bar, text="Yeniden Dene", width=14, bg="#198754", fg="white", command=_retry).pack(side="left", padx=10)
+        tk.Button(bar, text="Sil", width=12, bg="#dc3545", fg="white", command=_delete).pack(side="right")
+        _refresh()
+
+    def _build_test_tab(self, tab: tk.Frame, win: tk.Toplevel):
+        """Test araçları: yazıcı emülatörü (box / prod / prod2 yerel porta yönlenir), scanner simülatörü
+        ve ana döngü donma sayaçları."""
+        don = self.app.donanim
+
+        lf_emu = tk.LabelFrame(tab, text="Zebra Yazıcı Emülatörü", padx=10, pady=10)
+        lf_emu.pack(fill="x", padx=10, pady=8)
+        tk.Label(
+            lf_emu,
+            text="Açıkken etiketler gerçek yazıcılara değil yerel emülatöre gider. Adresler dosyaya yazılmaz;\n"
+                 "kapatınca asıl yazıcı IP / port ayarları geri gelir.",
+            fg="#6c757d", justify="left",
+        ).grid(row=0, column=0, columnspan=6, sticky="w", pady=(0, 8))
+
+        v_speed = tk.StringVar(value="8")
+        v_buf = tk.StringVar(value="64")
+        v_paper = tk.BooleanVar(value=False)
+        tk.Label(lf_emu, text="Hız (etiket/sn):").grid(row=1, column=0, sticky="w")
+        tk.Entry(lf_emu, textvariable=v_speed, width=6).grid(row=1, column=1, padx=6)
+        tk.Label(lf_emu, text="Tampon:").grid(row=1, column=2, sticky="w")
+        tk.Entry(lf_emu, textvariable=v_buf, width=6).grid(row=1, column=3, padx=6)
+        lbl_stats = tk.Label(lf_emu, text="Kapalı", fg="#6c757d", justify="left", anchor="w")
+        lbl_stats.grid(row=3, column=0, columnspan=6, sticky="w", pady=(8, 0))
+
+        def _toggle():
+            if don.printer_emulators:
+                don.stop_printer_emulator()
+                v_paper.set(False)
+            else:
+                try:
+                    don.start_printer_emulator(float(v_speed.get() or 8), int(v_buf.get() or 64))
+                except Exception as e:
+                    return messagebox.showerror("Hata", f"Emülatör açılamadı: {e}", parent=win)
+            _paint()
+
+        def _paper():
+            for emu in don.printer_emulators.values():
+                emu.set_fault(paper_out=bool(v_paper.get()))
+
+        def _drop():
+            for emu in don.printer_emulators.values():
+                emu.drop_connections()
+
+        btn_toggle = tk.Button(lf_emu, text="Başlat", width=12, bg="#198754", fg="white", command=_toggle)
+        btn_toggle.grid(row=1, column=4, padx=(12, 0))
+        bar = tk.Frame(lf_emu)
+        bar.grid(row=2, column=0, columnspan=6, sticky="w", pady=(8, 0))
+        tk.Checkbutton(bar, text="Kağıt Bitti", variable=v_paper, command=_paper).pack(side="left")
+        tk.Button(bar, text="Bağlantıyı Kopar", command=_drop).pack(side="left", padx=10)
+
+        def _paint():
+            emus = don.printer_emulators
+            if emus:
+                btn_toggle.config(text="Durdur", bg="#dc3545")
+                lines = []
+                for dev, emu in emus.items():
+                    st = emu.stats()
+                    lines.append(
+                        f"{dev} (:{st['port']}): alınan {st['received']}, basılan {st['printed']}, "
+                        f"{st['labels_per_s']} etiket/sn, tampon {st['buffer']} (en çok {st['max_buffer']})"
+                    )
+                lbl_stats.config(text="\n".join(lines), fg="#212529")
+            else:
+                btn_toggle.config(text="Başlat", bg="#198754")
+                lbl_stats.config(text="Kapalı", fg="#6c757d")
+
+        def _refresh():
+            try:
+                if not win.winfo_exists():
+                    return
+            except Exception:
+                return
+            _paint()
+            win.after(1000, _refresh)
+
+        _refresh()
+        self._build_scanner_sim(tab, win)
+        self._build_stall_view(tab, win)
+
+    def _build_scanner_sim(self, tab: tk.Frame, win: tk.Toplevel):
+        """Scanner simülatörü: açık işin kodları kamera hızında (arızalarla) gönderilir."""
+        don = self.app.donanim
+
+        lf_sim = tk.LabelFrame(tab, text="Scanner Simülatörü", padx=10, pady=10)
+        lf_sim.pack(fill="x", padx=10, pady=8)
+        tk.Label(
+            lf_sim,
+            text="Açık işin kodları kameradan geliyormuş gibi gönderilir. Scanner adresi dosyaya yazılmaz.\n"
+                 "Arıza oranları yüzde: okunamayan, çift okuma, yabancı kod, bölünmüş / birleşik paket.",
+            fg="#6c757d", justify="left",
+        ).grid(row=0, column=0, columnspan=8, sticky="w", pady=(0, 8))
+
+        v_rate = tk.StringVar(value="5")
+        v_jit = tk.StringVar(value="10")
+        tk.Label(lf_sim, text="Hız (kod/sn):").grid(row=1, column=0, sticky="w")
+        tk.Entry(lf_sim, textvariable=v_rate, width=6).grid(row=1, column=1, padx=6)
+        tk.Label(lf_sim, text="Sapma %:").grid(row=1, column=2, sticky="w")
+        tk.Entry(lf_sim, textvariable=v_jit, width=6).grid(row=1, column=3, padx=6)
+
+        fault_vars = {}
+        bar = tk.Frame(lf_sim)
+        bar.grid(row=2, column=0, columnspan=8, sticky="w", pady=(8, 0))
+        for key, title in (("noread", "NoRead"), ("double", "Çift"), ("foreign", "Yabancı"),
+                           ("split", "Bölünmüş"), ("merge", "Birleşik")):
+            fault_vars[key] = tk.StringVar(value="0")
+            tk.Label(bar, text=f"{title} %:").pack(side="left")
+            tk.Entry(bar, textvariable=fault_vars[key], width=4).pack(side="left", padx=(2, 10))
+
+        lbl_stats = tk.Label(lf_sim, text="Kapalı", fg="#6c757d", justify="left", anchor="w")
+        lbl_stats.grid(row=3, column=0, columnspan=8, sticky="w", pady=(8, 0))
+
+        def _pct(var) -> float:
+            try:
+                return max(0.0, float(var.get() or 0)) / 100.0
+            except Exception:
+                return 0.0
+
+        def _toggle():
+            if don.scanner_simulator is not None:
+                don.stop_scanner_simulator()
+            else:
+                codes = [it.get("raw") for it in (getattr(self.app, "work_list", None) or []) if it.get("raw")]
+                if not codes:
+                    return messagebox.showwarning("Uyarı", "Önce bir iş / ürün listesi açın.", parent=win)
+                try:
+                    don.start_scanner_simulator(
+                        codes, rate=float(v_rate.get() or 5), jitter=_pct(v_jit),
+                        faults={k: _pct(v) for k, v in fault_vars.items()},
+                    )
+                except Exception as e:
+                    return messagebox.showerror("Hata", f"Simülatör açılamadı: {e}", parent=win)
+            _paint()
+
+        btn_toggle = tk.Button(lf_sim, text="Başlat", width=12, bg="#198754", fg="white", command=_toggle)
+        btn_toggle.grid(row=1, column=4, padx=(12, 0))
+
+        def _paint():
+            sim = don.scanner_simulator
+            if sim is not None:
+                st = sim.stats()
+                state = "bitti" if sim.done.is_set() else ("gönderiyor" if don._scanner_sock is not None else "bağlantı bekleniyor")
+                btn_toggle.config(text="Durdur", bg="#dc3545")
+                lbl_stats.config(
+                    text=f":{sim.port} {state} | kod {st.get('code', 0)}, çift {st.get('double', 0)}, "
+                         f"birleşik {st.get('merge', 0)}, bölünmüş {st.get('split', 0)}, "
+                         f"noread {st.get('noread', 0)}, yabancı {st.get('foreign', 0)} / {len(sim.codes)}",
+                    fg="#212529",
+                )
+            else:
+                btn_toggle.config(text="Başlat", bg="#198754")
+                lbl_stats.config(text="Kapalı", fg="#6c757d")
+
+        def _refresh():
+            try:
+                if not win.winfo_exists():
+                    return
+            except Exception:
+                return
+            _paint()
+            win.after(1000, _refresh)
+
+        _refresh()
+
+    def _build_stall_view(self, tab: tk.Frame, win: tk.Toplevel):
+        """Ana döngü donmaları: sayaç, en uzun süre, son donmanın yeri (ayrıntı logs/donmalar.log)."""
+        lf = tk.LabelFrame(tab, text="Ana Döngü Donmaları", padx=10, pady=10)
+        lf.pack(fill="x", padx=10, pady=8)
+        lbl = tk.Label(lf, text="Kapalı", fg="#6c757d", justify="left", anchor="w")
+        lbl.pack(fill="x")
+
+        def _refresh():
+            try:
+                if not win.winfo_exists():
+                    return
+            except Exception:
+                return
+            sw = getattr(self.app, "stall_watch", None)
+            if sw is not None:
+                st = sw.stats()
+                bad = st["count"] + st["modal"] > 0
+                text = (f"Donma: {st['count']}, modal pencere: {st['modal']}, toplam {st['total_ms']} ms, "
+                        f"en uzun {st['max_ms']} ms (eşik {sw.threshold_s * 1000:.0f} ms)")
+                if st["last"]:
+                    text += f"\nSon: {st['last']} ({ts_text(st['last_at'])})\nAyrıntı: {sw.path}"
+                lbl.config(text=text, fg="#842029" if bad else "#212529")
+            win.after(1000, _refresh)
+
+        _refresh()
+
+    def _build_profile_tab(self, tab: tk.Frame, win: tk.Toplevel):
+        """Canlı istasyonda süreli cProfile + tracemalloc; sonuç logs/profil_<zaman>.* dosyalarına."""
+        prof = self.app.profiler
+
+        top = tk.Frame(tab)
+        top.pack(fill="x", padx=10, pady=(10, 4))
+        v_sec = tk.StringVar(value="60")
+        v_mem = tk.BooleanVar(value=True)
+        tk.Label(top, text="Süre (sn):").pack(side="left")
+        tk.Entry(top, textvariable=v_sec, width=6).pack(side="left", padx=6)
+        tk.Checkbutton(top, text="Bellek (tracemalloc)", variable=v_mem).pack(side="left", padx=6)
+        btn = tk.Button(top, text="Başlat", width=12, bg="#198754", fg="white")
+        btn.pack(side="left", padx=(12, 0))
+        lbl = tk.Label(top, text="", fg="#6c757d")
+        lbl.pack(side="left", padx=10)
+
+        frm = tk.Frame(tab)
+        frm.pack(fill="both", expand=True, padx=10, pady=(4, 10))
+        txt = tk.Text(frm, wrap="none", font=("Consolas", 9), height=16)
+        ysb = ttk.Scrollbar(frm, orient="vertical", command=txt.yview)
+        txt.configure(yscrollcommand=ysb.set)
+        ysb.pack(side="right", fill="y")
+        txt.pack(side="left", fill="both", expand=True)
+
+        def _show(text: str):
+            try:
+                txt.delete("1.0", "end")
+                txt.insert("1.0", text or "Profil kapalıyken ek yük yoktur. Süre dolunca sonuç burada görünür.")
+            except Exception:
+                pass
+
+        def _toggle():
+            if prof.running:
+                prof.stop()
+            else:
+                try:
+                    sec = float(v_sec.get() or 60)
+                except Exception:
+                    sec = 60.0
+                prof.start(sec, memory=bool(v_mem.get()), on_done=lambda text, _path: _show(text))
+            _paint()
+
+        btn.config(command=_toggle)
+        _show(prof.last_summary)
+
+        def _paint():
+            if prof.running:
+                btn.config(text="Durdur", bg="#dc3545")
+                lbl.config(text=f"Profil açık, kalan {prof.remaining():.0f} sn", fg="#842029")
+            else:
+                btn.config(text="Başlat", bg="#198754")
+                paths = [p for p in prof.last_paths if p]
+                lbl.config(text=("Son: " + paths[-1]) if paths else "Kapalı", fg="#6c757d")
+
+        # tek zincir: sadece burada yeniden planlanır (_toggle sadece boyar)
+        def _refresh():
+            try:
+                if not win.winfo_exists():
+                    return
+            except Exception:
+                return
+            _paint()
+            win.after(1000, _refresh)
+
+        _refresh()
+
     def _open_admin_window(self):
         s = self.app.veri.settings
 
@@ -459,9 +804,28 @@ class YetkiliPaneli:
         tab_cfg = tk.Frame(nb)
         tab_del = tk.Frame(nb)
         tab_design = tk.Frame(nb)
+        tab_spool = tk.Frame(nb)
+        tab_test = tk.Frame(nb)
+        tab_prof = tk.Frame(nb)
         nb.add(tab_cfg, text="Cihaz / IP-PORT")
         nb.add(tab_del, text="Silme")
         nb.add(tab_design, text="Dizayn")
+        nb.add(tab_spool, text="Yazdırma Kuyruğu")
+        nb.add(tab_test, text="Test")
+        nb.add(tab_prof, text="Profil")
+
+        try:
+            self._build_spool_tab(tab_spool, win)
+        except Exception:
+            pass
+        try:
+            self._build_test_tab(tab_test, win)
+        except Exception:
+            pass
+        try:
+            self._build_profile_tab(tab_prof, win)
+        except Exception:
+            pass
 
         # Dizayn sekmesi
         try:
@@ -579,6 +943,12 @@ class YetkiliPaneli:
         tk.Entry(lf_prod2, textvariable=v_prod2_ip, width=18).grid(row=0, column=1, padx=6)
         tk.Label(lf_prod2, text="Port:").grid(row=0, column=2, sticky="w")
         tk.Entry(lf_prod2, textvariable=v_prod2_port, width=8).grid(row=0, column=3, padx=6)
+        # Ürün yazıcı grubu dağıtımı (prod + prod2)
+        dispatch_modes = {"Yedek (tek yazıcı)": "single", "Sırayla": "round_robin", "En kısa kuyruk": "least_queue"}
+        cur_mode = str(s.get("prod_dispatch", "single") or "single")
+        v_dispatch = tk.StringVar(value=next((k for k, v in dispatch_modes.items() if v == cur_mode), "Yedek (tek yazıcı)"))
+        tk.Label(lf_prod2, text="Dağıtım:").grid(row=0, column=4, sticky="w", padx=(10, 0))
+        ttk.Combobox(lf_prod2, textvariable=v_dispatch, values=list(dispatch_modes.keys()), state="readonly", width=16).grid(row=0, column=5, padx=6)
         
         # Windows yazıcı listesi bu projede kullanılmaz (SOCKET ONLY).
         lf_rej = tk.LabelFrame(tab_cfg, text="Reject Sistemi", padx=10, pady=10)
@@ -633,6 +1003,7 @@ class YetkiliPaneli:
                 s["prod2_port"] = s["prod2_printer_port"]
             except Exception:
                 return messagebox.showerror("Hata", "URUN-2 Port sayı olmalı.")
+            s["prod_dispatch"] = dispatch_modes.get(v_dispatch.get(), "single")
 
             # Windows yazıcı adları
             try: